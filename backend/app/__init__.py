@@ -3,14 +3,94 @@ from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from flask_jwt_extended import JWTManager
 from datetime import timedelta
+from app.startup_profiler import startup_phase
+from app.db_router import RoutingSession
 import os
 
 # Initialize extensions
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 
-def create_app(config_name='development'):
+# Origins allowed to call the API from a browser
+CORS_ORIGINS = ['http://localhost:3000', 'http://localhost:3001', 'http://localhost:3002', 'http://127.0.0.1:3000', 'http://127.0.0.1:3001', 'http://127.0.0.1:3002', 'file://']
+
+def create_app(config_name='development', check_schema=True):
     """Application factory pattern"""
+    with startup_phase('create_app.config'):
+        app = _configure_app(config_name)
+    
+    with startup_phase('create_app.extensions'):
+        # Initialize extensions with app
+        db.init_app(app)
+        jwt.init_app(app)
+        
+        # Cached user lookup behind @jwt_required (exposes current_user)
+        from app.identity import init_identity_loader
+        init_identity_loader(app, jwt)
+        
+        # Process-local plan catalog snapshot behind the catalog listings
+        from app.catalog import init_plan_catalog
+        init_plan_catalog(app)
+        
+        # Encoded catalog responses (JSON bytes, gzip, ETag) per catalog version
+        from app.response_cache import init_response_cache
+        init_response_cache(app)
+        
+        # Keep the full-text plan search index in sync with plan writes
+        from app.plan_search import init_plan_search
+        init_plan_search(app)
+        
+        # Parse typed plan attributes (data, speed, validity, ...) on plan writes
+        from app.plan_attributes import init_plan_attributes
+        init_plan_attributes(app)
+        
+        # Per-plan subscriber/revenue counters maintained on subscription and payment writes
+        from app.plan_stats import init_plan_stats
+        init_plan_stats(app)
+        
+        # Per-user spend and plan/payment counters maintained on the same writes
+        from app.account_summary import init_account_summary
+        init_account_summary(app)
+        
+        # Decayed trending scores fed by committed subscriptions and payments
+        from app.trending import init_trending
+        init_trending(app)
+        
+        # Per-user data versions and the per-user response cache they key
+        from app.user_data import init_user_data
+        init_user_data(app)
+        
+        # Connection pool telemetry and the SQLite profile (WAL, busy_timeout, mmap, ...)
+        from app.db_pool import instrument_engine
+        from app.sqlite_tuning import configure_sqlite
+        with app.app_context():
+            app.extensions['pool_monitors'] = {'primary': instrument_engine(db.engine, 'primary')}
+            app.extensions['sqlite_tuner'] = configure_sqlite(db.engine)
+        
+        # Optional read replicas for read-only endpoints
+        if app.config['DATABASE_REPLICA_URLS']:
+            from app.db_router import init_replicas
+            init_replicas(app, app.config['DATABASE_REPLICA_URLS'])
+        
+        # Enable CORS for all routes
+        CORS(app, origins=CORS_ORIGINS)
+    
+    with startup_phase('create_app.blueprints'):
+        _register_blueprints(app)
+    
+    # Verify the database schema version
+    if check_schema:
+        from app.migrations import check_schema_version
+        with startup_phase('create_app.schema_check'), app.app_context():
+            check_schema_version(app)
+    
+    with startup_phase('create_app.error_handlers'):
+        _register_error_handlers(app)
+    
+    return app
+
+def _configure_app(config_name):
+    """Create the Flask app and load its configuration"""
     app = Flask(__name__)
     
     # Configuration
@@ -30,37 +110,51 @@ def create_app(config_name='development'):
     
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
-    # Initialize extensions with app
-    db.init_app(app)
-    jwt.init_app(app)
+    # Connection pool settings (DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING)
+    from app.db_pool import engine_options_from_env
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options_from_env(app.config['SQLALCHEMY_DATABASE_URI'])
+    
+    # Read replicas (comma-separated URLs), replica selection and read-your-writes window
+    app.config['DATABASE_REPLICA_URLS'] = os.environ.get('DATABASE_REPLICA_URLS', '')
+    app.config['DATABASE_REPLICA_STRATEGY'] = os.environ.get('DATABASE_REPLICA_STRATEGY', 'round_robin')
+    app.config['REPLICA_STICKY_SECONDS'] = float(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+    
+    # Schema creation and seeding run once per deploy (`python manage.py bootstrap`).
+    # Outside production the app migrates itself on startup for convenience.
+    default_auto_migrate = 'true' if config_name == 'testing' or os.environ.get('FLASK_ENV', 'development') != 'production' else 'false'
+    app.config['AUTO_MIGRATE'] = os.environ.get('AUTO_MIGRATE', default_auto_migrate).lower() == 'true'
     
-    # Enable CORS for all routes
-    CORS(app, origins=['http://localhost:3000', 'http://localhost:3001', 'http://localhost:3002', 'http://127.0.0.1:3000', 'http://127.0.0.1:3001', 'http://127.0.0.1:3002', 'file://'])
+    # Lazy startup defers rarely used blueprints until their first request
+    app.config['LAZY_STARTUP'] = os.environ.get('LAZY_STARTUP', 'false').lower() == 'true'
     
-    # Register blueprints
+    return app
+
+def _register_blueprints(app):
+    """Register the API blueprints"""
     from app.routes.auth_routes import auth_bp
     from app.routes.plan_routes import plan_bp
     from app.routes.payment_routes import payment_bp
     from app.routes.user_routes import user_bp
     from app.routes.health_routes import health_bp
-    from app.routes.optimized_plan_routes import optimized_plan_bp
     
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
     app.register_blueprint(plan_bp, url_prefix='/api/plans')
-    app.register_blueprint(optimized_plan_bp, url_prefix='/api/optimized-plans')
     app.register_blueprint(payment_bp, url_prefix='/api/payments')
     app.register_blueprint(user_bp, url_prefix='/api/users')
     app.register_blueprint(health_bp, url_prefix='/api/health')
     
-    # Create database tables
-    with app.app_context():
-        db.create_all()
+    if app.config['LAZY_STARTUP']:
+        from app.lazy_loading import register_lazy_blueprints
+        register_lazy_blueprints(app)
+    else:
+        from app.routes.optimized_plan_routes import optimized_plan_bp
+        from app.routes.health_admin_routes import health_admin_bp
         
-        # Initialize with sample data
-        from app.services.data_service import DataService
-        data_service = DataService()
-        data_service.initialize_sample_data()
-    
+        app.register_blueprint(optimized_plan_bp, url_prefix='/api/optimized-plans')
+        app.register_blueprint(health_admin_bp, url_prefix='/api/health')
+
+def _register_error_handlers(app):
+    """Register error handlers for the app and JWT extension"""
     # Enhanced Error handlers with proper logging
     @app.errorhandler(404)
     def not_found(error):
@@ -96,5 +190,3 @@ def create_app(config_name='development'):
     @jwt.unauthorized_loader
     def missing_token_callback(error):
         return {'error': 'Authorization token is required'}, 401
-    
-    return app
@@ -0,0 +1,220 @@
+"""
+Incrementally maintained per-user account summary.
+
+The user stats, dashboard and payment summary endpoints used to run five to
+nine COUNT/SUM queries over a user's whole transaction and plan history on
+every call. ``user_account_summary`` (migration 11) keeps those numbers per
+user, with the same definitions the endpoints used:
+
+    total_spent             sum of completed transactions with a positive
+                            amount (refunds are not subtracted)
+    *_transactions          transactions in total and by status
+    *_plans                 user_plans in total and by status
+    last_activity           time of the latest payment or plan change
+
+``user_monthly_spend`` holds the same spend bucketed by the UTC month the
+transaction was created in, so "spent this month" is one primary-key read.
+
+An after_flush hook turns each flushed Transaction / UserPlan insert, update
+or delete into deltas (from the attribute history, with the flush plumbing
+shared with plan_stats in app/flush_deltas.py) and upserts them in the same
+database transaction as the payment, refund, subscription, renewal or
+cancellation. Writes that bypass the ORM are not seen; ``python manage.py
+rebuild-summaries`` recomputes the tables from scratch (migration 11 runs it
+as a backfill).
+"""
+from datetime import datetime
+from sqlalchemy import event, select
+from app.flush_deltas import for_each_contribution, track_attributes, upsert
+
+TRANSACTION_COUNTERS = {
+    'completed': 'completed_transactions',
+    'failed': 'failed_transactions',
+    'pending': 'pending_transactions',
+    'refunded': 'refunded_transactions',
+}
+
+PLAN_COUNTERS = {
+    'active': 'active_plans',
+    'expired': 'expired_plans',
+    'cancelled': 'cancelled_plans',
+}
+
+SUMMARY_FIELDS = (
+    ('total_spent', 'total_transactions') + tuple(TRANSACTION_COUNTERS.values())
+    + ('total_plans',) + tuple(PLAN_COUNTERS.values())
+)
+
+
+def month_key(moment):
+    """The user_monthly_spend bucket of a datetime"""
+    return moment.strftime('%Y-%m')
+
+
+def _transaction_contribution(user_id, status, amount, created_at):
+    counters = {'total_transactions': 1}
+    if status in TRANSACTION_COUNTERS:
+        counters[TRANSACTION_COUNTERS[status]] = 1
+    months = {}
+    if status == 'completed' and (amount or 0) > 0:
+        counters['total_spent'] = amount
+        months[month_key(created_at or datetime.utcnow())] = amount
+    return user_id, counters, months
+
+
+def _user_plan_contribution(user_id, status):
+    counters = {'total_plans': 1}
+    if status in PLAN_COUNTERS:
+        counters[PLAN_COUNTERS[status]] = 1
+    return user_id, counters, {}
+
+
+def _tracked_models():
+    from app.models.plan import Transaction
+    from app.models.user import UserPlan
+    return {
+        Transaction: (('user_id', 'status', 'amount', 'created_at'), _transaction_contribution),
+        UserPlan: (('user_id', 'status'), _user_plan_contribution),
+    }
+
+
+class _Delta:
+    __slots__ = ('counters', 'months')
+
+    def __init__(self):
+        self.counters = {}
+        self.months = {}
+
+    def add(self, counters, months, sign):
+        for field, value in counters.items():
+            self.counters[field] = self.counters.get(field, 0) + sign * value
+        for month, amount in months.items():
+            self.months[month] = self.months.get(month, 0.0) + sign * amount
+
+
+def collect_deltas(session):
+    """{user_id: _Delta} for the objects being flushed (including users whose counters did not move)"""
+    tracked = _tracked_models()
+    deltas = {}
+
+    def add(contribution, sign):
+        user_id, counters, months = contribution
+        if user_id is not None:
+            deltas.setdefault(user_id, _Delta()).add(counters, months, sign)
+
+    for_each_contribution(session, tracked, add)
+    return deltas
+
+
+def apply_deltas(connection, deltas, now=None):
+    """Add the deltas to user_account_summary and user_monthly_spend, creating rows as needed"""
+    from app.models.user import UserAccountSummary, UserMonthlySpend
+    summary = UserAccountSummary.__table__
+    monthly = UserMonthlySpend.__table__
+    now = now or datetime.utcnow()
+
+    for user_id, delta in deltas.items():
+        values = {field: delta.counters.get(field, 0) for field in SUMMARY_FIELDS}
+        values.update(user_id=user_id, last_activity=now, updated_at=now)
+        upsert(connection, summary, ('user_id',), values, SUMMARY_FIELDS, replace=('last_activity', 'updated_at'))
+
+        for month, amount in delta.months.items():
+            if amount:
+                upsert(connection, monthly, ('user_id', 'month'),
+                       {'user_id': user_id, 'month': month, 'amount': amount}, ('amount',))
+
+
+def compute_account_summaries(connection, user_ids=None):
+    """({user_id: _Delta}, {user_id: last activity}) recomputed from transactions and user_plans"""
+    from app.models.plan import Transaction
+    from app.models.user import UserPlan
+    deltas = {}
+    last_activity = {}
+
+    def add(contribution, *moments):
+        user_id, counters, months = contribution
+        deltas.setdefault(user_id, _Delta()).add(counters, months, 1)
+        latest = max((moment for moment in moments if moment is not None), default=None)
+        if latest is not None and (user_id not in last_activity or latest > last_activity[user_id]):
+            last_activity[user_id] = latest
+
+    transactions = select(Transaction.user_id, Transaction.status, Transaction.amount,
+                          Transaction.created_at, Transaction.updated_at)
+    user_plans = select(UserPlan.user_id, UserPlan.status, UserPlan.created_at, UserPlan.updated_at)
+    if user_ids is not None:
+        transactions = transactions.where(Transaction.user_id.in_(user_ids))
+        user_plans = user_plans.where(UserPlan.user_id.in_(user_ids))
+
+    for user_id, status, amount, created_at, updated_at in connection.execute(transactions):
+        add(_transaction_contribution(user_id, status, amount, created_at), created_at, updated_at)
+    for user_id, status, created_at, updated_at in connection.execute(user_plans):
+        add(_user_plan_contribution(user_id, status), created_at, updated_at)
+    return deltas, last_activity
+
+
+def rebuild_account_summaries(connection, user_ids=None):
+    """Replace the stored summaries (of ``user_ids``, or everyone) with recomputed ones; returns the rows written"""
+    from app.models.user import UserAccountSummary, UserMonthlySpend
+    summary = UserAccountSummary.__table__
+    monthly = UserMonthlySpend.__table__
+
+    # Lock the rows first so concurrent deltas wait and then apply on top of the rebuilt values
+    locked = select(summary.c.user_id).with_for_update()
+    if user_ids is not None:
+        locked = locked.where(summary.c.user_id.in_(user_ids))
+    connection.execute(locked).all()
+
+    deltas, last_activity = compute_account_summaries(connection, user_ids)
+    for table in (summary, monthly):
+        delete = table.delete()
+        if user_ids is not None:
+            delete = delete.where(table.c.user_id.in_(user_ids))
+        connection.execute(delete)
+
+    now = datetime.utcnow()
+    rows = []
+    month_rows = []
+    for user_id, delta in deltas.items():
+        row = {field: delta.counters.get(field, 0) for field in SUMMARY_FIELDS}
+        row.update(user_id=user_id, last_activity=last_activity.get(user_id), updated_at=now)
+        rows.append(row)
+        month_rows.extend({'user_id': user_id, 'month': month, 'amount': amount}
+                          for month, amount in delta.months.items() if amount)
+    if rows:
+        connection.execute(summary.insert(), rows)
+    if month_rows:
+        connection.execute(monthly.insert(), month_rows)
+    return len(rows)
+
+
+def account_summary(session, user_id, month=None):
+    """The user's counters (zeros when nothing is stored) plus ``monthly_spent`` for ``month``"""
+    from app.models.user import UserAccountSummary, UserMonthlySpend
+    row = session.execute(
+        select(UserAccountSummary.__table__).where(UserAccountSummary.user_id == user_id)
+    ).first()
+    summary = {field: getattr(row, field) if row is not None else 0 for field in SUMMARY_FIELDS}
+    summary['last_activity'] = row.last_activity if row is not None else None
+
+    summary['monthly_spent'] = session.execute(
+        select(UserMonthlySpend.amount).where(
+            UserMonthlySpend.user_id == user_id,
+            UserMonthlySpend.month == month_key(month or datetime.utcnow())
+        )
+    ).scalar() or 0
+    return summary
+
+
+def _apply_flush_deltas(session, flush_context):
+    deltas = collect_deltas(session)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+def init_account_summary(app):
+    """Keep user_account_summary in step with ORM writes to transactions and user_plans"""
+    from app.db_router import RoutingSession
+
+    if not event.contains(RoutingSession, 'after_flush', _apply_flush_deltas):
+        track_attributes(_tracked_models())
+        event.listen(RoutingSession, 'after_flush', _apply_flush_deltas)
@@ -0,0 +1,385 @@
+"""
+Async (ASGI) serving path for the read-heavy endpoints.
+
+The catalog, my-plans, payment history and activity reads are I/O-bound, so
+serving them from an event loop lets one process hold thousands of slow
+clients without a thread per connection. The Flask app keeps every write.
+
+The ASGI app reuses the Flask configuration, the SQLAlchemy models and the
+JWT secret; queries run on an async engine (aiosqlite / asyncpg) derived from
+the primary DATABASE_URL, or ASYNC_DATABASE_URL when set. Responses match the
+Flask endpoints on the same paths so a proxy can send GETs for these paths to
+``asgi.py`` and everything else to ``serve.py``. The catalog listing is
+answered from the same versioned plan snapshot as Flask (app/catalog.py), and
+payment history and activity are cached against the user's data version like
+their Flask twins (app/user_data.py).
+"""
+from app import CORS_ORIGINS, create_app, db
+from app.catalog import catalog_from_env
+from app.plan_search import search_plan_ids_async
+from app.plan_attributes import attribute_filters
+from app.models.plan import Transaction
+from app.models.user import User, UserPlan, UserDataVersion
+from app.response_cache import CachedResponse
+from app.user_data import make_tag, matching_etag, user_responses_from_env
+from app.sqlite_tuning import configure_sqlite
+from datetime import datetime
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import selectinload
+from urllib.parse import parse_qs, urlencode
+import json
+import jwt as pyjwt
+import os
+import time
+
+# Sync driver -> async driver used by the ASGI engine
+ASYNC_DRIVERS = {
+    'sqlite': 'sqlite+aiosqlite',
+    'sqlite+pysqlite': 'sqlite+aiosqlite',
+    'postgresql': 'postgresql+asyncpg',
+    'postgresql+psycopg2': 'postgresql+asyncpg',
+}
+
+
+class HTTPError(Exception):
+    """Raised by handlers to short-circuit with a JSON error response"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def async_database_url(url):
+    """Translate a sync SQLAlchemy URL into its async-driver equivalent"""
+    driver = url.drivername
+    if driver not in ASYNC_DRIVERS:
+        if '+aiosqlite' in driver or '+asyncpg' in driver:
+            return url
+        raise ValueError(f"No async driver configured for '{driver}'")
+    return url.set(drivername=ASYNC_DRIVERS[driver])
+
+
+def _engine_options(url):
+    """Pool settings for the async engine (same env vars as the sync pool)"""
+    from app.db_pool import engine_options_from_env
+
+    options = engine_options_from_env(url.render_as_string(hide_password=False))
+    # The instrumented pool is sync-only; async engines use AsyncAdaptedQueuePool
+    options.pop('poolclass', None)
+    return options
+
+
+class AsyncAPI:
+    """Minimal ASGI application serving the read endpoints"""
+
+    def __init__(self, flask_app, database_url=None):
+        self.config = flask_app.config
+        self.jwt_secret = flask_app.config['JWT_SECRET_KEY']
+        self.jwt_algorithm = flask_app.config.get('JWT_ALGORITHM', 'HS256')
+
+        if database_url is None:
+            with flask_app.app_context():
+                database_url = async_database_url(db.engine.url)
+        self.engine = create_async_engine(database_url, **_engine_options(database_url))
+        configure_sqlite(self.engine.sync_engine)
+        self.sessionmaker = async_sessionmaker(self.engine, expire_on_commit=False)
+        self.catalog = catalog_from_env()
+        self.user_responses = user_responses_from_env()
+
+        self.routes = {
+            '/api/optimized-plans': self.get_plans,
+            '/api/optimized-plans/': self.get_plans,
+            '/api/optimized-plans/my-plans': self.get_user_plans,
+            '/api/payments/history': self.get_payment_history,
+            '/api/users/activity': self.get_user_activity,
+            '/api/health/async': self.health,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        headers = {key.decode('latin-1').lower(): value.decode('latin-1') for key, value in scope['headers']}
+        origin = headers.get('origin')
+        handler = self.routes.get(scope['path'])
+        start_time = time.perf_counter()
+
+        extra_headers = []
+        if scope['method'] == 'OPTIONS':
+            status, body = 200, None
+        elif handler is None:
+            status, body = 404, {'error': 'Resource not found', 'success': False}
+        elif scope['method'] not in ('GET', 'HEAD'):
+            status, body = 405, {'error': 'Method not allowed', 'success': False}
+        else:
+            query = {key: values[-1] for key, values in parse_qs(scope['query_string'].decode('latin-1')).items()}
+            try:
+                status, body, *extra = await handler(query, headers)
+                extra_headers = extra[0] if extra else []
+            except HTTPError as e:
+                status, body = e.status, {'error': e.message}
+            except Exception as e:
+                print(f"Error in async {handler.__name__}: {str(e)}")
+                status, body = 500, {'error': 'An unexpected error occurred', 'success': False}
+
+        await self._respond(send, status, body, origin, head=scope['method'] == 'HEAD', extra_headers=extra_headers)
+
+        if handler is not None:
+            duration = (time.perf_counter() - start_time) * 1000
+            print(f"Async route {handler.__name__} took {duration:.2f}ms")
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.engine.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def _respond(self, send, status, body, origin, head=False, extra_headers=()):
+        # ``body`` is a JSON-able value, or bytes already encoded by the response cache
+        if isinstance(body, bytes):
+            payload = body
+        else:
+            payload = b'' if body is None else json.dumps(body).encode('utf-8')
+        response_headers = [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(payload)).encode('latin-1')),
+        ]
+        response_headers += [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in extra_headers]
+        if origin in CORS_ORIGINS:
+            response_headers += [
+                (b'access-control-allow-origin', origin.encode('latin-1')),
+                (b'access-control-allow-headers', b'Authorization, Content-Type'),
+                (b'access-control-allow-methods', b'GET, HEAD, OPTIONS'),
+                (b'vary', b'Origin'),
+            ]
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': response_headers})
+        await send({'type': 'http.response.body', 'body': b'' if head else payload})
+
+    def current_user_id(self, headers):
+        """Validate the access token exactly like @jwt_required() and return its identity"""
+        auth = headers.get('authorization', '')
+        if not auth.startswith('Bearer '):
+            raise HTTPError(401, 'Authorization token is required')
+
+        try:
+            claims = pyjwt.decode(auth[len('Bearer '):], self.jwt_secret, algorithms=[self.jwt_algorithm])
+        except pyjwt.ExpiredSignatureError:
+            raise HTTPError(401, 'Token has expired')
+        except pyjwt.InvalidTokenError:
+            raise HTTPError(401, 'Invalid token')
+
+        if claims.get('type') != 'access' or 'sub' not in claims:
+            raise HTTPError(401, 'Invalid token')
+        return int(claims['sub'])
+
+    async def _require_user(self, session, user_id):
+        if await session.get(User, user_id) is None:
+            raise HTTPError(404, 'User not found')
+
+    async def _cached_user_view(self, view, query, headers, build):
+        """Answer ``build(user_id)`` from the user response cache while the user's data is unchanged"""
+        current_user_id = self.current_user_id(headers)
+        cache = self.user_responses
+        if cache.max_age <= 0:
+            return await build(current_user_id)
+
+        # One read for the user's existence and data version
+        async with self.sessionmaker() as session:
+            row = (await session.execute(
+                select(User.id, UserDataVersion.version)
+                .outerjoin(UserDataVersion, UserDataVersion.user_id == User.id)
+                .where(User.id == current_user_id)
+            )).first()
+            if row is None:
+                raise HTTPError(404, 'User not found')
+            snapshot = await self.catalog.snapshot_async(session)
+
+        normalized = urlencode(sorted(query.items()))
+        tag = make_tag(current_user_id, row.version or 0, snapshot.version, f'async.{view}?{normalized}', cache.max_age)
+        cache_headers = [('Cache-Control', 'private, no-cache')]
+
+        etag = matching_etag(tag, headers.get('if-none-match'))
+        if etag is not None:
+            cache.not_modified += 1
+            return 304, b'', [('ETag', etag)] + cache_headers
+
+        key = (current_user_id, f'async.{view}', normalized)
+        entry = cache.get(key, tag)
+        if entry is None:
+            status, body = await build(current_user_id)
+            if status != 200:
+                return status, body
+            entry = CachedResponse(status, 'application/json', json.dumps(body).encode('utf-8'), tag=tag)
+            cache.put(key, tag, entry)
+
+        encoding = entry.encoding_for(headers.get('accept-encoding'))
+        response_headers = [('ETag', entry.etags[encoding])] + cache_headers
+        if encoding != 'identity':
+            response_headers.append(('Content-Encoding', encoding))
+        if len(entry.bodies) > 1:
+            response_headers.append(('Vary', 'Accept-Encoding'))
+        return entry.status, entry.bodies[encoding], response_headers
+
+    async def health(self, query, headers):
+        async with self.sessionmaker() as session:
+            await session.execute(select(1))
+        return 200, {'status': 'healthy', 'service': 'telecom-backend-async', 'timestamp': datetime.utcnow().isoformat()}
+
+    async def get_plans(self, query, headers):
+        """Async twin of GET /api/optimized-plans"""
+        category = query.get('category')
+        popular_only = query.get('popular', '').lower() == 'true'
+        search_query = query.get('search', '').strip()
+
+        async with self.sessionmaker() as session:
+            snapshot = await self.catalog.snapshot_async(session)
+            ranked_ids = snapshot.cached_search(search_query) if search_query else None
+            if search_query and ranked_ids is None:
+                ranked_ids = await search_plan_ids_async(session, search_query)
+                snapshot.remember_search(search_query, ranked_ids)
+
+        plans = snapshot.query(category=category, popular_only=popular_only, search=search_query,
+                               ranked_ids=ranked_ids, minimums=attribute_filters(query),
+                               ott=query.get('ott') or None, limit=50)
+        plans_data = [plan.to_summary() for plan in plans]
+
+        return 200, {'success': True, 'plans': plans_data, 'count': len(plans_data)}
+
+    async def get_user_plans(self, query, headers):
+        """Async twin of GET /api/optimized-plans/my-plans"""
+        current_user_id = self.current_user_id(headers)
+
+        stmt = select(UserPlan).options(selectinload(UserPlan.plan)).filter_by(
+            user_id=current_user_id
+        ).order_by(UserPlan.created_at.desc()).limit(20)
+
+        async with self.sessionmaker() as session:
+            user_plans = (await session.scalars(stmt)).all()
+
+        plans_data = []
+        now = datetime.utcnow()
+        for user_plan in user_plans:
+            if user_plan.renewal_date < now:
+                status = 'expired'
+            elif (user_plan.renewal_date - now).days <= 7:
+                status = 'expiring_soon'
+            else:
+                status = 'active'
+
+            plans_data.append({
+                'id': user_plan.id,
+                'plan_id': user_plan.plan_id,
+                'plan_name': user_plan.plan.name,
+                'plan_price': user_plan.plan.price,
+                'activation_date': user_plan.activation_date.isoformat(),
+                'renewal_date': user_plan.renewal_date.isoformat(),
+                'status': status,
+                'auto_renewal': user_plan.auto_renewal,
+                'days_until_renewal': (user_plan.renewal_date - now).days
+            })
+
+        return 200, {'success': True, 'plans': plans_data, 'count': len(plans_data)}
+
+    async def get_payment_history(self, query, headers):
+        """Async twin of GET /api/payments/history"""
+        return await self._cached_user_view(
+            'payment_history', query, headers, lambda user_id: self._payment_history(query, user_id)
+        )
+
+    async def _payment_history(self, query, current_user_id):
+        limit = _int_arg(query, 'limit', 10)
+        status = query.get('status')
+
+        stmt = select(Transaction).options(selectinload(Transaction.plan)).filter_by(user_id=current_user_id)
+        if status:
+            stmt = stmt.filter_by(status=status)
+        stmt = stmt.order_by(Transaction.created_at.desc()).limit(limit)
+
+        async with self.sessionmaker() as session:
+            await self._require_user(session, current_user_id)
+            transactions = (await session.scalars(stmt)).all()
+
+        return 200, {
+            'success': True,
+            'transactions': [transaction.to_dict() for transaction in transactions],
+            'count': len(transactions)
+        }
+
+    async def get_user_activity(self, query, headers):
+        """Async twin of GET /api/users/activity"""
+        return await self._cached_user_view(
+            'user_activity', query, headers, lambda user_id: self._user_activity(query, user_id)
+        )
+
+    async def _user_activity(self, query, current_user_id):
+        limit = _int_arg(query, 'limit', 20)
+        activity_type = query.get('type')
+
+        activities = []
+        async with self.sessionmaker() as session:
+            await self._require_user(session, current_user_id)
+
+            if not activity_type or activity_type == 'transaction':
+                transactions = (await session.scalars(
+                    select(Transaction).options(selectinload(Transaction.plan)).filter_by(
+                        user_id=current_user_id
+                    ).order_by(Transaction.created_at.desc()).limit(limit)
+                )).all()
+
+                for transaction in transactions:
+                    activities.append({
+                        'id': f"transaction_{transaction.id}",
+                        'type': 'transaction',
+                        'title': f"Payment {transaction.status.title()}",
+                        'description': f"₹{transaction.amount} for {transaction.plan.name}",
+                        'status': transaction.status,
+                        'timestamp': transaction.created_at.isoformat(),
+                        'details': transaction.to_dict()
+                    })
+
+            if not activity_type or activity_type == 'plan':
+                user_plans = (await session.scalars(
+                    select(UserPlan).options(selectinload(UserPlan.plan)).filter_by(
+                        user_id=current_user_id
+                    ).order_by(UserPlan.created_at.desc()).limit(limit)
+                )).all()
+
+                for plan in user_plans:
+                    activities.append({
+                        'id': f"plan_{plan.id}",
+                        'type': 'plan',
+                        'title': f"Plan {plan.status.title()}",
+                        'description': f"{plan.plan.name} - {plan.plan.category}",
+                        'status': plan.status,
+                        'timestamp': plan.created_at.isoformat(),
+                        'details': plan.to_dict()
+                    })
+
+        activities.sort(key=lambda x: x['timestamp'], reverse=True)
+        activities = activities[:limit]
+
+        return 200, {'success': True, 'activities': activities, 'count': len(activities)}
+
+
+def _int_arg(query, name, default):
+    try:
+        return int(query[name])
+    except (KeyError, ValueError):
+        return default
+
+
+def create_asgi_app(config_name='development', database_url=None):
+    """Build the ASGI app from the same configuration as the Flask app"""
+    flask_app = create_app(config_name, check_schema=False)
+    database_url = database_url or os.environ.get('ASYNC_DATABASE_URL') or None
+    return AsyncAPI(flask_app, database_url=database_url)
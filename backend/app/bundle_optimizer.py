@@ -0,0 +1,205 @@
+"""
+Budget-constrained bundle search over the catalog snapshot.
+
+``GET /api/plans/optimize?budget=2000&categories=mobile,internet,tv`` picks
+one plan per listed category (or, with no categories, at most one from each)
+so that the total price stays within the budget, every ``must_have`` term is
+covered by at least one plan, and the summed plan value is highest. The
+top ``limit`` combinations are returned.
+
+This is a group knapsack solved by dynamic programming over the categories.
+A partial bundle is (cost, value, plans) plus a bitmask of the must_have
+terms it already covers. After each category the partials are cut down to
+their k-Pareto set: a partial that k others (with the same or more terms
+covered) beat or tie on both price and value can never make the top k, so it
+is dropped, as is any partial whose missing terms the remaining categories
+cannot cover. The same cut is first applied to each category's plans. The
+last category is not expanded: a prefix table of its best k plans up to each
+price lets every partial read its completions with one bisect. Prices are
+not discretized, so no budget-sized table is needed.
+
+Plan value is a points score over the parsed attributes (VALUE_WEIGHTS).
+"""
+from bisect import bisect_right, insort
+import heapq
+
+DEFAULT_BUNDLE_LIMIT = 5
+MAX_BUNDLE_LIMIT = 20
+MAX_MUST_HAVE = 8
+
+# Distinct optimize queries remembered per snapshot
+OPTIMIZE_CACHE_SIZE = 256
+
+# Points per unit of each parsed attribute
+VALUE_WEIGHTS = {
+    'daily_data_gb': 10.0,
+    'speed_mbps': 0.1,
+    'sms_per_day': 0.05,
+    'ott_bundle': 15.0,
+    'feature': 2.0,
+}
+
+# Daily data an "Unlimited Data" plan is valued at
+UNLIMITED_DATA_GB = 10.0
+
+
+def plan_value(record):
+    """Points score of a catalog record"""
+    daily_data = UNLIMITED_DATA_GB if record.unlimited_data else (record.daily_data_gb or 0)
+    return (
+        daily_data * VALUE_WEIGHTS['daily_data_gb']
+        + (record.speed_mbps or 0) * VALUE_WEIGHTS['speed_mbps']
+        + (record.sms_per_day or 0) * VALUE_WEIGHTS['sms_per_day']
+        + len(record.ott_bundles) * VALUE_WEIGHTS['ott_bundle']
+        + len(record.features) * VALUE_WEIGHTS['feature']
+    )
+
+
+def covers(record, term):
+    """Whether a plan satisfies one must_have term (OTT key, unlimited_data or feature text)"""
+    if term == 'unlimited_data':
+        return record.unlimited_data
+    if term in record.ott_bundles:
+        return True
+    return any(term in str(feature).lower() for feature in record.features)
+
+
+def _k_pareto(items, k, blockers=()):
+    """Items (cost, value, ...) not beaten on both cost and value by k others.
+
+    ``blockers`` are items that count as competitors but are not returned
+    (the kept items of masks covering more terms).
+    """
+    merged = [(item[0], -item[1], 0, item) for item in blockers]
+    merged.extend((item[0], -item[1], 1, item) for item in items)
+    merged.sort(key=lambda entry: entry[:3])
+    best = []
+    kept = []
+    for _, negative, is_item, item in merged:
+        value = -negative
+        if is_item and not (len(best) < k or value > best[0]):
+            continue
+        if is_item:
+            kept.append(item)
+        insort(best, value)
+        if len(best) > k:
+            best.pop(0)
+    return kept
+
+
+def _prune(by_mask, k):
+    """k-Pareto cut per mask, where partials of superset masks also compete"""
+    kept = {}
+    for mask in sorted(by_mask, key=lambda mask: -bin(mask).count('1')):
+        blockers = [item for other, items in kept.items() if other & mask == mask for item in items]
+        kept[mask] = _k_pareto(by_mask[mask], k, blockers)
+    return {mask: items for mask, items in kept.items() if items}
+
+
+def optimize_bundles(groups, budget, must_have=(), limit=DEFAULT_BUNDLE_LIMIT, require_all=True,
+                     values=None, coverage=None):
+    """Top ``limit`` (value, cost, records) bundles taking one record from each group.
+
+    ``groups`` is a list of record sequences. With ``require_all`` False a
+    group may be skipped, but a bundle holds at least one plan. ``values``
+    ({plan id: plan_value}) and ``coverage`` ({term: ids covering it}) may be
+    passed in precomputed.
+    """
+    full_mask = (1 << len(must_have)) - 1
+    if values is None:
+        values = {record.id: plan_value(record) for records in groups for record in records}
+    if coverage is None:
+        coverage = {
+            term: {record.id for records in groups for record in records if covers(record, term)}
+            for term in must_have
+        }
+    covering = [coverage[term] for term in must_have]
+
+    options_per_group = []
+    for records in groups:
+        candidates = {}
+        for record in records:
+            if record.price > budget:
+                continue
+            mask = 0
+            for bit, plan_ids in enumerate(covering):
+                if record.id in plan_ids:
+                    mask |= 1 << bit
+            candidates.setdefault(mask, []).append((record.price, values[record.id], record))
+        options = [
+            (cost, value, record, mask)
+            for mask, items in _prune(candidates, limit).items() for cost, value, record in items
+        ]
+        options.sort(key=lambda option: option[0])
+        options_per_group.append(options)
+
+    # Terms the groups after each position can still cover
+    reachable = [0] * (len(groups) + 1)
+    for position in range(len(groups) - 1, -1, -1):
+        reachable[position] = reachable[position + 1]
+        for option in options_per_group[position]:
+            reachable[position] |= option[3]
+
+    states = {0: [(0.0, 0.0, ())]}
+    for position, options in enumerate(options_per_group[:-1]):
+        extended = {}
+        if not require_all:
+            extended = {mask: list(partials) for mask, partials in states.items()}
+        for mask, partials in states.items():
+            for cost, value, plans in partials:
+                for price, option_value, record, option_mask in options:
+                    total = cost + price
+                    if total > budget:
+                        break
+                    extended.setdefault(mask | option_mask, []).append(
+                        (total, value + option_value, plans + (record,))
+                    )
+        states = _prune({
+            mask: partials for mask, partials in extended.items()
+            if mask | reachable[position + 1] == full_mask
+        }, limit)
+        if not states:
+            return []
+
+    # Min-heap of (value, -cost, ids, bundle) holding the best ``limit`` bundles so far
+    top = []
+
+    def offer(value, cost, plans):
+        entry = (value, -cost, [-record.id for record in plans], (value, cost, plans))
+        if len(top) < limit:
+            heapq.heappush(top, entry)
+        elif entry[:3] > top[0][:3]:
+            heapq.heapreplace(top, entry)
+
+    if not require_all:
+        for cost, value, plans in states.get(full_mask, []):
+            if plans:
+                offer(value, cost, plans)
+
+    # Last category: per option mask, the best ``limit`` options among those up to each price,
+    # so every partial reads its completions with one bisect
+    by_mask = {}
+    for option in options_per_group[-1] if options_per_group else ():
+        by_mask.setdefault(option[3], []).append(option)
+    for option_mask, options in by_mask.items():
+        prices = [option[0] for option in options]
+        prefix_best = []
+        best = []
+        for option in options:
+            insort(best, (-option[1], option[0], option[2].id, option))
+            del best[limit:]
+            prefix_best.append(tuple(best))
+
+        for mask, partials in states.items():
+            if mask | option_mask != full_mask:
+                continue
+            for cost, value, plans in partials:
+                count = bisect_right(prices, budget - cost + 1e-9)
+                if not count:
+                    continue
+                for negative, price, _, option in prefix_best[count - 1]:
+                    if len(top) == limit and value - negative < top[0][0]:
+                        break
+                    offer(value - negative, cost + price, plans + (option[2],))
+
+    return [entry[3] for entry in sorted(top, reverse=True)]
@@ -0,0 +1,586 @@
+"""
+In-memory plan catalog snapshot.
+
+The catalog is a few dozen rows that change a handful of times a day, yet
+/api/plans is the busiest endpoint. Each worker process keeps an immutable
+``CatalogSnapshot`` of the plans (features already parsed) with secondary
+indexes by category and popularity plus a price-sorted array, and answers the
+catalog listings from it without running SQL.
+
+Freshness comes from a version stamp in the single-row ``catalog_state``
+table. Any ORM flush that inserts, updates or deletes a Plan bumps it in the
+same transaction; the committing process drops its snapshot immediately and
+other processes notice the new version within CATALOG_VERSION_CHECK_INTERVAL
+seconds (one primary-key read per interval, 0 = check on every request).
+Writes that bypass the ORM session must call ``bump_catalog_version``.
+
+Each version also gets rows in ``catalog_changes`` naming the plans it
+upserted or deleted, so ``GET /api/plans/changes?since=<version>`` can send a
+client only what changed. Versions bumped outside the ORM log a ``resync``
+row (the plans involved are unknown), which sends clients a full list.
+"""
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from flask import current_app, has_app_context
+from sqlalchemy import event, func, select
+from threading import Lock
+from app.plan_attributes import NUMERIC_ATTRIBUTES
+from app.suggest import SuggestIndex, SUGGEST_LIMIT
+from app.plan_compare import FeatureVocabulary
+from app.bundle_optimizer import optimize_bundles, plan_value, covers, DEFAULT_BUNDLE_LIMIT, OPTIMIZE_CACHE_SIZE
+import json
+import os
+import time
+
+PLAN_RECORD_FIELDS = (
+    'id', 'name', 'category', 'price', 'currency', 'duration', 'features',
+    'description', 'is_popular', 'is_available', 'created_at', 'updated_at'
+)
+
+# Typed attributes joined in from plan_attributes (see app/plan_attributes.py)
+ATTRIBUTE_FIELDS = (
+    'daily_data_gb', 'unlimited_data', 'speed_mbps', 'validity_days', 'sms_per_day', 'ott_bundles'
+)
+
+CATALOG_STATE_ID = 1
+
+# Catalog versions kept in catalog_changes; older ones are pruned every PRUNE_CHANGES_EVERY versions
+CATALOG_CHANGES_RETAINED = 1000
+PRUNE_CHANGES_EVERY = 100
+
+# Distinct search queries remembered per snapshot
+SEARCH_CACHE_SIZE = 512
+
+# Price bands (INR) for the facet sidebar: (value, label, low inclusive, high exclusive)
+PRICE_BANDS = (
+    ('under_500', 'Under 500', 0, 500),
+    ('500_999', '500 - 999', 500, 1000),
+    ('1000_1999', '1000 - 1999', 1000, 2000),
+    ('2000_plus', '2000 and above', 2000, None),
+)
+
+FACETS = ('category', 'price_band', 'popular', 'duration')
+
+
+class PlanRecord:
+    """Immutable copy of a plans row with the features list parsed"""
+
+    __slots__ = PLAN_RECORD_FIELDS + ATTRIBUTE_FIELDS + ('search_text',)
+
+    def __init__(self, **fields):
+        for name in PLAN_RECORD_FIELDS + ATTRIBUTE_FIELDS:
+            object.__setattr__(self, name, fields.get(name))
+        object.__setattr__(self, 'features', _parse_features(fields.get('features')))
+        object.__setattr__(self, 'unlimited_data', bool(fields.get('unlimited_data')))
+        object.__setattr__(self, 'ott_bundles', tuple(filter(None, (fields.get('ott_bundles') or '').split(','))))
+        object.__setattr__(self, 'search_text', f"{self.name or ''}\n{self.description or ''}".lower())
+
+    def __setattr__(self, name, value):
+        raise AttributeError('PlanRecord is read-only')
+
+    def get_features(self):
+        return list(self.features)
+
+    def to_dict(self):
+        """Same shape as Plan.to_dict()"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'category': self.category,
+            'price': self.price,
+            'currency': self.currency,
+            'duration': self.duration,
+            'features': list(self.features),
+            'description': self.description,
+            'is_popular': self.is_popular,
+            'is_available': self.is_available,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None
+        }
+
+    def attributes_dict(self):
+        """Same shape as PlanAttributes.to_dict()"""
+        return {
+            'daily_data_gb': self.daily_data_gb,
+            'unlimited_data': self.unlimited_data,
+            'speed_mbps': self.speed_mbps,
+            'validity_days': self.validity_days,
+            'sms_per_day': self.sms_per_day,
+            'ott_bundles': list(self.ott_bundles)
+        }
+
+    def to_summary(self):
+        """The shorter shape used by /api/optimized-plans"""
+        return {
+            'id': self.id,
+            'name': self.name,
+            'category': self.category,
+            'price': self.price,
+            'currency': self.currency,
+            'features': list(self.features),
+            'description': self.description,
+            'is_popular': self.is_popular
+        }
+
+    def __repr__(self):
+        return f'<PlanRecord {self.name}>'
+
+
+def _parse_features(features):
+    if isinstance(features, (list, tuple)):
+        return tuple(features)
+    try:
+        return tuple(json.loads(features)) if features else ()
+    except (TypeError, ValueError):
+        return ()
+
+
+def price_band(price):
+    """The PRICE_BANDS value a price falls into"""
+    for value, _, low, high in PRICE_BANDS:
+        if price >= low and (high is None or price < high):
+            return value
+    return PRICE_BANDS[0][0]
+
+
+def _catalog_key(record):
+    # Listing order: popular first, then cheapest (id keeps ties stable)
+    return (not record.is_popular, record.price, record.id)
+
+
+def _price_key(record):
+    return (record.price, record.id)
+
+
+class CatalogSnapshot:
+    """One version of the catalog with its secondary indexes"""
+
+    def __init__(self, version, records):
+        self.version = version
+        self.built_at = time.time()
+        self.by_id = {record.id: record for record in records}
+
+        # Only available plans are listed
+        available = [record for record in records if record.is_available]
+        self.plans = tuple(sorted(available, key=_catalog_key))
+        self._rank = {record.id: position for position, record in enumerate(self.plans)}
+
+        by_category = {}
+        for record in self.plans:
+            by_category.setdefault(record.category, []).append(record)
+        self.by_category = {category: tuple(plans) for category, plans in by_category.items()}
+
+        self.popular = tuple(sorted((record for record in available if record.is_popular), key=_price_key))
+        self.by_price = tuple(sorted(available, key=_price_key))
+        self.prices = [record.price for record in self.by_price]
+        self._bands = {record.id: price_band(record.price) for record in available}
+
+        # Sorted (value, id) arrays per numeric attribute for the min_* filters
+        self._attribute_index = {}
+        for name in NUMERIC_ATTRIBUTES:
+            pairs = sorted((getattr(record, name), record.id) for record in available
+                           if getattr(record, name) is not None)
+            self._attribute_index[name] = ([value for value, _ in pairs], [plan_id for _, plan_id in pairs])
+        self._unlimited_data = frozenset(record.id for record in available if record.unlimited_data)
+
+        self.by_ott = {}
+        for record in available:
+            for service in record.ott_bundles:
+                self.by_ott.setdefault(service, set()).add(record.id)
+
+        # Full-text results memoized for this version (see search())
+        self._search_results = {}
+
+        # Typeahead index, built on the first suggest() call
+        self._suggest_index = None
+
+        # Interned feature ids and per-plan bitsets, built on the first comparison
+        self._feature_vocabulary = None
+
+        # Bundle optimizer answers, plan values and must_have coverage memoized for this version
+        self._optimize_results = {}
+        self._plan_values = None
+        self._coverage = {}
+
+    def get(self, plan_id, include_unavailable=False):
+        record = self.by_id.get(plan_id)
+        if record is None or (not record.is_available and not include_unavailable):
+            return None
+        return record
+
+    def price_range(self, min_price=None, max_price=None):
+        """Available plans priced within [min_price, max_price], cheapest first"""
+        start = bisect_left(self.prices, min_price) if min_price is not None else 0
+        end = bisect_right(self.prices, max_price) if max_price is not None else len(self.prices)
+        return self.by_price[start:end]
+
+    def query(self, category=None, popular_only=False, search=None,
+              min_price=None, max_price=None, limit=None, ranked_ids=None,
+              minimums=None, ott=None):
+        """Filter the listing like the old SQL did; results keep the listing order.
+
+        ``ranked_ids`` (from the full-text index) replaces the substring
+        ``search`` and orders the results by relevance instead. ``minimums``
+        maps numeric attributes to their lowest accepted value.
+        """
+        if ranked_ids is not None:
+            plans = [self.by_id[plan_id] for plan_id in ranked_ids
+                     if plan_id in self.by_id and self.by_id[plan_id].is_available]
+            if category:
+                plans = [plan for plan in plans if plan.category == category]
+            search = None
+        elif category:
+            plans = self.by_category.get(category, ())
+        elif popular_only:
+            plans = self.popular
+        elif min_price is not None or max_price is not None:
+            plans = sorted(self.price_range(min_price, max_price), key=lambda plan: self._rank[plan.id])
+            min_price = max_price = None
+        else:
+            plans = self.plans
+
+        if popular_only and (category or ranked_ids is not None):
+            plans = [plan for plan in plans if plan.is_popular]
+        allowed = self.matching_attributes(minimums, ott) if minimums or ott else None
+        if allowed is not None:
+            plans = [plan for plan in plans if plan.id in allowed]
+        if min_price is not None:
+            plans = [plan for plan in plans if plan.price >= min_price]
+        if max_price is not None:
+            plans = [plan for plan in plans if plan.price <= max_price]
+        if search:
+            needle = search.lower()
+            plans = [plan for plan in plans if needle in plan.search_text]
+
+        plans = list(plans)
+        return plans[:limit] if limit else plans
+
+    def matching_attributes(self, minimums=None, ott=None):
+        """Ids of available plans meeting every attribute minimum (and OTT service)"""
+        allowed = None
+        for name, minimum in (minimums or {}).items():
+            values, plan_ids = self._attribute_index[name]
+            matched = set(plan_ids[bisect_left(values, minimum):])
+            if name == 'daily_data_gb':
+                matched |= self._unlimited_data
+            allowed = matched if allowed is None else allowed & matched
+        if ott:
+            matched = self.by_ott.get(ott, set())
+            allowed = set(matched) if allowed is None else allowed & matched
+        return allowed
+
+    def cached_search(self, query):
+        return self._search_results.get(' '.join(query.lower().split()))
+
+    def remember_search(self, query, ranked_ids):
+        if ranked_ids is not None and len(self._search_results) < SEARCH_CACHE_SIZE:
+            self._search_results[' '.join(query.lower().split())] = ranked_ids
+
+    def search(self, query, lookup):
+        """Ranked plan ids for a search query, calling ``lookup(query)`` once per version"""
+        ranked_ids = self.cached_search(query)
+        if ranked_ids is None:
+            ranked_ids = lookup(query)
+            self.remember_search(query, ranked_ids)
+        return ranked_ids
+
+    def suggest(self, prefix, category=None, limit=SUGGEST_LIMIT):
+        """Completions of ``prefix`` over plan names and features (see app/suggest.py)"""
+        if self._suggest_index is None:
+            self._suggest_index = SuggestIndex(self.plans)
+        return self._suggest_index.complete(prefix, category=category, limit=limit)
+
+    def feature_vocabulary(self):
+        """FeatureVocabulary over the available plans (see app/plan_compare.py)"""
+        if self._feature_vocabulary is None:
+            self._feature_vocabulary = FeatureVocabulary(self.plans)
+        return self._feature_vocabulary
+
+    def optimize(self, budget, categories=None, must_have=(), limit=DEFAULT_BUNDLE_LIMIT):
+        """Best (value, cost, records) bundles within budget (see app/bundle_optimizer.py).
+
+        With ``categories`` one plan is taken from each; without, at most one
+        from every category.
+        """
+        key = (budget, tuple(categories or ()), tuple(must_have), limit)
+        bundles = self._optimize_results.get(key)
+        if bundles is None:
+            if self._plan_values is None:
+                self._plan_values = {record.id: plan_value(record) for record in self.plans}
+            for term in must_have:
+                if term not in self._coverage and len(self._coverage) < OPTIMIZE_CACHE_SIZE:
+                    self._coverage[term] = frozenset(record.id for record in self.plans if covers(record, term))
+            coverage = {
+                term: self._coverage.get(term) or {record.id for record in self.plans if covers(record, term)}
+                for term in must_have
+            }
+            groups = [self.by_category.get(category, ()) for category in (categories or sorted(self.by_category))]
+            bundles = optimize_bundles(groups, budget, must_have=tuple(must_have), limit=limit,
+                                       require_all=bool(categories), values=self._plan_values, coverage=coverage)
+            if len(self._optimize_results) < OPTIMIZE_CACHE_SIZE:
+                self._optimize_results[key] = bundles
+        return bundles
+
+    def faceted(self, category=None, price_band=None, popular=None, duration=None,
+                search=None, ranked_ids=None):
+        """Filtered listing plus facet counts, in one pass over the snapshot.
+
+        Each facet is counted over the plans that match every *other* active
+        filter, so the sidebar shows how many results picking a value gives.
+        """
+        if ranked_ids is not None:
+            plans = [self.by_id[plan_id] for plan_id in ranked_ids
+                     if plan_id in self.by_id and self.by_id[plan_id].is_available]
+        elif search:
+            needle = search.lower()
+            plans = [plan for plan in self.plans if needle in plan.search_text]
+        else:
+            plans = self.plans
+
+        selected = {'category': category, 'price_band': price_band, 'popular': popular, 'duration': duration}
+        active = [facet for facet in FACETS if selected[facet] is not None]
+        counts = {facet: {} for facet in FACETS}
+        results = []
+
+        for plan in plans:
+            values = {
+                'category': plan.category,
+                'price_band': self._bands[plan.id],
+                'popular': bool(plan.is_popular),
+                'duration': plan.duration
+            }
+            misses = [facet for facet in active if values[facet] != selected[facet]]
+            if len(misses) > 1:
+                continue
+            if not misses:
+                results.append(plan)
+            for facet in (misses or FACETS):
+                facet_counts = counts[facet]
+                facet_counts[values[facet]] = facet_counts.get(values[facet], 0) + 1
+
+        facets = {
+            'category': [{
+                'value': value,
+                'display_name': value.replace('_', ' ').title(),
+                'count': counts['category'][value]
+            } for value in sorted(counts['category'])],
+            'price_band': [{
+                'value': value,
+                'label': label,
+                'min': low,
+                'max': high,
+                'count': counts['price_band'].get(value, 0)
+            } for value, label, low, high in PRICE_BANDS],
+            'popular': [{'value': value, 'count': counts['popular'].get(value, 0)} for value in (True, False)],
+            'duration': [{
+                'value': value,
+                'count': counts['duration'][value]
+            } for value in sorted(counts['duration'], key=str)]
+        }
+        return results, facets
+
+    def categories(self):
+        """Category listing in the /categories response shape"""
+        return [{
+            'name': category,
+            'count': len(self.by_category[category]),
+            'display_name': category.replace('_', ' ').title()
+        } for category in sorted(self.by_category)]
+
+
+def _version_query():
+    from app.models.plan import CatalogState
+    return select(CatalogState.version).where(CatalogState.id == CATALOG_STATE_ID)
+
+
+def _plans_query():
+    from app.models.plan import Plan, PlanAttributes
+    columns = [getattr(Plan, name) for name in PLAN_RECORD_FIELDS]
+    columns += [getattr(PlanAttributes, name) for name in ATTRIBUTE_FIELDS]
+    return select(*columns).outerjoin(PlanAttributes, PlanAttributes.plan_id == Plan.id)
+
+
+class PlanCatalog:
+    """Holds the current snapshot and decides when to re-check the version"""
+
+    def __init__(self, check_interval=5.0):
+        self.check_interval = check_interval
+        self._snapshot = None
+        self._next_check = 0.0
+        self._lock = Lock()
+        self.rebuilds = 0
+        self.version_checks = 0
+
+    def _is_current(self):
+        return self._snapshot is not None and time.monotonic() < self._next_check
+
+    def _install(self, version, rows):
+        if rows is not None:
+            self._snapshot = CatalogSnapshot(version, [PlanRecord(**row._asdict()) for row in rows])
+            self.rebuilds += 1
+        self._next_check = time.monotonic() + self.check_interval
+        return self._snapshot
+
+    def snapshot(self, session):
+        """Current snapshot; reads the version (and rebuilds) only when a check is due"""
+        snapshot = self._snapshot
+        if self._is_current():
+            return snapshot
+
+        with self._lock:
+            if self._is_current():
+                return self._snapshot
+            self.version_checks += 1
+            version = session.execute(_version_query()).scalar() or 0
+            if self._snapshot is not None and self._snapshot.version == version:
+                return self._install(version, None)
+            return self._install(version, session.execute(_plans_query()).all())
+
+    async def snapshot_async(self, session):
+        """``snapshot`` for an AsyncSession"""
+        if self._is_current():
+            return self._snapshot
+
+        self.version_checks += 1
+        version = (await session.execute(_version_query())).scalar() or 0
+        if self._snapshot is not None and self._snapshot.version == version:
+            return self._install(version, None)
+        return self._install(version, (await session.execute(_plans_query())).all())
+
+    def invalidate(self):
+        self._next_check = 0.0
+
+    def stats(self):
+        snapshot = self._snapshot
+        return {
+            'version': snapshot.version if snapshot else None,
+            'plans': len(snapshot.plans) if snapshot else 0,
+            'built_at': snapshot.built_at if snapshot else None,
+            'check_interval_seconds': self.check_interval,
+            'rebuilds': self.rebuilds,
+            'version_checks': self.version_checks
+        }
+
+
+def catalog_from_env():
+    return PlanCatalog(check_interval=float(os.environ.get('CATALOG_VERSION_CHECK_INTERVAL', 5)))
+
+
+def current_catalog():
+    """The catalog snapshot for the current request"""
+    from app import db
+    return current_app.extensions['plan_catalog'].snapshot(db.session)
+
+
+def bump_catalog_version(connection, resync=True):
+    """Advance the catalog version inside the caller's transaction; returns the new version.
+
+    With ``resync`` (writes outside the ORM) the change log records that
+    clients behind this version need the full list.
+    """
+    from app.models.plan import CatalogState, CatalogChange
+    table = CatalogState.__table__
+    result = connection.execute(
+        table.update().where(table.c.id == CATALOG_STATE_ID)
+        .values(version=table.c.version + 1, updated_at=datetime.utcnow())
+    )
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(
+            id=CATALOG_STATE_ID, version=initial_version(), updated_at=datetime.utcnow()
+        ))
+    version = connection.execute(_version_query()).scalar()
+
+    changes = CatalogChange.__table__
+    if resync:
+        connection.execute(changes.insert().values(version=version, plan_id=None, change='resync',
+                                                   changed_at=datetime.utcnow()))
+    if version % PRUNE_CHANGES_EVERY == 0:
+        connection.execute(changes.delete().where(changes.c.version <= version - CATALOG_CHANGES_RETAINED))
+    return version
+
+
+def changes_since(session, since, version):
+    """(full_resync, changed plan ids) for catalog versions after ``since`` up to ``version``"""
+    from app.models.plan import CatalogChange
+    if since == version:
+        return False, []
+    if since <= 0 or since > version:
+        return True, []
+
+    table = CatalogChange.__table__
+    oldest = session.execute(select(func.min(table.c.version))).scalar()
+    if oldest is None or since < oldest - 1:
+        # The versions in between were pruned (or never logged)
+        return True, []
+
+    rows = session.execute(
+        select(table.c.plan_id, table.c.change)
+        .where(table.c.version > since, table.c.version <= version)
+        .order_by(table.c.id)
+    ).all()
+    if any(change == 'resync' for _, change in rows):
+        return True, []
+    return False, list(dict.fromkeys(plan_id for plan_id, _ in rows))
+
+
+def initial_version():
+    # Seeded from the clock so a recreated catalog_state never repeats an old version
+    return int(time.time())
+
+
+def _bump_on_plan_change(session, flush_context, instances):
+    from app.models.plan import Plan
+    changed = (
+        any(isinstance(obj, Plan) for obj in session.new)
+        or any(isinstance(obj, Plan) for obj in session.deleted)
+        or any(isinstance(obj, Plan) and session.is_modified(obj) for obj in session.dirty)
+    )
+    if changed and not session.info.get('catalog_changed'):
+        session.info['catalog_version'] = bump_catalog_version(session.connection(), resync=False)
+        session.info['catalog_changed'] = True
+
+
+def _log_plan_changes(session, flush_context):
+    # After the flush so new plans have their ids
+    from app.models.plan import Plan, CatalogChange
+    version = session.info.get('catalog_version')
+    if version is None:
+        return
+    now = datetime.utcnow()
+    rows = [
+        {'version': version, 'plan_id': obj.id, 'change': 'upsert', 'changed_at': now}
+        for obj in list(session.new) + list(session.dirty)
+        if isinstance(obj, Plan) and (obj in session.new or session.is_modified(obj))
+    ]
+    rows.extend(
+        {'version': version, 'plan_id': obj.id, 'change': 'delete', 'changed_at': now}
+        for obj in session.deleted if isinstance(obj, Plan)
+    )
+    if rows:
+        session.connection().execute(CatalogChange.__table__.insert(), rows)
+
+
+def _invalidate_on_commit(session):
+    session.info.pop('catalog_version', None)
+    if session.info.pop('catalog_changed', False) and has_app_context():
+        catalog = current_app.extensions.get('plan_catalog')
+        if catalog is not None:
+            catalog.invalidate()
+
+
+def _discard_on_rollback(session):
+    session.info.pop('catalog_changed', None)
+    session.info.pop('catalog_version', None)
+
+
+def init_plan_catalog(app):
+    """Attach a PlanCatalog to the app and bump the version on Plan writes"""
+    from app.db_router import RoutingSession
+
+    app.extensions['plan_catalog'] = catalog_from_env()
+
+    if not event.contains(RoutingSession, 'before_flush', _bump_on_plan_change):
+        event.listen(RoutingSession, 'before_flush', _bump_on_plan_change)
+        event.listen(RoutingSession, 'after_flush', _log_plan_changes)
+        event.listen(RoutingSession, 'after_commit', _invalidate_on_commit)
+        event.listen(RoutingSession, 'after_rollback', _discard_on_rollback)
@@ -0,0 +1,195 @@
+"""
+Database connection pool configuration and telemetry.
+
+Pool settings come from environment variables (DB_POOL_SIZE, DB_MAX_OVERFLOW,
+DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING). Each engine gets a
+PoolMonitor fed by pool events; /api/health/detailed reports its snapshot.
+"""
+import os
+import threading
+import time
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+# Upper bounds (ms) of the checkout wait-time histogram buckets
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 5000)
+
+# Defaults for server databases (PostgreSQL); SQLite keeps SQLAlchemy's defaults
+_SERVER_POOL_DEFAULTS = {
+    'pool_size': 10,
+    'max_overflow': 20,
+    'pool_timeout': 30,
+    'pool_recycle': 1800,
+    'pool_pre_ping': True
+}
+
+_ENV_SETTINGS = (
+    ('DB_POOL_SIZE', 'pool_size', int),
+    ('DB_MAX_OVERFLOW', 'max_overflow', int),
+    ('DB_POOL_TIMEOUT', 'pool_timeout', float),
+    ('DB_POOL_RECYCLE', 'pool_recycle', int),
+    ('DB_POOL_PRE_PING', 'pool_pre_ping', lambda value: value.lower() == 'true'),
+)
+
+
+def is_memory_sqlite(database_uri):
+    return database_uri.startswith('sqlite') and (':memory:' in database_uri or database_uri.rstrip('/') == 'sqlite:')
+
+
+def engine_options_from_env(database_uri):
+    """Build SQLALCHEMY_ENGINE_OPTIONS for the given database URI"""
+    if is_memory_sqlite(database_uri):
+        # Single shared connection (StaticPool), nothing to tune
+        return {}
+
+    options = {} if database_uri.startswith('sqlite') else dict(_SERVER_POOL_DEFAULTS)
+    for env_name, option, convert in _ENV_SETTINGS:
+        value = os.environ.get(env_name)
+        if value is not None and value.strip() != '':
+            options[option] = convert(value.strip())
+
+    options['poolclass'] = InstrumentedQueuePool
+    return options
+
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that reports how long each checkout waited for a connection"""
+
+    monitor = None
+
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            connection = super().connect()
+        except PoolTimeoutError:
+            if self.monitor is not None:
+                self.monitor.record_timeout(time.perf_counter() - started)
+            raise
+        if self.monitor is not None:
+            self.monitor.record_wait(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # engine.dispose() swaps in a fresh pool; keep reporting to the same monitor
+        pool = super().recreate()
+        pool.monitor = self.monitor
+        return pool
+
+
+class PoolMonitor:
+    """Thread-safe counters for one engine's connection pool"""
+
+    def __init__(self, engine, name='primary'):
+        self.engine = engine
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.soft_invalidations = 0
+        self.timeouts = 0
+        self.peak_in_use = 0
+        self.wait_count = 0
+        self.wait_total_ms = 0.0
+        self.wait_max_ms = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS_MS) + 1)
+
+    def record_wait(self, seconds):
+        wait_ms = seconds * 1000
+        bucket = len(WAIT_BUCKETS_MS)
+        for index, upper in enumerate(WAIT_BUCKETS_MS):
+            if wait_ms <= upper:
+                bucket = index
+                break
+
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+            self.wait_buckets[bucket] += 1
+
+    def record_timeout(self, seconds):
+        with self._lock:
+            self.timeouts += 1
+        self.record_wait(seconds)
+
+    def _on_connect(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy):
+        in_use = self.in_use() or 0
+        with self._lock:
+            self.checkouts += 1
+            self.peak_in_use = max(self.peak_in_use, in_use)
+
+    def _on_checkin(self, dbapi_connection, connection_record):
+        with self._lock:
+            self.checkins += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.invalidations += 1
+
+    def _on_soft_invalidate(self, dbapi_connection, connection_record, exception):
+        with self._lock:
+            self.soft_invalidations += 1
+
+    def in_use(self):
+        checkedout = getattr(self.engine.pool, 'checkedout', None)
+        return checkedout() if checkedout else None
+
+    def snapshot(self):
+        """Current pool state and counters as a dictionary"""
+        pool = self.engine.pool
+        with self._lock:
+            histogram = {f'le_{upper}ms': count for upper, count in zip(WAIT_BUCKETS_MS, self.wait_buckets)}
+            histogram['gt_{}ms'.format(WAIT_BUCKETS_MS[-1])] = self.wait_buckets[-1]
+
+            data = {
+                'name': self.name,
+                'pool_class': type(pool).__name__,
+                'checkouts': self.checkouts,
+                'checkins': self.checkins,
+                'connects': self.connects,
+                'invalidations': self.invalidations,
+                'soft_invalidations': self.soft_invalidations,
+                'timeouts': self.timeouts,
+                'peak_in_use': self.peak_in_use,
+                'checkout_wait': {
+                    'count': self.wait_count,
+                    'avg_ms': round(self.wait_total_ms / self.wait_count, 3) if self.wait_count else 0,
+                    'max_ms': round(self.wait_max_ms, 3),
+                    'histogram': histogram
+                }
+            }
+
+        if isinstance(pool, QueuePool):
+            data.update({
+                'size': pool.size(),
+                'in_use': pool.checkedout(),
+                'idle': pool.checkedin(),
+                'overflow': max(pool.overflow(), 0)
+            })
+        return data
+
+
+def instrument_engine(engine, name='primary'):
+    """Attach a PoolMonitor to an engine's pool events"""
+    monitor = PoolMonitor(engine, name)
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        engine.pool.monitor = monitor
+
+    event.listen(engine, 'connect', monitor._on_connect)
+    event.listen(engine, 'checkout', monitor._on_checkout)
+    event.listen(engine, 'checkin', monitor._on_checkin)
+    event.listen(engine, 'invalidate', monitor._on_invalidate)
+    event.listen(engine, 'soft_invalidate', monitor._on_soft_invalidate)
+    return monitor
+
+
+def get_pool_monitors(app):
+    """All pool monitors registered for an app, keyed by name"""
+    return app.extensions.get('pool_monitors', {})
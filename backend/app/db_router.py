@@ -0,0 +1,147 @@
+"""
+Read-replica routing.
+
+When DATABASE_REPLICA_URLS is set, GET endpoints decorated with
+``@read_replica`` run their queries on a replica chosen round-robin or by
+least connections (DATABASE_REPLICA_STRATEGY). Flushes and writes always use
+the primary, and a user who has just written is kept on the primary for
+REPLICA_STICKY_SECONDS so they read their own writes. The sticky window is
+tracked per worker process.
+"""
+from flask import current_app, g, has_app_context, request
+from flask_jwt_extended import get_jwt_identity
+from flask_sqlalchemy.session import Session as FlaskSession
+from functools import wraps
+from sqlalchemy import create_engine, event
+import itertools
+import threading
+import time
+
+
+class RoutingSession(FlaskSession):
+    """Session that sends reads to a replica when the request allows it"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_app_context() and g.get('_db_use_replica'):
+            router = current_app.extensions.get('db_router')
+            if router is not None:
+                engine = g.get('_db_replica_engine')
+                if engine is None:
+                    # One replica per request keeps its reads consistent
+                    engine = g._db_replica_engine = router.pick_engine()
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class ReplicaRouter:
+    """Holds the replica engines and the read-your-writes window"""
+
+    STRATEGIES = ('round_robin', 'least_connections')
+
+    def __init__(self, engines, strategy='round_robin', sticky_seconds=5.0):
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown replica strategy '{strategy}', expected one of {self.STRATEGIES}")
+
+        self.engines = list(engines)
+        self.strategy = strategy
+        self.sticky_seconds = sticky_seconds
+        self._cycle = itertools.cycle(range(len(self.engines)))
+        self._lock = threading.Lock()
+        self._recent_writers = {}
+
+    def pick_engine(self):
+        if self.strategy == 'least_connections':
+            return min(self.engines, key=lambda engine: getattr(engine.pool, 'checkedout', lambda: 0)())
+        with self._lock:
+            return self.engines[next(self._cycle)]
+
+    def mark_write(self, user_id):
+        if user_id is None or self.sticky_seconds <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._recent_writers[str(user_id)] = now + self.sticky_seconds
+            if len(self._recent_writers) > 10000:
+                self._recent_writers = {
+                    key: until for key, until in self._recent_writers.items() if until > now
+                }
+
+    def is_sticky(self, user_id):
+        if user_id is None:
+            return False
+        until = self._recent_writers.get(str(user_id))
+        return until is not None and until > time.monotonic()
+
+
+def _current_identity():
+    """JWT identity of the current request, if it has been verified"""
+    try:
+        return get_jwt_identity()
+    except RuntimeError:
+        return None
+
+
+def read_replica(f):
+    """Allow a read-only endpoint to run its queries on a replica"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        router = current_app.extensions.get('db_router')
+        if router is None or request.method not in ('GET', 'HEAD') or router.is_sticky(_current_identity()):
+            return f(*args, **kwargs)
+
+        g._db_use_replica = True
+        try:
+            return f(*args, **kwargs)
+        finally:
+            g.pop('_db_use_replica', None)
+            g.pop('_db_replica_engine', None)
+    return decorated_function
+
+
+def _track_flush(session, flush_context):
+    session.info['has_writes'] = True
+
+
+def _track_commit(session):
+    if not session.info.pop('has_writes', False):
+        return
+    if has_app_context():
+        router = current_app.extensions.get('db_router')
+        if router is not None:
+            router.mark_write(_current_identity())
+
+
+def _clear_writes(session):
+    session.info.pop('has_writes', None)
+
+
+def init_replicas(app, replica_urls):
+    """Create replica engines and register the router on the app"""
+    from app.db_pool import engine_options_from_env, instrument_engine
+    from app.sqlite_tuning import configure_sqlite
+
+    urls = [url.strip() for url in replica_urls.split(',') if url.strip()]
+    if not urls:
+        return None
+
+    engines = []
+    monitors = app.extensions.setdefault('pool_monitors', {})
+    for index, url in enumerate(urls):
+        engine = create_engine(url, **engine_options_from_env(url))
+        monitors[f'replica_{index}'] = instrument_engine(engine, f'replica_{index}')
+        configure_sqlite(engine)
+        engines.append(engine)
+
+    router = ReplicaRouter(
+        engines,
+        strategy=app.config['DATABASE_REPLICA_STRATEGY'],
+        sticky_seconds=app.config['REPLICA_STICKY_SECONDS']
+    )
+    app.extensions['db_router'] = router
+
+    if not event.contains(RoutingSession, 'after_flush', _track_flush):
+        event.listen(RoutingSession, 'after_flush', _track_flush)
+        event.listen(RoutingSession, 'after_commit', _track_commit)
+        event.listen(RoutingSession, 'after_rollback', _clear_writes)
+
+    return router
@@ -0,0 +1,111 @@
+"""
+Shared plumbing for counters kept in step with ORM flushes.
+
+plan_stats (app/plan_stats.py) and the per-user account summary
+(app/account_summary.py) both turn every flushed insert, update or delete
+of a tracked model into deltas and upsert them in the same transaction.
+Each describes what it tracks as ``{model: (attribute keys, contribution)}``
+where ``contribution(*values)`` maps one row's attribute values to what it
+adds to the counters. This module provides the parts that are not specific
+to either:
+
+- ``track_attributes``: assigning to a tracked attribute of an expired
+  object loads the old value first (otherwise the history has nothing to
+  subtract), and deleted objects have their tracked values loaded before
+  the flush. Both are registered once per attribute, however many counters
+  track it.
+- ``for_each_contribution``: +1 for new rows, -1 for deleted rows, and -1
+  old / +1 new for rows whose tracked attributes changed.
+- ``upsert``: insert a counter row or add to the existing one.
+"""
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+
+# model -> attribute keys whose previous values are kept (shared by every tracker)
+_tracked_keys = {}
+
+
+def _keep_previous_value(target, value, oldvalue, initiator):
+    return value
+
+
+def _load_deleted_attributes(session, flush_context, instances):
+    # Deleted rows cannot be loaded after the flush, so make sure their values are in memory now
+    for obj in session.deleted:
+        for key in _tracked_keys.get(type(obj), ()):
+            getattr(obj, key)
+
+
+def track_attributes(tracked):
+    """Keep previous values available for every attribute in ``{model: (keys, contribution)}``"""
+    from app.db_router import RoutingSession
+
+    for model, (keys, _) in tracked.items():
+        registered = _tracked_keys.setdefault(model, set())
+        for key in keys:
+            if key not in registered:
+                event.listen(getattr(model, key), 'set', _keep_previous_value, active_history=True, retval=True)
+                registered.add(key)
+
+    if not event.contains(RoutingSession, 'before_flush', _load_deleted_attributes):
+        event.listen(RoutingSession, 'before_flush', _load_deleted_attributes)
+
+
+def previous_values(obj, keys):
+    """Attribute values as they were before this flush"""
+    state = inspect(obj)
+    values = []
+    for key in keys:
+        history = state.attrs[key].load_history()
+        if history.deleted:
+            values.append(history.deleted[0])
+        elif history.unchanged:
+            values.append(history.unchanged[0])
+        else:
+            values.append(getattr(obj, key))
+    return values
+
+
+def for_each_contribution(session, tracked, add):
+    """Call ``add(contribution, sign)`` for every tracked object in the flush being processed"""
+    for obj in session.new:
+        if type(obj) in tracked:
+            keys, contribution = tracked[type(obj)]
+            add(contribution(*[getattr(obj, key) for key in keys]), 1)
+
+    for obj in session.deleted:
+        if type(obj) in tracked:
+            keys, contribution = tracked[type(obj)]
+            add(contribution(*previous_values(obj, keys)), -1)
+
+    for obj in session.dirty:
+        if type(obj) in tracked:
+            keys, contribution = tracked[type(obj)]
+            state = inspect(obj)
+            if not any(state.attrs[key].history.has_changes() for key in keys):
+                continue
+            add(contribution(*previous_values(obj, keys)), -1)
+            add(contribution(*[getattr(obj, key) for key in keys]), 1)
+
+
+def upsert(connection, table, key_columns, values, increments, replace=()):
+    """Insert ``values``, or add the ``increments`` columns (and overwrite ``replace``) on an existing row"""
+    dialect = connection.dialect.name
+    if dialect in ('sqlite', 'postgresql'):
+        insert = (sqlite if dialect == 'sqlite' else postgresql).insert(table).values(**values)
+        set_ = {name: table.c[name] + insert.excluded[name] for name in increments}
+        set_.update({name: insert.excluded[name] for name in replace})
+        connection.execute(insert.on_conflict_do_update(
+            index_elements=[table.c[name] for name in key_columns], set_=set_
+        ))
+        return
+
+    condition = None
+    for name in key_columns:
+        clause = table.c[name] == values[name]
+        condition = clause if condition is None else condition & clause
+    update = {name: table.c[name] + values[name] for name in increments}
+    update.update({name: values[name] for name in replace})
+    result = connection.execute(table.update().where(condition).values(**update))
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(**values))
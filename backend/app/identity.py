@@ -0,0 +1,179 @@
+"""
+Cached identity loader for @jwt_required endpoints.
+
+flask_jwt_extended calls the user_lookup_loader once per protected request;
+it returns a lightweight ``UserRecord`` from a per-app TTL cache, so handlers
+read ``current_user`` instead of issuing ``User.query.get()`` on every call.
+Missing users get the same 404 the handlers used to return.
+
+Cached records are dropped when a commit changes or deletes a User row
+(profile update, password change, account deactivation). The cache is per
+worker process, so other workers may serve a changed record for at most
+IDENTITY_CACHE_TTL seconds.
+"""
+from flask import current_app, has_app_context, jsonify
+from sqlalchemy import event, select
+from threading import Lock
+import os
+import time
+
+USER_RECORD_FIELDS = (
+    'id', 'username', 'email', 'first_name', 'last_name', 'phone',
+    'created_at', 'updated_at', 'is_active'
+)
+
+
+class UserRecord:
+    """Read-only snapshot of the columns handlers need from a user"""
+
+    __slots__ = USER_RECORD_FIELDS
+
+    def __init__(self, **fields):
+        for name in USER_RECORD_FIELDS:
+            setattr(self, name, fields.get(name))
+
+    def get_current_plan(self):
+        """Get user's current active plan"""
+        from app.models.user import UserPlan
+        return UserPlan.query.filter_by(
+            user_id=self.id,
+            status='active'
+        ).order_by(UserPlan.activation_date.desc()).first()
+
+    def get_payment_history(self, limit=10):
+        """Get user's payment history"""
+        from app.models.plan import Transaction
+        return Transaction.query.filter_by(user_id=self.id).order_by(
+            Transaction.created_at.desc()
+        ).limit(limit).all()
+
+    def to_dict(self):
+        """Same shape as User.to_dict()"""
+        return {
+            'id': self.id,
+            'username': self.username,
+            'email': self.email,
+            'first_name': self.first_name,
+            'last_name': self.last_name,
+            'phone': self.phone,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'is_active': self.is_active
+        }
+
+    def __repr__(self):
+        return f'<UserRecord {self.username}>'
+
+
+class IdentityCache:
+    """Thread-safe TTL cache of UserRecord objects keyed by user id"""
+
+    def __init__(self, ttl=60.0, max_size=10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._records = {}
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id):
+        with self._lock:
+            entry = self._records.get(user_id)
+            if entry is not None and entry[1] > time.monotonic():
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            return None
+
+    def put(self, user_id, record):
+        if self.ttl <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._records) >= self.max_size:
+                self._records = {key: entry for key, entry in self._records.items() if entry[1] > now}
+                if len(self._records) >= self.max_size:
+                    self._records.clear()
+            self._records[user_id] = (record, now + self.ttl)
+
+    def invalidate(self, user_id):
+        with self._lock:
+            self._records.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._records.clear()
+
+    def stats(self):
+        return {'size': len(self._records), 'ttl_seconds': self.ttl, 'hits': self.hits, 'misses': self.misses}
+
+
+def load_user_record(user_id):
+    """Fetch the UserRecord for an id, from the cache when possible"""
+    from app import db
+    from app.models.user import User
+
+    try:
+        user_id = int(user_id)
+    except (TypeError, ValueError):
+        return None
+
+    cache = current_app.extensions['identity_cache']
+    record = cache.get(user_id)
+    if record is not None:
+        return record
+
+    columns = [getattr(User, name) for name in USER_RECORD_FIELDS]
+    row = db.session.execute(select(*columns).where(User.id == user_id)).first()
+    if row is None:
+        return None
+
+    record = UserRecord(**row._asdict())
+    cache.put(user_id, record)
+    return record
+
+
+def invalidate_user(user_id):
+    """Drop a user's cached record in this process"""
+    if has_app_context() and 'identity_cache' in current_app.extensions:
+        current_app.extensions['identity_cache'].invalidate(int(user_id))
+
+
+def _collect_changed_users(session, flush_context, instances):
+    from app.models.user import User
+    changed = session.info.setdefault('changed_user_ids', set())
+    for obj in list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User) and obj.id is not None:
+            changed.add(obj.id)
+
+
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop('changed_user_ids', ()):
+        invalidate_user(user_id)
+
+
+def _discard_changed_users(session):
+    session.info.pop('changed_user_ids', None)
+
+
+def init_identity_loader(app, jwt):
+    """Register the cached user lookup with the JWT extension"""
+    from app.db_router import RoutingSession
+
+    app.extensions['identity_cache'] = IdentityCache(
+        ttl=float(os.environ.get('IDENTITY_CACHE_TTL', 60)),
+        max_size=int(os.environ.get('IDENTITY_CACHE_SIZE', 10000))
+    )
+
+    @jwt.user_lookup_loader
+    def user_lookup_callback(jwt_header, jwt_data):
+        return load_user_record(jwt_data['sub'])
+
+    @jwt.user_lookup_error_loader
+    def user_lookup_error_callback(jwt_header, jwt_data):
+        return jsonify({'error': 'User not found'}), 404
+
+    if not event.contains(RoutingSession, 'before_flush', _collect_changed_users):
+        event.listen(RoutingSession, 'before_flush', _collect_changed_users)
+        event.listen(RoutingSession, 'after_commit', _invalidate_changed_users)
+        event.listen(RoutingSession, 'after_rollback', _discard_changed_users)
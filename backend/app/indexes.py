@@ -0,0 +1,178 @@
+"""
+Managed indexes for the route queries.
+
+The composite and partial indexes below match how the routes actually filter
+and sort (history and activity by user and date, dashboard and summary counts
+by user and status, catalog listing by availability/category/popularity/price).
+They are created by migration 2 and can be re-checked with
+``python manage.py indexes``, which also reports unused and redundant indexes:
+PostgreSQL from pg_stat_user_indexes, SQLite from EXPLAIN QUERY PLAN over the
+representative route queries.
+"""
+from app.models.plan import Plan, Transaction
+from app.models.user import UserPlan
+from datetime import datetime, timedelta
+from sqlalchemy import Index, func, inspect, select, text
+
+MANAGED_INDEXES = [
+    # Payment history, activity feed and dashboard "recent transactions"
+    Index('ix_transactions_user_created', Transaction.user_id, Transaction.created_at.desc()),
+    # Per-status counts and the completed-amount sum are answered from the index alone;
+    # the (user_id, status) prefix serves the status-filtered history as well
+    Index('ix_transactions_user_status_amount', Transaction.user_id, Transaction.status, Transaction.amount),
+    # Failed-payment notifications only ever look at failed rows
+    Index('ix_transactions_user_failed', Transaction.user_id, Transaction.created_at,
+          sqlite_where=text("status = 'failed'"), postgresql_where=text("status = 'failed'")),
+
+    # Active-plan counts and the expiring/expired plan checks
+    Index('ix_user_plans_user_status_renewal', UserPlan.user_id, UserPlan.status, UserPlan.renewal_date),
+    # My-plans and the activity feed, newest first
+    Index('ix_user_plans_user_created', UserPlan.user_id, UserPlan.created_at.desc()),
+
+    # Catalog listing: available plans by category, popular first, then by price
+    Index('ix_plans_catalog', Plan.is_available, Plan.category, Plan.is_popular.desc(), Plan.price),
+]
+
+MANAGED_TABLES = ('users', 'plans', 'user_plans', 'transactions')
+
+
+def representative_queries():
+    """The hot route queries, used to check which indexes the planner picks"""
+    now = datetime.utcnow()
+    user_id = 1
+    return [
+        ('payment_history', select(Transaction).filter_by(user_id=user_id)
+            .order_by(Transaction.created_at.desc()).limit(10)),
+        ('payment_history_by_status', select(Transaction).filter_by(user_id=user_id, status='failed')
+            .order_by(Transaction.created_at.desc()).limit(10)),
+        ('completed_count', select(func.count()).select_from(Transaction)
+            .filter_by(user_id=user_id, status='completed')),
+        ('total_spent', select(func.sum(Transaction.amount)).filter(
+            Transaction.user_id == user_id, Transaction.status == 'completed', Transaction.amount > 0)),
+        ('failed_payments', select(Transaction).filter(
+            Transaction.user_id == user_id, Transaction.status == 'failed',
+            Transaction.created_at >= now - timedelta(days=7))),
+        ('active_plans_count', select(func.count()).select_from(UserPlan)
+            .filter_by(user_id=user_id, status='active')),
+        ('expiring_plans', select(UserPlan).filter(
+            UserPlan.user_id == user_id, UserPlan.status == 'active',
+            UserPlan.renewal_date <= now + timedelta(days=7), UserPlan.renewal_date > now)),
+        ('my_plans', select(UserPlan).filter_by(user_id=user_id)
+            .order_by(UserPlan.created_at.desc()).limit(20)),
+        ('catalog_by_category', select(Plan).filter_by(is_available=True, category='mobile')
+            .order_by(Plan.is_popular.desc(), Plan.price.asc())),
+        ('popular_plans', select(Plan).filter_by(is_popular=True, is_available=True)
+            .order_by(Plan.price.asc())),
+    ]
+
+
+def ensure_indexes(connection):
+    """Create any managed index that is missing; returns the names created"""
+    created = []
+    inspector = inspect(connection)
+    existing = {
+        table: {index['name'] for index in inspector.get_indexes(table)}
+        for table in MANAGED_TABLES if inspector.has_table(table)
+    }
+
+    for index in MANAGED_INDEXES:
+        if index.table.name not in existing or index.name in existing[index.table.name]:
+            continue
+        index.create(connection, checkfirst=True)
+        created.append(index.name)
+    return created
+
+
+def list_indexes(connection):
+    """All non-primary-key indexes on the managed tables"""
+    inspector = inspect(connection)
+    managed = {index.name for index in MANAGED_INDEXES}
+    indexes = []
+    for table in MANAGED_TABLES:
+        if not inspector.has_table(table):
+            continue
+        for index in inspector.get_indexes(table):
+            indexes.append({
+                'name': index['name'],
+                'table': table,
+                'columns': [column for column in index['column_names'] if column],
+                'unique': bool(index.get('unique')),
+                'managed': index['name'] in managed
+            })
+    return indexes
+
+
+def _explain_sqlite(connection, statement):
+    compiled = statement.compile(dialect=connection.dialect, compile_kwargs={'literal_binds': True})
+    rows = connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {compiled}').all()
+    return [row[-1] for row in rows]
+
+
+def _pg_index_scans(connection):
+    rows = connection.execute(text(
+        'SELECT indexrelname, idx_scan FROM pg_stat_user_indexes WHERE relname = ANY(:tables)'
+    ), {'tables': list(MANAGED_TABLES)}).all()
+    return {row[0]: row[1] for row in rows}
+
+
+def index_report(connection):
+    """Existing, missing, unused and redundant indexes plus the plan of each hot query"""
+    indexes = list_indexes(connection)
+    names = {index['name'] for index in indexes}
+
+    # An index is redundant when its columns are a leading prefix of another index on the same table
+    redundant = []
+    for index in indexes:
+        if index['unique']:
+            continue
+        for other in indexes:
+            if (other is not index and other['table'] == index['table']
+                    and len(other['columns']) > len(index['columns'])
+                    and other['columns'][:len(index['columns'])] == index['columns']):
+                redundant.append({'name': index['name'], 'covered_by': other['name']})
+                break
+
+    queries = {}
+    if connection.dialect.name == 'sqlite':
+        used = set()
+        for label, statement in representative_queries():
+            plan = _explain_sqlite(connection, statement)
+            queries[label] = plan
+            for step in plan:
+                for name in names:
+                    if f'INDEX {name} ' in f'{step} ':
+                        used.add(name)
+        unused = sorted(name for name in names if name not in used)
+        usage_source = 'explain_query_plan'
+    elif connection.dialect.name == 'postgresql':
+        scans = _pg_index_scans(connection)
+        unused = sorted(name for name in names if scans.get(name, 0) == 0)
+        usage_source = 'pg_stat_user_indexes'
+    else:
+        unused = []
+        usage_source = None
+
+    return {
+        'dialect': connection.dialect.name,
+        'indexes': indexes,
+        'missing': [index.name for index in MANAGED_INDEXES if index.name not in names],
+        'unused': [name for name in unused if not any(i['name'] == name and i['unique'] for i in indexes)],
+        'redundant': redundant,
+        'usage_source': usage_source,
+        'query_plans': queries
+    }
+
+
+def print_index_report(report):
+    print(f"Indexes ({report['dialect']}):")
+    for index in report['indexes']:
+        flag = 'managed' if index['managed'] else 'other'
+        print(f"  {index['table']:<14} {index['name']:<40} ({', '.join(index['columns'])}) [{flag}]")
+
+    print(f"Missing managed indexes: {', '.join(report['missing']) or 'none'}")
+    print(f"Unused indexes ({report['usage_source']}): {', '.join(report['unused']) or 'none'}")
+    for item in report['redundant']:
+        print(f"Redundant: {item['name']} is covered by {item['covered_by']}")
+
+    for label, plan in report['query_plans'].items():
+        print(f"  {label:<28} {' | '.join(plan)}")
@@ -0,0 +1,89 @@
+"""
+Lazy startup mode (LAZY_STARTUP=true).
+
+Rarely used blueprints are not imported when the app is created. Their URL
+rules are registered up front with LazyView placeholders that import the
+real view function on first use, and Datadog setup is deferred until the
+first request.
+"""
+from importlib import import_module
+import threading
+
+# Blueprints deferred in lazy mode: blueprint name -> module, prefix and
+# (rule, view function, methods). Must match the routes declared in the module.
+LAZY_BLUEPRINTS = {
+    'optimized_plans': {
+        'module': 'app.routes.optimized_plan_routes',
+        'url_prefix': '/api/optimized-plans',
+        'routes': [
+            ('', 'get_plans_optimized', ['GET']),
+            ('/', 'get_plans_optimized', ['GET']),
+            ('/my-plans', 'get_user_plans_optimized', ['GET']),
+            ('/stats', 'get_plan_stats', ['GET']),
+            ('/popular', 'get_popular_plans_optimized', ['GET']),
+            ('/categories', 'get_categories_optimized', ['GET'])
+        ]
+    },
+    'health_admin': {
+        'module': 'app.routes.health_admin_routes',
+        'url_prefix': '/api/health',
+        'routes': [
+            ('/simulate-load', 'simulate_load', ['POST']),
+            ('/reset-data', 'reset_test_data', ['POST'])
+        ]
+    }
+}
+
+
+class LazyView:
+    """View placeholder that imports the real view function on first call"""
+
+    def __init__(self, import_name, attribute):
+        self.__module__ = import_name
+        self.__name__ = attribute
+        self._view = None
+        self._lock = threading.Lock()
+
+    @property
+    def view(self):
+        if self._view is None:
+            with self._lock:
+                if self._view is None:
+                    self._view = getattr(import_module(self.__module__), self.__name__)
+        return self._view
+
+    def __call__(self, *args, **kwargs):
+        return self.view(*args, **kwargs)
+
+
+def register_lazy_blueprints(app, names=None):
+    """Register placeholder URL rules for the deferred blueprints"""
+    for blueprint_name, spec in LAZY_BLUEPRINTS.items():
+        if names is not None and blueprint_name not in names:
+            continue
+
+        views = {}
+        for rule, attribute, methods in spec['routes']:
+            if attribute not in views:
+                views[attribute] = LazyView(spec['module'], attribute)
+            app.add_url_rule(
+                spec['url_prefix'] + rule,
+                endpoint=f'{blueprint_name}.{attribute}',
+                view_func=views[attribute],
+                methods=methods
+            )
+
+
+def run_on_first_request(app, fn):
+    """Run fn once, before the first request handled by this process"""
+    lock = threading.Lock()
+    state = {'done': False}
+
+    @app.before_request
+    def _run_once():
+        if state['done']:
+            return
+        with lock:
+            if not state['done']:
+                state['done'] = True
+                fn()
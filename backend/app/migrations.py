@@ -0,0 +1,231 @@
+"""
+Versioned schema migrations.
+
+Migrations run once per deploy through ``python manage.py migrate``. Each
+applied step is recorded in the ``schema_version`` table; worker processes
+only compare that version with ``latest_version()`` at startup.
+"""
+from app import db
+from sqlalchemy import inspect, text
+from datetime import datetime
+
+SCHEMA_VERSION_TABLE = 'schema_version'
+
+# Arbitrary key for the PostgreSQL advisory lock held while migrating
+_ADVISORY_LOCK_KEY = 726354001
+
+# Ordered list of (version, description, function)
+MIGRATIONS = []
+
+
+def migration(version, description):
+    """Register a migration step; steps must be idempotent"""
+    def decorator(fn):
+        MIGRATIONS.append((version, description, fn))
+        MIGRATIONS.sort(key=lambda step: step[0])
+        return fn
+    return decorator
+
+
+@migration(1, 'Baseline schema: users, plans, user_plans, transactions')
+def _baseline_schema(connection):
+    from app.models import User, Plan, UserPlan, Transaction
+    db.metadata.create_all(connection, tables=[
+        User.__table__,
+        Plan.__table__,
+        UserPlan.__table__,
+        Transaction.__table__
+    ])
+
+
+@migration(2, 'Composite and partial indexes for the route queries')
+def _route_indexes(connection):
+    from app.indexes import ensure_indexes
+    ensure_indexes(connection)
+
+
+@migration(3, 'Plan catalog version stamp (catalog_state)')
+def _catalog_state(connection):
+    from app.catalog import CATALOG_STATE_ID, initial_version
+    from app.models import CatalogState
+    table = CatalogState.__table__
+    db.metadata.create_all(connection, tables=[table])
+    if connection.execute(table.select().where(table.c.id == CATALOG_STATE_ID)).first() is None:
+        connection.execute(table.insert().values(
+            id=CATALOG_STATE_ID, version=initial_version(), updated_at=datetime.utcnow()
+        ))
+
+
+@migration(4, 'Full-text plan search index (FTS5 / tsvector + GIN)')
+def _plan_search_index(connection):
+    from app.plan_search import create_search_index
+    create_search_index(connection)
+
+
+@migration(5, 'Typed plan attributes parsed from features (plan_attributes)')
+def _plan_attributes(connection):
+    from app.models import PlanAttributes
+    from app.plan_attributes import backfill_attributes
+    db.metadata.create_all(connection, tables=[PlanAttributes.__table__])
+    backfill_attributes(connection)
+
+
+@migration(6, 'Per-plan subscriber and revenue counters (plan_stats)')
+def _plan_stats(connection):
+    from app.models import PlanStats
+    from app.plan_stats import reconcile_plan_stats
+    db.metadata.create_all(connection, tables=[PlanStats.__table__])
+    reconcile_plan_stats(connection)
+
+
+@migration(7, 'Decayed trending scores per plan and window (plan_trending)')
+def _plan_trending(connection):
+    from app.models import PlanTrending
+    from app.trending import seed_trending
+    db.metadata.create_all(connection, tables=[PlanTrending.__table__])
+    seed_trending(connection)
+
+
+@migration(8, 'Precomputed co-subscription recommendations per segment (plan_recommendations)')
+def _plan_recommendations(connection):
+    from app.models import PlanRecommendation
+    db.metadata.create_all(connection, tables=[PlanRecommendation.__table__])
+
+
+@migration(9, 'Catalog change log for delta sync (catalog_changes)')
+def _catalog_changes(connection):
+    from app.models import CatalogChange
+    db.metadata.create_all(connection, tables=[CatalogChange.__table__])
+
+
+@migration(10, 'Per-user data version stamps (user_data_versions)')
+def _user_data_versions(connection):
+    from app.models import UserDataVersion
+    db.metadata.create_all(connection, tables=[UserDataVersion.__table__])
+
+
+@migration(11, 'Per-user account summary and monthly spend (user_account_summary)')
+def _user_account_summary(connection):
+    from app.models import UserAccountSummary, UserMonthlySpend
+    from app.account_summary import rebuild_account_summaries
+    db.metadata.create_all(connection, tables=[UserAccountSummary.__table__, UserMonthlySpend.__table__])
+    rebuild_account_summaries(connection)
+
+
+def latest_version():
+    """Highest migration version known to this build"""
+    return MIGRATIONS[-1][0] if MIGRATIONS else 0
+
+
+def _ensure_version_table(connection):
+    connection.execute(text(
+        f'CREATE TABLE IF NOT EXISTS {SCHEMA_VERSION_TABLE} ('
+        'version INTEGER PRIMARY KEY, '
+        'description VARCHAR(255) NOT NULL, '
+        'applied_at TIMESTAMP NOT NULL)'
+    ))
+
+
+def get_current_version(connection=None):
+    """Get the schema version recorded in the database (0 if never migrated)"""
+    if connection is None:
+        with db.engine.connect() as connection:
+            return get_current_version(connection)
+
+    if not inspect(connection).has_table(SCHEMA_VERSION_TABLE):
+        return 0
+
+    version = connection.execute(text(f'SELECT MAX(version) FROM {SCHEMA_VERSION_TABLE}')).scalar()
+    return version or 0
+
+
+def get_applied_migrations(connection=None):
+    """Get the applied migrations as a list of dictionaries"""
+    if connection is None:
+        with db.engine.connect() as connection:
+            return get_applied_migrations(connection)
+
+    if not inspect(connection).has_table(SCHEMA_VERSION_TABLE):
+        return []
+
+    rows = connection.execute(text(
+        f'SELECT version, description, applied_at FROM {SCHEMA_VERSION_TABLE} ORDER BY version'
+    )).all()
+    return [{'version': row[0], 'description': row[1], 'applied_at': str(row[2])} for row in rows]
+
+
+def upgrade(target=None):
+    """Apply all pending migrations up to target; returns the versions applied"""
+    target = latest_version() if target is None else target
+    applied = []
+
+    with db.engine.connect() as connection:
+        is_postgres = connection.dialect.name == 'postgresql'
+        if is_postgres:
+            # Serialize concurrent deploys against the same database
+            connection.execute(text('SELECT pg_advisory_lock(:key)'), {'key': _ADVISORY_LOCK_KEY})
+            connection.commit()
+
+        try:
+            _ensure_version_table(connection)
+            connection.commit()
+
+            current = get_current_version(connection)
+            for version, description, fn in MIGRATIONS:
+                if version <= current or version > target:
+                    continue
+
+                print(f"Applying migration {version}: {description}")
+                fn(connection)
+                connection.execute(
+                    text(f'INSERT INTO {SCHEMA_VERSION_TABLE} (version, description, applied_at) '
+                         'VALUES (:version, :description, :applied_at)'),
+                    {'version': version, 'description': description, 'applied_at': datetime.utcnow()}
+                )
+                connection.commit()
+                applied.append(version)
+        finally:
+            if is_postgres:
+                connection.rollback()
+                connection.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': _ADVISORY_LOCK_KEY})
+                connection.commit()
+
+    return applied
+
+
+def reset_version_history():
+    """Forget all applied migrations (used when the schema is dropped)"""
+    with db.engine.begin() as connection:
+        connection.execute(text(f'DROP TABLE IF EXISTS {SCHEMA_VERSION_TABLE}'))
+
+
+def seed_sample_data():
+    """Load the sample data set if the database is empty"""
+    from app.services.data_service import DataService
+    DataService().initialize_sample_data()
+
+
+def bootstrap():
+    """Apply pending migrations and seed the sample data"""
+    applied = upgrade()
+    seed_sample_data()
+    return applied
+
+
+def check_schema_version(app):
+    """Startup check: make sure the schema is current, migrating only if AUTO_MIGRATE is set"""
+    current = get_current_version()
+    expected = latest_version()
+
+    if current >= expected:
+        return True
+
+    if app.config.get('AUTO_MIGRATE'):
+        bootstrap()
+        return True
+
+    app.logger.warning(
+        f"Database schema is at version {current}, expected {expected}. "
+        "Run `python manage.py migrate` before starting the workers."
+    )
+    return False
@@ -21,6 +21,9 @@ class Plan(db.Model):
     # Relationships
     user_plans = db.relationship('UserPlan', back_populates='plan', lazy='dynamic')
     transactions = db.relationship('Transaction', back_populates='plan', lazy='dynamic')
+    # Typed values parsed from features on write (see app/plan_attributes.py)
+    attributes = db.relationship('PlanAttributes', uselist=False, cascade='all, delete-orphan',
+                                 passive_deletes=True)
     
     def __init__(self, name, category, price, features, description=None, 
                  currency='INR', duration='monthly', is_popular=False, is_available=True):
@@ -63,17 +66,30 @@ class Plan(db.Model):
         }
     
     def get_active_subscribers_count(self):
-        """Get count of active subscribers for this plan"""
+        """Get count of active subscribers for this plan (live COUNT; plan_stats keeps it precomputed)"""
         return self.user_plans.filter_by(status='active').count()
     
     def get_total_revenue(self):
-        """Get total revenue generated by this plan"""
+        """Get total revenue generated by this plan (live SUM; plan_stats keeps it precomputed)"""
         total = db.session.query(db.func.sum(Transaction.amount)).filter(
             Transaction.plan_id == self.id,
             Transaction.status == 'completed'
         ).scalar()
         return total or 0
     
+    @staticmethod
+    def get_stats_for(plan_ids):
+        """Active subscriber counts and completed revenue for many plans, read from plan_stats"""
+        rows = PlanStats.query.filter(PlanStats.plan_id.in_(plan_ids)).all() if plan_ids else []
+        stats = {row.plan_id: row for row in rows}
+        return {
+            plan_id: {
+                'subscribers_count': stats[plan_id].active_subscribers if plan_id in stats else 0,
+                'total_revenue': stats[plan_id].total_revenue if plan_id in stats else 0
+            }
+            for plan_id in plan_ids
+        }
+    
     @staticmethod
     def get_by_category(category):
         """Get all plans by category"""
@@ -86,7 +102,16 @@ class Plan(db.Model):
     
     @staticmethod
     def search_plans(query):
-        """Search plans by name or description"""
+        """Search plans by name, description and features, best match first"""
+        from app.plan_search import search_plan_ids
+        plan_ids = search_plan_ids(db.session, query)
+        if plan_ids is not None:
+            plans = {plan.id: plan for plan in Plan.query.filter(
+                Plan.id.in_(plan_ids), Plan.is_available == True
+            )} if plan_ids else {}
+            return [plans[plan_id] for plan_id in plan_ids if plan_id in plans]
+        
+        # No search index in this database
         return Plan.query.filter(
             db.or_(
                 Plan.name.contains(query),
@@ -182,3 +207,93 @@ class Transaction(db.Model):
     
     def __repr__(self):
         return f'<Transaction {self.transaction_reference}>'
+
+class PlanAttributes(db.Model):
+    """Typed attributes extracted from a plan's feature strings"""
+    __tablename__ = 'plan_attributes'
+    
+    plan_id = db.Column(db.Integer, db.ForeignKey('plans.id', ondelete='CASCADE'), primary_key=True)
+    daily_data_gb = db.Column(db.Float, index=True)
+    unlimited_data = db.Column(db.Boolean, nullable=False, default=False)
+    speed_mbps = db.Column(db.Integer, index=True)
+    validity_days = db.Column(db.Integer, index=True)
+    sms_per_day = db.Column(db.Integer, index=True)
+    ott_bundles = db.Column(db.String(255), nullable=False, default='')  # comma-separated service keys
+    
+    def to_dict(self):
+        """Convert attributes to dictionary"""
+        return {
+            'daily_data_gb': self.daily_data_gb,
+            'unlimited_data': self.unlimited_data,
+            'speed_mbps': self.speed_mbps,
+            'validity_days': self.validity_days,
+            'sms_per_day': self.sms_per_day,
+            'ott_bundles': self.ott_bundles.split(',') if self.ott_bundles else []
+        }
+    
+    def __repr__(self):
+        return f'<PlanAttributes {self.plan_id}>'
+
+class PlanStats(db.Model):
+    """Per-plan counters kept in step with subscriptions and payments (see app/plan_stats.py)"""
+    __tablename__ = 'plan_stats'
+    
+    plan_id = db.Column(db.Integer, db.ForeignKey('plans.id', ondelete='CASCADE'), primary_key=True)
+    active_subscribers = db.Column(db.Integer, nullable=False, default=0)
+    total_revenue = db.Column(db.Float, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<PlanStats {self.plan_id}>'
+
+class PlanTrending(db.Model):
+    """Time-decayed demand score per plan and window (see app/trending.py)"""
+    __tablename__ = 'plan_trending'
+    
+    plan_id = db.Column(db.Integer, db.ForeignKey('plans.id', ondelete='CASCADE'), primary_key=True)
+    window = db.Column(db.String(8), primary_key=True)
+    score = db.Column(db.Float, nullable=False, default=0)
+    scored_at = db.Column(db.Float, nullable=False)  # epoch seconds the score is decayed to
+    
+    def __repr__(self):
+        return f'<PlanTrending {self.plan_id} {self.window}>'
+
+class PlanRecommendation(db.Model):
+    """Precomputed recommended plan ids for one user segment (see app/recommendations.py)"""
+    __tablename__ = 'plan_recommendations'
+    
+    segment = db.Column(db.String(64), primary_key=True)
+    plan_ids = db.Column(db.Text, nullable=False)  # JSON list, best first
+    members = db.Column(db.Integer, nullable=False, default=0)
+    built_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def get_plan_ids(self):
+        """Get the recommended plan ids as a list"""
+        return json.loads(self.plan_ids) if self.plan_ids else []
+    
+    def __repr__(self):
+        return f'<PlanRecommendation {self.segment}>'
+
+class CatalogState(db.Model):
+    """Single-row version stamp of the plan catalog (see app/catalog.py)"""
+    __tablename__ = 'catalog_state'
+    
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<CatalogState {self.version}>'
+
+class CatalogChange(db.Model):
+    """One plan added, changed or removed at a catalog version (see app/catalog.py)"""
+    __tablename__ = 'catalog_changes'
+    
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    version = db.Column(db.BigInteger, nullable=False, index=True)
+    plan_id = db.Column(db.Integer)  # no FK: removed plans stay in the log
+    change = db.Column(db.String(10), nullable=False)  # upsert, delete, resync
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<CatalogChange {self.version} {self.change} {self.plan_id}>'
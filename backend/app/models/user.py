@@ -1,5 +1,5 @@
 from app import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.password_hashing import password_hasher
 from datetime import datetime
 
 class User(db.Model):
@@ -20,12 +20,16 @@ class User(db.Model):
     current_plans = db.relationship('UserPlan', back_populates='user', lazy='dynamic')
     payment_history = db.relationship('Transaction', back_populates='user', lazy='dynamic')
     
-    def __init__(self, username, email, password, first_name, last_name, phone):
+    def __init__(self, username, email, password, first_name, last_name, phone, password_hash=None):
         # Explicitly don't set ID - let database auto-increment handle it
         # Don't call super().__init__() to avoid any parent class ID generation
         self.username = username
         self.email = email
-        self.set_password(password)
+        if password_hash:
+            # Precomputed hash (seed data) - skip the expensive hashing step
+            self.password_hash = password_hash
+        else:
+            self.set_password(password)
         self.first_name = first_name
         self.last_name = last_name
         self.phone = phone
@@ -35,12 +39,16 @@ class User(db.Model):
         self.is_active = True
     
     def set_password(self, password):
-        """Hash and set password"""
-        self.password_hash = generate_password_hash(password)
+        """Hash and set password (runs in the hashing process pool)"""
+        self.password_hash = password_hasher.hash(password)
     
     def check_password(self, password):
-        """Check if provided password matches hash"""
-        return check_password_hash(self.password_hash, password)
+        """Check if provided password matches hash (runs in the hashing process pool)"""
+        return password_hasher.verify(self.password_hash, password)
+    
+    def password_needs_rehash(self):
+        """Check if the stored hash uses outdated hashing parameters"""
+        return password_hasher.needs_rehash(self.password_hash)
     
     def to_dict(self, include_sensitive=False):
         """Convert user object to dictionary"""
@@ -140,3 +148,46 @@ class UserPlan(db.Model):
     
     def __repr__(self):
         return f'<UserPlan {self.user_id}:{self.plan_id}>'
+
+class UserDataVersion(db.Model):
+    """Per-user version stamp of the user's account data (see app/user_data.py)"""
+    __tablename__ = 'user_data_versions'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<UserDataVersion {self.user_id}:{self.version}>'
+
+class UserAccountSummary(db.Model):
+    """Per-user payment and plan counters kept in step with writes (see app/account_summary.py)"""
+    __tablename__ = 'user_account_summary'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    total_spent = db.Column(db.Float, nullable=False, default=0)
+    total_transactions = db.Column(db.Integer, nullable=False, default=0)
+    completed_transactions = db.Column(db.Integer, nullable=False, default=0)
+    failed_transactions = db.Column(db.Integer, nullable=False, default=0)
+    pending_transactions = db.Column(db.Integer, nullable=False, default=0)
+    refunded_transactions = db.Column(db.Integer, nullable=False, default=0)
+    total_plans = db.Column(db.Integer, nullable=False, default=0)
+    active_plans = db.Column(db.Integer, nullable=False, default=0)
+    expired_plans = db.Column(db.Integer, nullable=False, default=0)
+    cancelled_plans = db.Column(db.Integer, nullable=False, default=0)
+    last_activity = db.Column(db.DateTime)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<UserAccountSummary {self.user_id}>'
+
+class UserMonthlySpend(db.Model):
+    """Completed spend of one user in one calendar month (see app/account_summary.py)"""
+    __tablename__ = 'user_monthly_spend'
+    
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    month = db.Column(db.String(7), primary_key=True)  # YYYY-MM (UTC)
+    amount = db.Column(db.Float, nullable=False, default=0)
+    
+    def __repr__(self):
+        return f'<UserMonthlySpend {self.user_id} {self.month}>'
@@ -0,0 +1,202 @@
+"""
+Password hashing off the request thread.
+
+pbkdf2 at 600k iterations keeps a CPU busy for hundreds of milliseconds, so
+hashing and verification run in a small process pool instead of on the
+request threads. At most PASSWORD_HASH_QUEUE_SIZE operations may be queued or
+running per worker process; beyond that ``PasswordHashingBusy`` is raised and
+the auth routes answer 429 instead of letting a login burst starve every other
+endpoint. An operation that takes longer than PASSWORD_HASH_TIMEOUT raises
+``PasswordHashingBusy`` too, and keeps its place in the queue until the
+worker has actually finished it.
+
+Settings (environment):
+    PASSWORD_HASH_METHOD      werkzeug method string (default pbkdf2:sha256:600000)
+    PASSWORD_HASH_WORKERS     hashing processes per server worker, 0 = hash inline
+    PASSWORD_HASH_QUEUE_SIZE  max queued + running operations before 429
+    PASSWORD_HASH_TIMEOUT     seconds to wait for a result
+
+Stored hashes made with other parameters are upgraded on the next successful
+login (see ``needs_rehash``).
+"""
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from werkzeug.security import check_password_hash, generate_password_hash
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+
+DEFAULT_METHOD = 'pbkdf2:sha256:600000'
+
+
+class PasswordHashingBusy(Exception):
+    """The hashing queue is full; the client should retry shortly"""
+
+
+def _hash_password(password, method):
+    return generate_password_hash(password, method=method)
+
+
+def _verify_password(password_hash, password):
+    return check_password_hash(password_hash, password)
+
+
+class PasswordHasher:
+    """Bounded process pool for password hashing with queue-depth metrics"""
+
+    def __init__(self, method=DEFAULT_METHOD, workers=2, queue_size=16, timeout=10.0):
+        self.method = method
+        self.workers = workers
+        self.queue_size = queue_size
+        self.timeout = timeout
+
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._lock = threading.Lock()
+        self._executor = None
+        self._executor_pid = None
+
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.timed_out = 0
+        self.total_ms = 0.0
+
+    @classmethod
+    def from_env(cls):
+        workers = os.environ.get('PASSWORD_HASH_WORKERS')
+        workers = int(workers) if workers else min(4, os.cpu_count() or 1)
+        queue_size = os.environ.get('PASSWORD_HASH_QUEUE_SIZE')
+        return cls(
+            method=os.environ.get('PASSWORD_HASH_METHOD', DEFAULT_METHOD),
+            workers=workers,
+            queue_size=int(queue_size) if queue_size else max(workers, 1) * 8,
+            timeout=float(os.environ.get('PASSWORD_HASH_TIMEOUT', 10))
+        )
+
+    def _get_executor(self):
+        # Created lazily and per process: an executor inherited through fork() is unusable
+        pid = os.getpid()
+        if self._executor is None or self._executor_pid != pid:
+            with self._lock:
+                if self._executor is None or self._executor_pid != pid:
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                    self._executor_pid = pid
+        return self._executor
+
+    def _run(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            _count_metric('telecom.auth.hash_rejected')
+            raise PasswordHashingBusy('Password hashing queue is full')
+
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            depth = self.in_flight
+        _gauge_metric('telecom.auth.hash_queue_depth', depth)
+
+        start_time = time.perf_counter()
+        release = True
+        try:
+            if self.workers <= 0:
+                result = fn(*args)
+            else:
+                future = self._get_executor().submit(fn, *args)
+                try:
+                    result = future.result(timeout=self.timeout)
+                except FutureTimeoutError:
+                    if not future.cancel():
+                        # Already handed to a worker: the slot stays taken until the job really ends
+                        release = False
+                        future.add_done_callback(self._release_slot)
+                    with self._lock:
+                        self.timed_out += 1
+                    _count_metric('telecom.auth.hash_timeout')
+                    # The pool is backed up; answer like a full queue instead of a 500
+                    raise PasswordHashingBusy('Password hashing timed out')
+
+            duration = (time.perf_counter() - start_time) * 1000
+            with self._lock:
+                self.completed += 1
+                self.total_ms += duration
+            return result
+        finally:
+            if release:
+                self._release_slot()
+
+    def _release_slot(self, future=None):
+        with self._lock:
+            self.in_flight -= 1
+        self._slots.release()
+
+    def hash(self, password):
+        """Hash a password with the configured method"""
+        return self._run(_hash_password, password, self.method)
+
+    def verify(self, password_hash, password):
+        """Check a password against a stored hash"""
+        if not password_hash:
+            return False
+        return self._run(_verify_password, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        """True if the stored hash was made with different parameters"""
+        if not password_hash or '$' not in password_hash:
+            return True
+        return password_hash.split('$', 1)[0] != self.method
+
+    def stats(self):
+        with self._lock:
+            return {
+                'method': self.method,
+                'workers': self.workers,
+                'queue_size': self.queue_size,
+                'queue_depth': self.in_flight,
+                'peak_queue_depth': self.peak_in_flight,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'timed_out': self.timed_out,
+                'avg_ms': round(self.total_ms / self.completed, 2) if self.completed else 0
+            }
+
+    def shutdown(self):
+        if self._executor is not None and self._executor_pid == os.getpid():
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+
+
+_datadog = None
+
+
+def _datadog_module():
+    """datadog_config if it can be imported (looked up once per process)"""
+    global _datadog
+    if _datadog is None:
+        try:
+            import datadog_config
+            _datadog = datadog_config
+        except Exception:
+            _datadog = False
+    return _datadog
+
+
+def _gauge_metric(name, value):
+    datadog = _datadog_module()
+    if datadog:
+        datadog.send_custom_metric(name, value, tags=['service:telecom-backend'])
+
+
+def _count_metric(name):
+    datadog = _datadog_module()
+    if datadog:
+        datadog.increment_counter(name, tags=['service:telecom-backend'])
+
+
+password_hasher = PasswordHasher.from_env()
+atexit.register(password_hasher.shutdown)
@@ -0,0 +1,137 @@
+"""
+Typed plan attributes parsed from the feature strings.
+
+``Plan.features`` holds free text such as "2GB Daily Data", "100 Mbps Speed"
+or "28 Days Validity". The extractor below turns those into typed values once,
+when a plan is written, and stores them in the indexed ``plan_attributes``
+side table (one row per plan, migration 5):
+
+    daily_data_gb   float    "2GB Daily Data", "1.5 GB/day" (unlimited_data for "Unlimited Data")
+    speed_mbps      integer  "100 Mbps Speed", "1 Gbps"
+    validity_days   integer  "28 Days Validity", "1 Year Validity"
+    sms_per_day     integer  "100 SMS/day"
+    ott_bundles     text     comma-separated service keys (netflix, amazon_prime, ...)
+
+The catalog snapshot loads these columns with the plans and keeps a sorted
+array per numeric attribute, so ``min_daily_data=2&min_speed=100`` on the
+plan listings is a bisect per filter instead of parsing every plan's JSON.
+"""
+from sqlalchemy import event, inspect
+import json
+import re
+
+NUMERIC_ATTRIBUTES = ('daily_data_gb', 'speed_mbps', 'validity_days', 'sms_per_day')
+
+# Query parameter -> attribute it sets a minimum for
+ATTRIBUTE_FILTERS = {
+    'min_daily_data': 'daily_data_gb',
+    'min_speed': 'speed_mbps',
+    'min_validity': 'validity_days',
+    'min_sms': 'sms_per_day',
+}
+
+OTT_SERVICES = (
+    ('netflix', re.compile(r'\bnetflix\b', re.I)),
+    ('amazon_prime', re.compile(r'\b(amazon\s+prime|prime\s+video)\b', re.I)),
+    ('disney_hotstar', re.compile(r'\b(disney\s*\+?\s*hotstar|hotstar)\b', re.I)),
+    ('zee5', re.compile(r'\bzee\s*5\b', re.I)),
+    ('sonyliv', re.compile(r'\bsony\s*liv\b', re.I)),
+)
+
+_DAILY_DATA = re.compile(r'(\d+(?:\.\d+)?)\s*(GB|MB)\s*(?:daily|/\s*day|per\s+day)', re.I)
+_UNLIMITED_DATA = re.compile(r'\bunlimited\s+data\b', re.I)
+_SPEED = re.compile(r'(\d+(?:\.\d+)?)\s*(Mbps|Gbps)\b', re.I)
+_VALIDITY = re.compile(r'(\d+)\s*(day|month|year)s?\s+validity', re.I)
+_SMS = re.compile(r'(\d+)\s*SMS\s*(?:daily|/\s*day|per\s+day)', re.I)
+
+_VALIDITY_DAYS = {'day': 1, 'month': 30, 'year': 365}
+
+
+def extract_attributes(features):
+    """Typed attributes from a list of feature strings (or its JSON text)"""
+    if isinstance(features, str):
+        try:
+            features = json.loads(features)
+        except ValueError:
+            features = []
+    features = [str(feature) for feature in features or []]
+
+    attributes = {name: None for name in NUMERIC_ATTRIBUTES}
+    attributes['unlimited_data'] = False
+    bundles = []
+
+    for feature in features:
+        for amount, unit in _DAILY_DATA.findall(feature):
+            gb = float(amount) / 1024 if unit.upper() == 'MB' else float(amount)
+            attributes['daily_data_gb'] = max(gb, attributes['daily_data_gb'] or 0)
+        if _UNLIMITED_DATA.search(feature):
+            attributes['unlimited_data'] = True
+        for amount, unit in _SPEED.findall(feature):
+            mbps = int(float(amount) * 1000) if unit.lower() == 'gbps' else int(float(amount))
+            attributes['speed_mbps'] = max(mbps, attributes['speed_mbps'] or 0)
+        for amount, unit in _VALIDITY.findall(feature):
+            days = int(amount) * _VALIDITY_DAYS[unit.lower()]
+            attributes['validity_days'] = max(days, attributes['validity_days'] or 0)
+        for amount in _SMS.findall(feature):
+            attributes['sms_per_day'] = max(int(amount), attributes['sms_per_day'] or 0)
+        for key, pattern in OTT_SERVICES:
+            if key not in bundles and pattern.search(feature):
+                bundles.append(key)
+
+    attributes['ott_bundles'] = ','.join(bundles)
+    return attributes
+
+
+def attribute_filters(args):
+    """Minimums requested through min_* query parameters, keyed by attribute"""
+    minimums = {}
+    for param, attribute in ATTRIBUTE_FILTERS.items():
+        try:
+            value = args.get(param)
+            if value not in (None, ''):
+                minimums[attribute] = float(value)
+        except (TypeError, ValueError):
+            continue
+    return minimums
+
+
+def backfill_attributes(connection):
+    """Parse attributes for every plan that has no plan_attributes row; returns the count"""
+    from app.models.plan import Plan, PlanAttributes
+    table = PlanAttributes.__table__
+    existing = set(connection.execute(table.select().with_only_columns(table.c.plan_id)).scalars())
+    rows = [
+        {'plan_id': plan_id, **extract_attributes(features)}
+        for plan_id, features in connection.execute(
+            Plan.__table__.select().with_only_columns(Plan.id, Plan.features)
+        ).all()
+        if plan_id not in existing
+    ]
+    if rows:
+        connection.execute(table.insert(), rows)
+    return len(rows)
+
+
+def _extract_on_plan_write(session, flush_context, instances):
+    from app.models.plan import Plan, PlanAttributes
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Plan):
+            continue
+        state = inspect(obj)
+        if not state.pending and not state.attrs.features.history.has_changes():
+            continue
+
+        values = extract_attributes(obj.features)
+        if obj.attributes is None:
+            obj.attributes = PlanAttributes(**values)
+        else:
+            for name, value in values.items():
+                setattr(obj.attributes, name, value)
+
+
+def init_plan_attributes(app):
+    """Parse plan attributes whenever a plan's features are written"""
+    from app.db_router import RoutingSession
+
+    if not event.contains(RoutingSession, 'before_flush', _extract_on_plan_write):
+        event.listen(RoutingSession, 'before_flush', _extract_on_plan_write)
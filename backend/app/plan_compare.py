@@ -0,0 +1,89 @@
+"""
+Plan comparison over an interned feature vocabulary.
+
+Each catalog snapshot builds one FeatureVocabulary the first time a
+comparison is asked for: every distinct feature string in the catalog gets a
+small integer id (case and spacing ignored), and every plan gets an int
+bitset of its feature ids. A comparison is then set algebra on those ints:
+OR for the union of features, AND for the features every plan shares, and
+``bits & ~others`` for what only one plan offers. ``GET /api/plans/compare``
+turns that into a feature x plan matrix.
+"""
+
+COMPARE_MAX_IDS = 10
+
+
+def _normalize(feature):
+    return ' '.join(str(feature).split()).lower()
+
+
+def feature_ids(bits):
+    """Feature ids set in a bitset, ascending"""
+    ids = []
+    while bits:
+        lowest = bits & -bits
+        ids.append(lowest.bit_length() - 1)
+        bits ^= lowest
+    return ids
+
+
+class FeatureVocabulary:
+    """Catalog-wide feature string -> id, and a feature bitset per plan"""
+
+    def __init__(self, plans):
+        self.texts = []
+        self.ids = {}
+        self.bitsets = {}
+        for plan in plans:
+            bits = 0
+            for feature in plan.features:
+                key = _normalize(feature)
+                if not key:
+                    continue
+                feature_id = self.ids.get(key)
+                if feature_id is None:
+                    feature_id = self.ids[key] = len(self.texts)
+                    self.texts.append(' '.join(str(feature).split()))
+                bits |= 1 << feature_id
+            self.bitsets[plan.id] = bits
+
+    def compare(self, plan_ids):
+        """Matrix rows, shared features and per-plan unique features for the given plans"""
+        bitsets = [self.bitsets.get(plan_id, 0) for plan_id in plan_ids]
+        union = 0
+        common = ~0 if bitsets else 0
+        for bits in bitsets:
+            union |= bits
+            common &= bits
+
+        # OR of every other plan's bits, from prefix and suffix ORs
+        prefix = [0]
+        for bits in bitsets:
+            prefix.append(prefix[-1] | bits)
+        suffix = [0]
+        for bits in reversed(bitsets):
+            suffix.append(suffix[-1] | bits)
+        suffix.reverse()
+        unique = {
+            plan_id: bits & ~(prefix[position] | suffix[position + 1])
+            for position, (plan_id, bits) in enumerate(zip(plan_ids, bitsets))
+        }
+
+        rows = []
+        for feature_id in feature_ids(union):
+            present = [bool(bits >> feature_id & 1) for bits in bitsets]
+            rows.append({
+                'feature_id': feature_id,
+                'feature': self.texts[feature_id],
+                'present': present,
+                'count': sum(present)
+            })
+        # Shared features first, then the most widely offered
+        rows.sort(key=lambda row: (-row['count'], row['feature_id']))
+
+        return {
+            'matrix': rows,
+            'common': [self.texts[feature_id] for feature_id in feature_ids(common)],
+            'unique': {plan_id: [self.texts[feature_id] for feature_id in feature_ids(bits)]
+                       for plan_id, bits in unique.items()}
+        }
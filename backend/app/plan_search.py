@@ -0,0 +1,204 @@
+"""
+Full-text search over the plan catalog.
+
+``LIKE '%q%'`` on name and description cannot use an index and returns rows in
+no particular order. Migration 4 builds a real search index instead, chosen by
+dialect:
+
+- SQLite: an FTS5 table ``plan_search`` (porter stemming, 2/3-character
+  prefix indexes), ranked with bm25
+- PostgreSQL: ``plan_search`` with a weighted tsvector per plan and a GIN
+  index, ranked with ts_rank
+
+Name, description and the parsed features list are indexed (weighted in that
+order). Every search term is matched as a stemmed prefix and all terms must
+match. The index is kept in sync from the session's after_flush hook whenever
+a Plan is inserted, updated or deleted. Where no index exists (another
+dialect, or FTS5 missing from the SQLite build) callers fall back to substring
+matching on the catalog snapshot.
+"""
+from sqlalchemy import event, inspect, text
+from weakref import WeakKeyDictionary
+import json
+import re
+
+SEARCH_TABLE = 'plan_search'
+
+# Result cap for one search; filters are applied to the ranked ids afterwards
+SEARCH_LIMIT = 200
+
+# At most this many terms from one query are used
+MAX_TERMS = 8
+
+_TERM_PATTERN = re.compile(r'\w+', re.UNICODE)
+
+# Per-engine "does the search index exist" answers
+_available = WeakKeyDictionary()
+
+
+def search_terms(query):
+    """Lower-cased word tokens of a user query"""
+    return _TERM_PATTERN.findall((query or '').lower())[:MAX_TERMS]
+
+
+def _features_text(features):
+    if isinstance(features, (list, tuple)):
+        return ' '.join(str(feature) for feature in features)
+    try:
+        return ' '.join(str(feature) for feature in json.loads(features)) if features else ''
+    except (TypeError, ValueError):
+        return ''
+
+
+def _search_statement(dialect, terms, limit):
+    if dialect == 'sqlite':
+        return text(
+            f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :match '
+            f'ORDER BY bm25({SEARCH_TABLE}, 10.0, 4.0, 2.0), rowid LIMIT :limit'
+        ), {'match': ' '.join(f'"{term}"*' for term in terms), 'limit': limit}
+
+    return text(
+        f'SELECT plan_id FROM {SEARCH_TABLE}, to_tsquery(\'english\', :match) query '
+        'WHERE document @@ query ORDER BY ts_rank(document, query) DESC, plan_id LIMIT :limit'
+    ), {'match': ' & '.join(f'{term}:*' for term in terms), 'limit': limit}
+
+
+def create_search_index(connection):
+    """Create the dialect's search index and fill it from the plans table (idempotent)"""
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        try:
+            connection.execute(text(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5('
+                "name, description, features, tokenize='porter unicode61', prefix='2 3')"
+            ))
+        except Exception as e:
+            print(f"Warning: FTS5 is not available, plan search falls back to substring matching: {e}")
+            return False
+    elif dialect == 'postgresql':
+        connection.execute(text(
+            f'CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ('
+            'plan_id INTEGER PRIMARY KEY REFERENCES plans(id) ON DELETE CASCADE, '
+            'document TSVECTOR NOT NULL)'
+        ))
+        connection.execute(text(
+            f'CREATE INDEX IF NOT EXISTS ix_plan_search_document ON {SEARCH_TABLE} USING GIN (document)'
+        ))
+    else:
+        return False
+
+    _available.pop(connection.engine, None)
+    rebuild_search_index(connection)
+    return True
+
+
+def drop_search_index(connection):
+    """Drop the search index; it is not in db.metadata, so ``drop_all`` leaves it behind"""
+    # On PostgreSQL it references plans, so it has to go before plans can be dropped
+    cascade = ' CASCADE' if connection.dialect.name == 'postgresql' else ''
+    connection.execute(text(f'DROP TABLE IF EXISTS {SEARCH_TABLE}{cascade}'))
+    _available.pop(connection.engine, None)
+
+
+def rebuild_search_index(connection):
+    """Re-index every plan"""
+    connection.execute(text(f'DELETE FROM {SEARCH_TABLE}'))
+    rows = connection.execute(text('SELECT id, name, description, features FROM plans')).all()
+    index_plans(connection, [row._asdict() for row in rows])
+    return len(rows)
+
+
+def index_plans(connection, plans):
+    """Insert or replace the index entries for plans given as dicts"""
+    if not plans:
+        return
+    params = [{
+        'id': plan['id'],
+        'name': plan['name'] or '',
+        'description': plan['description'] or '',
+        'features': _features_text(plan['features'])
+    } for plan in plans]
+
+    remove_plans(connection, [plan['id'] for plan in plans])
+    if connection.dialect.name == 'sqlite':
+        connection.execute(text(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, name, description, features) '
+            'VALUES (:id, :name, :description, :features)'
+        ), params)
+    else:
+        connection.execute(text(
+            f'INSERT INTO {SEARCH_TABLE} (plan_id, document) VALUES (:id, '
+            "setweight(to_tsvector('english', :name), 'A') || "
+            "setweight(to_tsvector('english', :description), 'B') || "
+            "setweight(to_tsvector('english', :features), 'C'))"
+        ), params)
+
+
+def remove_plans(connection, plan_ids):
+    if not plan_ids:
+        return
+    key = 'rowid' if connection.dialect.name == 'sqlite' else 'plan_id'
+    connection.execute(text(f'DELETE FROM {SEARCH_TABLE} WHERE {key} = :id'),
+                       [{'id': plan_id} for plan_id in plan_ids])
+
+
+def search_available(connection):
+    """True if the connection's database has the search index (cached per engine)"""
+    engine = connection.engine
+    available = _available.get(engine)
+    if available is None:
+        available = (connection.dialect.name in ('sqlite', 'postgresql')
+                     and inspect(connection).has_table(SEARCH_TABLE))
+        _available[engine] = available
+    return available
+
+
+def search_plan_ids(session, query, limit=SEARCH_LIMIT):
+    """Plan ids matching the query, best match first; None when there is no index"""
+    terms = search_terms(query)
+    if not terms:
+        return []
+    connection = session.connection()
+    if not search_available(connection):
+        return None
+    statement, params = _search_statement(connection.dialect.name, terms, limit)
+    return list(session.execute(statement, params).scalars())
+
+
+async def search_plan_ids_async(session, query, limit=SEARCH_LIMIT):
+    """``search_plan_ids`` for an AsyncSession"""
+    terms = search_terms(query)
+    if not terms:
+        return []
+    connection = await session.connection()
+    if not await connection.run_sync(search_available):
+        return None
+    statement, params = _search_statement(connection.dialect.name, terms, limit)
+    return list((await session.execute(statement, params)).scalars())
+
+
+def _sync_search_index(session, flush_context):
+    from app.models.plan import Plan
+    written = [obj for obj in list(session.new) + list(session.dirty) if isinstance(obj, Plan)]
+    deleted = [obj.id for obj in session.deleted if isinstance(obj, Plan)]
+    if not written and not deleted:
+        return
+
+    connection = session.connection()
+    if not search_available(connection):
+        return
+    remove_plans(connection, deleted)
+    index_plans(connection, [{
+        'id': plan.id,
+        'name': plan.name,
+        'description': plan.description,
+        'features': plan.features
+    } for plan in written if plan.id is not None])
+
+
+def init_plan_search(app):
+    """Keep the search index in step with ORM writes to plans"""
+    from app.db_router import RoutingSession
+
+    if not event.contains(RoutingSession, 'after_flush', _sync_search_index):
+        event.listen(RoutingSession, 'after_flush', _sync_search_index)
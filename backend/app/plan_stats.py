@@ -0,0 +1,142 @@
+"""
+Incrementally maintained per-plan counters.
+
+Plan detail used to run a COUNT over user_plans and a SUM over transactions
+on every view. The ``plan_stats`` table (migration 6) keeps both numbers per
+plan with the same definitions:
+
+    active_subscribers  user_plans rows with status 'active'
+    total_revenue       sum of transactions.amount with status 'completed'
+                        (refunds are completed negative transactions)
+
+An after_flush hook works out how each flushed UserPlan / Transaction insert,
+update or delete changes those numbers (from the attribute history) and
+applies the deltas with an upsert in the same database transaction, so the
+counters commit or roll back together with the change that caused them.
+The flush plumbing is shared with the account summary (app/flush_deltas.py).
+
+Writes that bypass the ORM (bulk UPDATEs, manual SQL) are not seen by the
+hook; ``reconcile_plan_stats`` recomputes the aggregates and fixes any drift.
+Run it periodically with ``python manage.py reconcile-stats --every 3600``.
+"""
+from datetime import datetime
+from sqlalchemy import event, func, select
+from app.flush_deltas import for_each_contribution, track_attributes, upsert
+
+# Revenue differences below this are float noise, not drift
+REVENUE_TOLERANCE = 0.005
+
+
+def _user_plan_contribution(plan_id, status, amount=None):
+    return plan_id, (1 if status == 'active' else 0), 0.0
+
+
+def _transaction_contribution(plan_id, status, amount):
+    return plan_id, 0, (amount or 0.0) if status == 'completed' else 0.0
+
+
+def _tracked_models():
+    from app.models.plan import Transaction
+    from app.models.user import UserPlan
+    return {
+        UserPlan: (('plan_id', 'status'), _user_plan_contribution),
+        Transaction: (('plan_id', 'status', 'amount'), _transaction_contribution),
+    }
+
+
+def collect_deltas(session):
+    """{plan_id: [subscribers delta, revenue delta]} for the objects being flushed"""
+    tracked = _tracked_models()
+    deltas = {}
+
+    def add(contribution, sign):
+        plan_id, subscribers, revenue = contribution
+        if plan_id is None or (not subscribers and not revenue):
+            return
+        delta = deltas.setdefault(plan_id, [0, 0.0])
+        delta[0] += sign * subscribers
+        delta[1] += sign * revenue
+
+    for_each_contribution(session, tracked, add)
+    return {plan_id: delta for plan_id, delta in deltas.items() if delta[0] or delta[1]}
+
+
+def apply_deltas(connection, deltas):
+    """Add the deltas to plan_stats, creating rows as needed"""
+    from app.models.plan import PlanStats
+    table = PlanStats.__table__
+    now = datetime.utcnow()
+
+    for plan_id, (subscribers, revenue) in deltas.items():
+        values = {'plan_id': plan_id, 'active_subscribers': subscribers, 'total_revenue': revenue, 'updated_at': now}
+        upsert(connection, table, ('plan_id',), values, ('active_subscribers', 'total_revenue'), replace=('updated_at',))
+
+
+def compute_plan_stats(connection):
+    """The counters recomputed from user_plans and transactions, for every plan"""
+    from app.models.plan import Plan, Transaction
+    from app.models.user import UserPlan
+
+    stats = {plan_id: [0, 0.0] for plan_id in connection.execute(select(Plan.id)).scalars()}
+    for plan_id, count in connection.execute(
+        select(UserPlan.plan_id, func.count()).where(UserPlan.status == 'active').group_by(UserPlan.plan_id)
+    ):
+        stats.setdefault(plan_id, [0, 0.0])[0] = count
+    for plan_id, total in connection.execute(
+        select(Transaction.plan_id, func.sum(Transaction.amount))
+        .where(Transaction.status == 'completed').group_by(Transaction.plan_id)
+    ):
+        stats.setdefault(plan_id, [0, 0.0])[1] = total or 0.0
+    return stats
+
+
+def reconcile_plan_stats(connection):
+    """Overwrite drifted counters with recomputed values; returns the corrections made"""
+    from app.models.plan import PlanStats
+    table = PlanStats.__table__
+
+    # Lock the counter rows first so concurrent deltas apply on top of the recomputed values
+    stored = {
+        row.plan_id: row for row in connection.execute(
+            select(table.c.plan_id, table.c.active_subscribers, table.c.total_revenue).with_for_update()
+        )
+    }
+    actual = compute_plan_stats(connection)
+    now = datetime.utcnow()
+    corrections = []
+
+    for plan_id, (subscribers, revenue) in actual.items():
+        row = stored.get(plan_id)
+        if row is None:
+            connection.execute(table.insert().values(
+                plan_id=plan_id, active_subscribers=subscribers, total_revenue=revenue, updated_at=now
+            ))
+            if not subscribers and not revenue:
+                continue
+        elif row.active_subscribers == subscribers and abs(row.total_revenue - revenue) < REVENUE_TOLERANCE:
+            continue
+        else:
+            connection.execute(table.update().where(table.c.plan_id == plan_id).values(
+                active_subscribers=subscribers, total_revenue=revenue, updated_at=now
+            ))
+        corrections.append({
+            'plan_id': plan_id,
+            'active_subscribers': [row.active_subscribers if row else None, subscribers],
+            'total_revenue': [row.total_revenue if row else None, revenue]
+        })
+    return corrections
+
+
+def _apply_flush_deltas(session, flush_context):
+    deltas = collect_deltas(session)
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+
+def init_plan_stats(app):
+    """Keep plan_stats in step with ORM writes to user_plans and transactions"""
+    from app.db_router import RoutingSession
+
+    if not event.contains(RoutingSession, 'after_flush', _apply_flush_deltas):
+        track_attributes(_tracked_models())
+        event.listen(RoutingSession, 'after_flush', _apply_flush_deltas)
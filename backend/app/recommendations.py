@@ -0,0 +1,117 @@
+"""
+Precomputed plan recommendations from co-subscriptions.
+
+``python manage.py recommendations`` builds a users x plans matrix from
+user_plans (every subscription, past or present) with NumPy and turns it into
+a plan x plan co-subscription similarity (cosine of the plan columns). Users
+are grouped into segments by their current plan: ``<category>:<price band>``,
+or ``new`` for users without an active plan. A segment's candidates are
+scored by how strongly they co-occur with the plans its members hold:
+
+    score = (plans held by the segment's members) @ similarity
+
+For ``new`` users the score is simply the subscriber count. The top N
+available plans per segment are stored in ``plan_recommendations``
+(migration 8). ``GET /api/plans/recommendations`` then reads one row by
+primary key and falls back to the category/popularity rules when the
+segment has no row yet.
+
+NumPy is only needed by the batch job, not by the web workers.
+"""
+from datetime import datetime
+from sqlalchemy import select
+import json
+
+from app.catalog import price_band
+
+DEFAULT_TOP_N = 10
+NEW_USER_SEGMENT = 'new'
+
+
+def segment_key(plan):
+    """Segment of a user whose current plan is ``plan`` (None for no active plan)"""
+    if plan is None:
+        return NEW_USER_SEGMENT
+    return f'{plan.category}:{price_band(plan.price)}'
+
+
+def build_recommendations(connection, top_n=DEFAULT_TOP_N):
+    """Recompute every segment's recommendations; returns {segment: [plan ids]}"""
+    import numpy as np
+    from app.models.plan import Plan, PlanRecommendation
+    from app.models.user import UserPlan
+
+    plans = connection.execute(
+        select(Plan.id, Plan.category, Plan.price, Plan.is_available).order_by(Plan.id)
+    ).all()
+    plan_index = {plan.id: i for i, plan in enumerate(plans)}
+    available = np.array([bool(plan.is_available) for plan in plans], dtype=bool)
+
+    subscriptions = connection.execute(
+        select(UserPlan.user_id, UserPlan.plan_id, UserPlan.status, UserPlan.activation_date)
+    ).all()
+    user_index = {}
+    for row in subscriptions:
+        user_index.setdefault(row.user_id, len(user_index))
+
+    # users x plans, 1 where the user has ever subscribed to the plan
+    held = np.zeros((len(user_index), len(plans)), dtype=np.float64)
+    current = {}
+    for row in subscriptions:
+        if row.plan_id not in plan_index:
+            continue
+        held[user_index[row.user_id], plan_index[row.plan_id]] = 1.0
+        if row.status == 'active':
+            latest = current.get(row.user_id)
+            if latest is None or (row.activation_date or datetime.min) > (latest.activation_date or datetime.min):
+                current[row.user_id] = row
+
+    co_subscriptions = held.T @ held
+    subscribers = np.diag(co_subscriptions).copy()
+    norms = np.sqrt(np.outer(subscribers, subscribers))
+    similarity = np.divide(co_subscriptions, norms, out=np.zeros_like(co_subscriptions), where=norms > 0)
+    np.fill_diagonal(similarity, 0.0)
+
+    segments = {}
+    for user_id, row in current.items():
+        plan = plans[plan_index[row.plan_id]]
+        segments.setdefault(segment_key(plan), []).append(user_index[user_id])
+
+    scored = {NEW_USER_SEGMENT: (subscribers, len(user_index) - len(current))}
+    for segment, members in segments.items():
+        scored[segment] = (held[members].sum(axis=0) @ similarity, len(members))
+
+    results = {}
+    for segment, (scores, members) in scored.items():
+        order = np.argsort(-scores, kind='stable')
+        results[segment] = ([
+            plans[i].id for i in order if available[i] and scores[i] > 0
+        ][:top_n], members)
+
+    table = PlanRecommendation.__table__
+    now = datetime.utcnow()
+    connection.execute(table.delete())
+    rows = [
+        {'segment': segment, 'plan_ids': json.dumps(plan_ids), 'members': members, 'built_at': now}
+        for segment, (plan_ids, members) in results.items() if plan_ids
+    ]
+    if rows:
+        connection.execute(table.insert(), rows)
+    return {row['segment']: json.loads(row['plan_ids']) for row in rows}
+
+
+def stored_recommendations(session, current_plan, catalog, limit=5, exclude=()):
+    """Catalog records recommended for the segment of ``current_plan``, or [] if none are stored"""
+    from app.models.plan import PlanRecommendation
+    row = session.get(PlanRecommendation, segment_key(current_plan))
+    if row is None:
+        return []
+
+    records = []
+    for plan_id in row.get_plan_ids():
+        record = catalog.get(plan_id)
+        if record is not None and plan_id not in exclude:
+            records.append(record)
+            if len(records) >= limit:
+                break
+    return records
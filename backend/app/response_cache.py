@@ -0,0 +1,161 @@
+"""
+Pre-serialized responses for the catalog views.
+
+The catalog listings are the same for every user, so once the snapshot has
+answered a query the JSON body is kept as bytes, keyed by (endpoint, catalog
+version, normalized query string). A hit writes the stored bytes straight to
+the response: no dict building, no jsonify.
+
+Each entry also keeps a gzip copy (and a brotli copy when the ``brotli``
+package is installed) for clients that accept it, and a strong ETag per
+encoding, so a client revalidating with If-None-Match gets a 304 with no
+body. Entries for older catalog versions are dropped as soon as the version
+changes; at most CATALOG_RESPONSE_CACHE_SIZE entries are kept per worker.
+"""
+from collections import OrderedDict
+from flask import current_app, request
+from functools import wraps
+from threading import Lock
+from urllib.parse import urlencode
+import gzip
+import hashlib
+import os
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+COMPRESS_MIN_BYTES = 512
+
+
+class CachedResponse:
+    """Encoded body of one catalog response, in every supported encoding"""
+
+    __slots__ = ('status', 'mimetype', 'bodies', 'etags')
+
+    def __init__(self, status, mimetype, body, tag=None):
+        self.status = status
+        self.mimetype = mimetype
+        # ETags come from the body digest unless the caller versions the body itself
+        digest = tag or hashlib.blake2b(body, digest_size=16).hexdigest()
+        self.bodies = {'identity': body}
+        self.etags = {'identity': f'"{digest}"'}
+
+        if len(body) >= COMPRESS_MIN_BYTES:
+            self.bodies['gzip'] = gzip.compress(body, compresslevel=6, mtime=0)
+            self.etags['gzip'] = f'"{digest}-gz"'
+            if brotli is not None:
+                self.bodies['br'] = brotli.compress(body)
+                self.etags['br'] = f'"{digest}-br"'
+
+    def encoding_for(self, accept_encoding):
+        """Best stored encoding the client accepts"""
+        accepted = {value.split(';')[0].strip().lower() for value in (accept_encoding or '').split(',')}
+        for encoding in ('br', 'gzip'):
+            if encoding in self.bodies and encoding in accepted:
+                return encoding
+        return 'identity'
+
+
+class ResponseCache:
+    """LRU of CachedResponse objects for the current catalog version"""
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key, version):
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, version, entry):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            if version != self._version:
+                return
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'not_modified': self.not_modified
+        }
+
+
+def init_response_cache(app):
+    app.extensions['catalog_responses'] = ResponseCache(
+        max_entries=int(os.environ.get('CATALOG_RESPONSE_CACHE_SIZE', 1024))
+    )
+
+
+def _normalized_query():
+    # Re-encoded, so an escaped '&' or '=' inside a value cannot pass for another parameter
+    return urlencode(sorted(request.args.items(multi=True)))
+
+
+def _write(entry, cache=None):
+    encoding = entry.encoding_for(request.headers.get('Accept-Encoding'))
+    etag = entry.etags[encoding]
+
+    if_none_match = request.headers.get('If-None-Match', '')
+    if etag in if_none_match or if_none_match.strip() == '*':
+        (cache or current_app.extensions['catalog_responses']).not_modified += 1
+        response = current_app.response_class(status=304)
+    else:
+        response = current_app.response_class(entry.bodies[encoding], status=entry.status, mimetype=entry.mimetype)
+        if encoding != 'identity':
+            response.headers['Content-Encoding'] = encoding
+
+    response.headers['ETag'] = etag
+    response.headers['Cache-Control'] = 'no-cache'
+    if len(entry.bodies) > 1:
+        response.vary.add('Accept-Encoding')
+    return response
+
+
+def cached_catalog_response(f):
+    """Serve a catalog view from pre-encoded bytes for the current catalog version"""
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        from app.catalog import current_catalog
+
+        cache = current_app.extensions['catalog_responses']
+        version = current_catalog().version
+        key = (request.endpoint, _normalized_query())
+
+        entry = cache.get(key, version)
+        if entry is None:
+            response = current_app.make_response(f(*args, **kwargs))
+            if response.status_code != 200 or not response.is_json:
+                return response
+            entry = CachedResponse(response.status_code, response.mimetype, response.get_data())
+            cache.put(key, version, entry)
+        return _write(entry)
+    return decorated_function
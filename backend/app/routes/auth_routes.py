@@ -1,7 +1,8 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity, current_user
 from app import db
 from app.models import User
+from app.password_hashing import PasswordHashingBusy
 import re
 
 auth_bp = Blueprint('auth', __name__)
@@ -16,6 +17,12 @@ def validate_phone(phone):
     pattern = r'^(\+91-?)?[6-9]\d{9}$'
     return re.match(pattern, phone.replace(' ', '')) is not None
 
+def hashing_busy_response():
+    """429 returned when the password hashing queue is saturated"""
+    response = jsonify({'error': 'Too many authentication requests, please retry shortly'})
+    response.headers['Retry-After'] = '1'
+    return response, 429
+
 @auth_bp.route('/login', methods=['POST'])
 def login():
     """User login endpoint"""
@@ -41,6 +48,11 @@ def login():
         if not user.is_active:
             return jsonify({'error': 'Account is deactivated'}), 401
         
+        # Upgrade hashes made with older hashing parameters
+        if user.password_needs_rehash():
+            user.set_password(password)
+            db.session.commit()
+        
         # Create tokens
         access_token = create_access_token(identity=str(user.id))
         refresh_token = create_refresh_token(identity=str(user.id))
@@ -76,6 +88,8 @@ def login():
             }
         }), 200
         
+    except PasswordHashingBusy:
+        return hashing_busy_response()
     except Exception as e:
         return jsonify({'error': f'Login failed: {str(e)}'}), 500
 
@@ -152,6 +166,9 @@ def register():
             }
         }), 201
         
+    except PasswordHashingBusy:
+        db.session.rollback()
+        return hashing_busy_response()
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Registration failed: {str(e)}'}), 500
@@ -162,9 +179,8 @@ def refresh():
     """Refresh access token"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
         
-        if not user or not user.is_active:
+        if not current_user.is_active:
             return jsonify({'error': 'User not found or inactive'}), 404
         
         new_access_token = create_access_token(identity=current_user_id)
@@ -198,10 +214,7 @@ def get_profile():
     """Get current user profile"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+        user = current_user
         
         # Get user's current plan
         current_plan = user.get_current_plan()
@@ -326,6 +339,8 @@ def change_password():
             'message': 'Password changed successfully'
         }), 200
         
+    except PasswordHashingBusy:
+        return hashing_busy_response()
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Failed to change password: {str(e)}'}), 500
@@ -335,16 +350,13 @@ def change_password():
 def verify_token():
     """Verify if token is valid"""
     try:
-        current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user or not user.is_active:
+        if not current_user.is_active:
             return jsonify({'error': 'Invalid token or user inactive'}), 401
         
         return jsonify({
             'success': True,
             'valid': True,
-            'user_id': user.id
+            'user_id': current_user.id
         }), 200
         
     except Exception as e:
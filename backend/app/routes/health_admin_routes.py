@@ -0,0 +1,93 @@
+from flask import Blueprint, request, jsonify, current_app
+from app.models import User, Plan, Transaction
+from app.services.data_service import DataService
+from datetime import datetime
+import random
+import time
+
+# Testing/administration endpoints mounted under /api/health. Kept out of
+# health_routes so lazy startup can defer them until first use.
+health_admin_bp = Blueprint('health_admin', __name__)
+
+@health_admin_bp.route('/simulate-load', methods=['POST'])
+def simulate_load():
+    """Simulate load for performance testing"""
+    try:
+        data = request.get_json() or {}
+        operations = data.get('operations', 100)
+        operation_type = data.get('type', 'mixed')  # db, api, mixed
+        
+        start_time = time.time()
+        results = {
+            'operations_completed': 0,
+            'operations_failed': 0,
+            'average_response_time': 0,
+            'errors': []
+        }
+        
+        for i in range(operations):
+            try:
+                op_start = time.time()
+                
+                if operation_type == 'db' or operation_type == 'mixed':
+                    # Simulate database operations
+                    User.query.count()
+                    Plan.query.filter_by(is_available=True).count()
+                    Transaction.query.filter_by(status='completed').count()
+                
+                if operation_type == 'api' or operation_type == 'mixed':
+                    # Simulate API operations
+                    time.sleep(random.uniform(0.001, 0.01))  # Simulate processing time
+                
+                op_time = (time.time() - op_start) * 1000
+                results['operations_completed'] += 1
+                
+                # Add some random failures for realistic testing
+                if random.random() < 0.05:  # 5% failure rate
+                    raise Exception(f"Simulated failure in operation {i}")
+                
+            except Exception as e:
+                results['operations_failed'] += 1
+                results['errors'].append(str(e))
+        
+        total_time = time.time() - start_time
+        results['total_time_seconds'] = round(total_time, 3)
+        results['operations_per_second'] = round(operations / total_time, 2)
+        results['average_response_time'] = round((total_time / operations) * 1000, 2)
+        results['success_rate'] = round((results['operations_completed'] / operations) * 100, 2)
+        
+        return jsonify({
+            'success': True,
+            'load_test_results': results,
+            'timestamp': datetime.utcnow().isoformat()
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Load simulation failed: {str(e)}'}), 500
+
+@health_admin_bp.route('/reset-data', methods=['POST'])
+def reset_test_data():
+    """Reset database to initial state (for testing)"""
+    try:
+        # This should only be available in development/testing environments
+        data_service = DataService()
+        success = data_service.reset_database()
+        
+        if success:
+            # Users were recreated wholesale, so cached identities are stale
+            current_app.extensions['identity_cache'].clear()
+            current_app.extensions['user_responses'].clear()
+            
+            return jsonify({
+                'success': True,
+                'message': 'Database reset successfully',
+                'timestamp': datetime.utcnow().isoformat()
+            }), 200
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'Failed to reset database'
+            }), 500
+        
+    except Exception as e:
+        return jsonify({'error': f'Database reset failed: {str(e)}'}), 500
@@ -1,5 +1,7 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from app import db
+from app.db_pool import get_pool_monitors
+from app.password_hashing import password_hasher
 from app.models import User, Plan, UserPlan, Transaction
 from app.services.data_service import DataService
 from datetime import datetime
@@ -60,7 +62,11 @@ def detailed_health_check():
             
             health_status['services']['database'] = {
                 'status': 'healthy',
-                'response_time_ms': round(db_response_time, 2)
+                'response_time_ms': round(db_response_time, 2),
+                'pools': {
+                    name: monitor.snapshot()
+                    for name, monitor in get_pool_monitors(current_app).items()
+                }
             }
         except Exception as e:
             health_status['services']['database'] = {
@@ -74,7 +80,9 @@ def detailed_health_check():
             user_count = User.query.count()
             health_status['services']['auth_service'] = {
                 'status': 'healthy',
-                'users_count': user_count
+                'users_count': user_count,
+                'password_hashing': password_hasher.stats(),
+                'user_responses': current_app.extensions['user_responses'].stats()
             }
         except Exception as e:
             health_status['services']['auth_service'] = {
@@ -88,7 +96,10 @@ def detailed_health_check():
             plan_count = Plan.query.filter_by(is_available=True).count()
             health_status['services']['plan_service'] = {
                 'status': 'healthy',
-                'available_plans': plan_count
+                'available_plans': plan_count,
+                'catalog_snapshot': current_app.extensions['plan_catalog'].stats(),
+                'catalog_responses': current_app.extensions['catalog_responses'].stats(),
+                'trending': current_app.extensions['trending'].stats()
             }
         except Exception as e:
             health_status['services']['plan_service'] = {
@@ -351,85 +362,6 @@ def clear_injected_errors():
     except Exception as e:
         return jsonify({'error': f'Failed to clear errors: {str(e)}'}), 500
 
-@health_bp.route('/simulate-load', methods=['POST'])
-def simulate_load():
-    """Simulate load for performance testing"""
-    try:
-        data = request.get_json() or {}
-        operations = data.get('operations', 100)
-        operation_type = data.get('type', 'mixed')  # db, api, mixed
-        
-        start_time = time.time()
-        results = {
-            'operations_completed': 0,
-            'operations_failed': 0,
-            'average_response_time': 0,
-            'errors': []
-        }
-        
-        for i in range(operations):
-            try:
-                op_start = time.time()
-                
-                if operation_type == 'db' or operation_type == 'mixed':
-                    # Simulate database operations
-                    User.query.count()
-                    Plan.query.filter_by(is_available=True).count()
-                    Transaction.query.filter_by(status='completed').count()
-                
-                if operation_type == 'api' or operation_type == 'mixed':
-                    # Simulate API operations
-                    time.sleep(random.uniform(0.001, 0.01))  # Simulate processing time
-                
-                op_time = (time.time() - op_start) * 1000
-                results['operations_completed'] += 1
-                
-                # Add some random failures for realistic testing
-                if random.random() < 0.05:  # 5% failure rate
-                    raise Exception(f"Simulated failure in operation {i}")
-                
-            except Exception as e:
-                results['operations_failed'] += 1
-                results['errors'].append(str(e))
-        
-        total_time = time.time() - start_time
-        results['total_time_seconds'] = round(total_time, 3)
-        results['operations_per_second'] = round(operations / total_time, 2)
-        results['average_response_time'] = round((total_time / operations) * 1000, 2)
-        results['success_rate'] = round((results['operations_completed'] / operations) * 100, 2)
-        
-        return jsonify({
-            'success': True,
-            'load_test_results': results,
-            'timestamp': datetime.utcnow().isoformat()
-        }), 200
-        
-    except Exception as e:
-        return jsonify({'error': f'Load simulation failed: {str(e)}'}), 500
-
-@health_bp.route('/reset-data', methods=['POST'])
-def reset_test_data():
-    """Reset database to initial state (for testing)"""
-    try:
-        # This should only be available in development/testing environments
-        data_service = DataService()
-        success = data_service.reset_database()
-        
-        if success:
-            return jsonify({
-                'success': True,
-                'message': 'Database reset successfully',
-                'timestamp': datetime.utcnow().isoformat()
-            }), 200
-        else:
-            return jsonify({
-                'success': False,
-                'error': 'Failed to reset database'
-            }), 500
-        
-    except Exception as e:
-        return jsonify({'error': f'Database reset failed: {str(e)}'}), 500
-
 @health_bp.route('/performance', methods=['GET'])
 def get_performance_metrics():
     """Get performance metrics"""
@@ -4,6 +4,11 @@ from app import db
 from app.models.plan import Plan, Transaction
 from app.models.user import User, UserPlan
 from app.services.optimized_data_service import OptimizedDataService
+from app.db_router import read_replica
+from app.catalog import current_catalog
+from app.plan_search import search_plan_ids
+from app.plan_attributes import attribute_filters
+from app.response_cache import cached_catalog_response
 from datetime import datetime, timedelta
 from sqlalchemy.orm import joinedload
 from functools import wraps
@@ -38,63 +43,34 @@ def measure_performance(f):
         return result
     return decorated_function
 
+# Behind the bundled nginx, GETs for this path go to the ASGI twin (app/async_api.py); the
+# response cache still serves deployments that send them to Flask (run.py, serve.py alone)
 @optimized_plan_bp.route('', methods=['GET'])
 @optimized_plan_bp.route('/', methods=['GET'])
 @measure_performance
+@read_replica
+@cached_catalog_response
 def get_plans_optimized():
-    """Get all available plans with optimized queries"""
+    """Get all available plans from the catalog snapshot"""
     try:
         # Get query parameters
         category = request.args.get('category')
         popular_only = request.args.get('popular', '').lower() == 'true'
         search_query = request.args.get('search', '').strip()
         
-        # Use optimized queries with proper indexing
-        if category and not search_query and not popular_only:
-            # Use cached category query
-            plans = data_service.get_plans_by_category_cached(category)
-        elif popular_only and not search_query and not category:
-            # Use cached popular plans query
-            plans = data_service.get_popular_plans_cached()
-        else:
-            # Build optimized query for complex filters
-            query = Plan.query.filter_by(is_available=True)
-            
-            if category:
-                query = query.filter_by(category=category)
-            
-            if popular_only:
-                query = query.filter_by(is_popular=True)
-            
-            if search_query:
-                # Use more efficient search
-                query = query.filter(
-                    db.or_(
-                        Plan.name.ilike(f'%{search_query}%'),
-                        Plan.description.ilike(f'%{search_query}%')
-                    )
-                )
-            
-            # Optimize ordering and limit results
-            plans = query.order_by(
-                Plan.is_popular.desc(), 
-                Plan.price.asc()
-            ).limit(50).all()  # Limit to prevent large result sets
-        
-        # Optimize serialization
-        plans_data = []
-        for plan in plans:
-            plan_dict = {
-                'id': plan.id,
-                'name': plan.name,
-                'category': plan.category,
-                'price': plan.price,
-                'currency': plan.currency,
-                'features': plan.get_features(),
-                'description': plan.description,
-                'is_popular': plan.is_popular
-            }
-            plans_data.append(plan_dict)
+        # Served from the in-memory catalog snapshot, ranked by the search index
+        catalog = current_catalog()
+        ranked_ids = catalog.search(search_query, lambda q: search_plan_ids(db.session, q)) if search_query else None
+        plans = catalog.query(
+            category=category,
+            popular_only=popular_only,
+            search=search_query,
+            ranked_ids=ranked_ids,
+            minimums=attribute_filters(request.args),
+            ott=request.args.get('ott') or None,
+            limit=50  # Limit to prevent large result sets
+        )
+        plans_data = [plan.to_summary() for plan in plans]
         
         return jsonify({
             'success': True,
@@ -109,6 +85,7 @@ def get_plans_optimized():
 @optimized_plan_bp.route('/my-plans', methods=['GET'])
 @jwt_required()
 @measure_performance
+@read_replica
 def get_user_plans_optimized():
     """Get current user's plans with optimized queries"""
     try:
@@ -160,6 +137,7 @@ def get_user_plans_optimized():
 
 @optimized_plan_bp.route('/stats', methods=['GET'])
 @measure_performance
+@read_replica
 def get_plan_stats():
     """Get plan statistics with caching"""
     try:
@@ -176,24 +154,12 @@ def get_plan_stats():
 
 @optimized_plan_bp.route('/popular', methods=['GET'])
 @measure_performance
+@read_replica
+@cached_catalog_response
 def get_popular_plans_optimized():
-    """Get popular plans with caching"""
+    """Get popular plans from the catalog snapshot"""
     try:
-        plans = data_service.get_popular_plans_cached()
-        
-        plans_data = []
-        for plan in plans:
-            plan_dict = {
-                'id': plan.id,
-                'name': plan.name,
-                'category': plan.category,
-                'price': plan.price,
-                'currency': plan.currency,
-                'features': plan.get_features(),
-                'description': plan.description,
-                'is_popular': plan.is_popular
-            }
-            plans_data.append(plan_dict)
+        plans_data = [plan.to_summary() for plan in current_catalog().popular]
         
         return jsonify({
             'success': True,
@@ -207,21 +173,12 @@ def get_popular_plans_optimized():
 
 @optimized_plan_bp.route('/categories', methods=['GET'])
 @measure_performance
+@read_replica
+@cached_catalog_response
 def get_categories_optimized():
-    """Get all plan categories with optimized query"""
+    """Get all plan categories from the catalog snapshot"""
     try:
-        categories = db.session.query(Plan.category).filter_by(is_available=True).distinct().all()
-        category_list = [cat[0] for cat in categories]
-        
-        # Get count for each category efficiently
-        category_data = []
-        for category in category_list:
-            count = Plan.query.filter_by(category=category, is_available=True).count()
-            category_data.append({
-                'name': category,
-                'count': count,
-                'display_name': category.replace('_', ' ').title()
-            })
+        category_data = current_catalog().categories()
         
         return jsonify({
             'success': True,
@@ -1,7 +1,10 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
 from app import db
 from app.models import User, Plan, Transaction, UserPlan
+from app.db_router import read_replica
+from app.user_data import cached_user_response
+from app.account_summary import account_summary
 from datetime import datetime
 import re
 import random
@@ -85,10 +88,6 @@ def process_payment():
     """Process payment for a plan subscription or renewal"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
         
         data = request.get_json()
         if not data:
@@ -175,14 +174,12 @@ def process_payment():
 
 @payment_bp.route('/history', methods=['GET'])
 @jwt_required()
+@read_replica
+@cached_user_response
 def get_payment_history():
     """Get user's payment history"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
         
         # Get query parameters
         limit = request.args.get('limit', 10, type=int)
@@ -211,10 +208,6 @@ def get_transaction(transaction_id):
     """Get specific transaction details"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
         
         transaction = Transaction.query.filter_by(
             id=transaction_id,
@@ -238,10 +231,6 @@ def retry_payment(transaction_id):
     """Retry a failed payment"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
         
         # Get original transaction
         original_transaction = Transaction.query.filter_by(
@@ -307,10 +296,6 @@ def request_refund(transaction_id):
     """Request refund for a completed transaction"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
         
         transaction = Transaction.query.filter_by(
             id=transaction_id,
@@ -470,32 +455,19 @@ def validate_card():
 
 @payment_bp.route('/summary', methods=['GET'])
 @jwt_required()
+@read_replica
+@cached_user_response
 def get_payment_summary():
     """Get payment summary for the user"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
-        
-        # Get payment statistics
-        total_transactions = Transaction.query.filter_by(user_id=current_user_id).count()
-        completed_transactions = Transaction.query.filter_by(
-            user_id=current_user_id, 
-            status='completed'
-        ).count()
-        failed_transactions = Transaction.query.filter_by(
-            user_id=current_user_id, 
-            status='failed'
-        ).count()
-        
-        # Calculate total amount spent
-        total_spent = db.session.query(db.func.sum(Transaction.amount)).filter(
-            Transaction.user_id == current_user_id,
-            Transaction.status == 'completed',
-            Transaction.amount > 0  # Exclude refunds
-        ).scalar() or 0
+        
+        # Payment statistics from the maintained summary row (total_spent excludes refunds)
+        summary = account_summary(db.session, int(current_user_id))
+        total_transactions = summary['total_transactions']
+        completed_transactions = summary['completed_transactions']
+        failed_transactions = summary['failed_transactions']
+        total_spent = summary['total_spent']
         
         # Get recent transactions
         recent_transactions = Transaction.query.filter_by(
@@ -1,13 +1,26 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
 from app import db
 from app.models import Plan, User, UserPlan, Transaction
+from app.db_router import read_replica
+from app.user_data import cached_user_response
+from app.catalog import current_catalog, changes_since
+from app.plan_search import search_plan_ids
+from app.plan_attributes import attribute_filters
+from app.response_cache import cached_catalog_response
+from app.trending import TRENDING_WINDOWS, DEFAULT_WINDOW, current_trending
+from app.recommendations import stored_recommendations
+from app.suggest import SUGGEST_LIMIT, MAX_SUGGEST_LIMIT
+from app.bundle_optimizer import DEFAULT_BUNDLE_LIMIT, MAX_BUNDLE_LIMIT, MAX_MUST_HAVE
+from app.plan_compare import COMPARE_MAX_IDS
 from datetime import datetime, timedelta
 
 plan_bp = Blueprint('plans', __name__)
 
 @plan_bp.route('', methods=['GET'])
 @plan_bp.route('/', methods=['GET'])
+@read_replica
+@cached_catalog_response
 def get_plans():
     """Get all available plans with optional filtering"""
     try:
@@ -15,36 +28,152 @@ def get_plans():
         category = request.args.get('category')
         popular_only = request.args.get('popular', '').lower() == 'true'
         search_query = request.args.get('search', '').strip()
+        min_price = request.args.get('min_price', type=float)
+        max_price = request.args.get('max_price', type=float)
+        
+        # Search goes to the full-text index; everything else (including the
+        # min_daily_data / min_speed / min_validity / min_sms / ott attribute
+        # filters) is answered by the in-memory catalog snapshot
+        catalog = current_catalog()
+        ranked_ids = catalog.search(search_query, lambda q: search_plan_ids(db.session, q)) if search_query else None
+        plans = catalog.query(
+            category=category,
+            popular_only=popular_only,
+            search=search_query,
+            min_price=min_price,
+            max_price=max_price,
+            ranked_ids=ranked_ids,
+            minimums=attribute_filters(request.args),
+            ott=request.args.get('ott') or None
+        )
         
-        # Build query
-        query = Plan.query.filter_by(is_available=True)
+        return jsonify({
+            'success': True,
+            'plans': [plan.to_dict() for plan in plans],
+            'count': len(plans),
+            'catalog_version': catalog.version
+        }), 200
         
-        if category:
-            query = query.filter_by(category=category)
+    except Exception as e:
+        return jsonify({'error': f'Failed to get plans: {str(e)}'}), 500
+
+# Most plans one batch request may ask for
+BATCH_MAX_IDS = 100
+
+def _plan_ids_from_args(max_ids):
+    """Unique plan ids from ?ids=1,2,3 as (ids, None), or (None, error response)"""
+    try:
+        plan_ids = list(dict.fromkeys(
+            int(value) for value in request.args.get('ids', '').split(',') if value.strip()
+        ))
+    except ValueError:
+        return None, (jsonify({'error': 'ids must be a comma-separated list of plan ids'}), 400)
+    
+    if not plan_ids:
+        return None, (jsonify({'error': 'ids is required'}), 400)
+    if len(plan_ids) > max_ids:
+        return None, (jsonify({'error': f'At most {max_ids} plan ids per request'}), 400)
+    return plan_ids, None
+
+@plan_bp.route('/batch', methods=['GET'])
+@read_replica
+def get_plans_batch():
+    """Get several plans in one request, keyed by id (?ids=1,2,3&stats=true)"""
+    try:
+        plan_ids, error = _plan_ids_from_args(BATCH_MAX_IDS)
+        if error:
+            return error
+        
+        # Plans come from the catalog snapshot; only the optional stats touch the database
+        catalog = current_catalog()
+        records = [record for record in (catalog.get(plan_id) for plan_id in plan_ids) if record]
+        stats = Plan.get_stats_for([record.id for record in records]) \
+            if request.args.get('stats', '').lower() == 'true' else {}
+        
+        plans = {}
+        for record in records:
+            plan_data = record.to_dict()
+            plan_data['attributes'] = record.attributes_dict()
+            plan_data.update(stats.get(record.id, {}))
+            plans[str(record.id)] = plan_data
         
-        if popular_only:
-            query = query.filter_by(is_popular=True)
+        return jsonify({
+            'success': True,
+            'plans': plans,
+            'missing': [plan_id for plan_id in plan_ids if str(plan_id) not in plans],
+            'count': len(plans)
+        }), 200
         
-        if search_query:
-            query = query.filter(
-                db.or_(
-                    Plan.name.contains(search_query),
-                    Plan.description.contains(search_query)
-                )
-            )
+    except Exception as e:
+        return jsonify({'error': f'Failed to get plans: {str(e)}'}), 500
+
+@plan_bp.route('/changes', methods=['GET'])
+@read_replica
+@cached_catalog_response
+def get_plan_changes():
+    """Plans added, changed or removed since a catalog version (?since=<version>, 0 for everything)"""
+    try:
+        since = request.args.get('since', type=int)
+        if since is None:
+            return jsonify({'error': 'since must be a catalog version (0 for the full list)'}), 400
         
-        plans = query.order_by(Plan.is_popular.desc(), Plan.price.asc()).all()
+        catalog = current_catalog()
+        full_resync, plan_ids = changes_since(db.session, since, catalog.version)
+        
+        if full_resync:
+            plans, removed = catalog.plans, []
+        else:
+            changed = set(plan_ids)
+            plans = [plan for plan in catalog.plans if plan.id in changed]
+            removed = [plan_id for plan_id in plan_ids if catalog.get(plan_id) is None]
         
         return jsonify({
             'success': True,
+            'version': catalog.version,
+            'since': since,
+            'full_resync': full_resync,
             'plans': [plan.to_dict() for plan in plans],
+            'removed': removed
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to get plan changes: {str(e)}'}), 500
+
+@plan_bp.route('/compare', methods=['GET'])
+@read_replica
+@cached_catalog_response
+def compare_plans():
+    """Feature x plan comparison matrix (?ids=1,2,3)"""
+    try:
+        plan_ids, error = _plan_ids_from_args(COMPARE_MAX_IDS)
+        if error:
+            return error
+        
+        catalog = current_catalog()
+        records = [record for record in (catalog.get(plan_id) for plan_id in plan_ids) if record]
+        comparison = catalog.feature_vocabulary().compare([record.id for record in records])
+        
+        plans = []
+        for record in records:
+            plan_data = record.to_summary()
+            plan_data['attributes'] = record.attributes_dict()
+            plans.append(plan_data)
+        
+        return jsonify({
+            'success': True,
+            'plans': plans,
+            'matrix': comparison['matrix'],
+            'common': comparison['common'],
+            'unique': {str(plan_id): features for plan_id, features in comparison['unique'].items()},
+            'missing': [plan_id for plan_id in plan_ids if catalog.get(plan_id) is None],
             'count': len(plans)
         }), 200
         
     except Exception as e:
-        return jsonify({'error': f'Failed to get plans: {str(e)}'}), 500
+        return jsonify({'error': f'Failed to compare plans: {str(e)}'}), 500
 
 @plan_bp.route('/<plan_id>', methods=['GET'])
+@read_replica
 def get_plan(plan_id):
     """Get specific plan details"""
     try:
@@ -53,10 +182,10 @@ def get_plan(plan_id):
         if not plan or not plan.is_available:
             return jsonify({'error': 'Plan not found'}), 404
         
-        # Get additional statistics
+        # Get additional statistics (precomputed in plan_stats)
         plan_data = plan.to_dict()
-        plan_data['subscribers_count'] = plan.get_active_subscribers_count()
-        plan_data['total_revenue'] = plan.get_total_revenue()
+        plan_data.update(Plan.get_stats_for([plan.id])[plan.id])
+        plan_data['attributes'] = plan.attributes.to_dict() if plan.attributes else None
         
         return jsonify({
             'success': True,
@@ -67,21 +196,12 @@ def get_plan(plan_id):
         return jsonify({'error': f'Failed to get plan: {str(e)}'}), 500
 
 @plan_bp.route('/categories', methods=['GET'])
+@read_replica
+@cached_catalog_response
 def get_categories():
     """Get all plan categories"""
     try:
-        categories = db.session.query(Plan.category).filter_by(is_available=True).distinct().all()
-        category_list = [cat[0] for cat in categories]
-        
-        # Get count for each category
-        category_data = []
-        for category in category_list:
-            count = Plan.query.filter_by(category=category, is_available=True).count()
-            category_data.append({
-                'name': category,
-                'count': count,
-                'display_name': category.replace('_', ' ').title()
-            })
+        category_data = current_catalog().categories()
         
         return jsonify({
             'success': True,
@@ -91,11 +211,106 @@ def get_categories():
     except Exception as e:
         return jsonify({'error': f'Failed to get categories: {str(e)}'}), 500
 
+@plan_bp.route('/facets', methods=['GET'])
+@read_replica
+@cached_catalog_response
+def get_plan_facets():
+    """Get the filtered plan list with category, price band, popularity and duration counts"""
+    try:
+        popular = request.args.get('popular', '').lower()
+        search_query = request.args.get('search', '').strip()
+        
+        catalog = current_catalog()
+        ranked_ids = catalog.search(search_query, lambda q: search_plan_ids(db.session, q)) if search_query else None
+        plans, facets = catalog.faceted(
+            category=request.args.get('category') or None,
+            price_band=request.args.get('price_band') or None,
+            popular={'true': True, 'false': False}.get(popular),
+            duration=request.args.get('duration') or None,
+            search=search_query,
+            ranked_ids=ranked_ids
+        )
+        
+        return jsonify({
+            'success': True,
+            'plans': [plan.to_dict() for plan in plans],
+            'count': len(plans),
+            'facets': facets
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to get plan facets: {str(e)}'}), 500
+
+@plan_bp.route('/suggest', methods=['GET'])
+@read_replica
+@cached_catalog_response
+def get_plan_suggestions():
+    """Typeahead completions over plan names and features"""
+    try:
+        prefix = request.args.get('q', '')
+        category = request.args.get('category') or None
+        limit = max(1, min(request.args.get('limit', SUGGEST_LIMIT, type=int), MAX_SUGGEST_LIMIT))
+        
+        suggestions = current_catalog().suggest(prefix, category=category, limit=limit)
+        
+        return jsonify({
+            'success': True,
+            'q': prefix,
+            'suggestions': suggestions,
+            'count': len(suggestions)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to get suggestions: {str(e)}'}), 500
+
+@plan_bp.route('/optimize', methods=['GET'])
+@read_replica
+@cached_catalog_response
+def optimize_bundle():
+    """Best plan combinations within a budget, at most one plan per category"""
+    try:
+        budget = request.args.get('budget', type=float)
+        if budget is None or budget <= 0:
+            return jsonify({'error': 'budget must be a positive number'}), 400
+        
+        catalog = current_catalog()
+        categories = [value.strip().lower() for value in request.args.get('categories', '').split(',') if value.strip()]
+        unknown = [category for category in categories if category not in catalog.by_category]
+        if unknown:
+            return jsonify({'error': f"Unknown categories: {', '.join(unknown)}"}), 400
+        if len(set(categories)) != len(categories):
+            return jsonify({'error': 'Each category can be listed once'}), 400
+        
+        must_have = [value.strip().lower() for value in request.args.get('must_have', '').split(',') if value.strip()]
+        if len(must_have) > MAX_MUST_HAVE:
+            return jsonify({'error': f'At most {MAX_MUST_HAVE} must_have terms are allowed'}), 400
+        
+        limit = max(1, min(request.args.get('limit', DEFAULT_BUNDLE_LIMIT, type=int), MAX_BUNDLE_LIMIT))
+        bundles = catalog.optimize(budget, categories=categories, must_have=must_have, limit=limit)
+        
+        return jsonify({
+            'success': True,
+            'budget': budget,
+            'categories': categories,
+            'must_have': must_have,
+            'bundles': [{
+                'plans': [plan.to_summary() for plan in plans],
+                'total_price': round(cost, 2),
+                'value': round(value, 2)
+            } for value, cost, plans in bundles],
+            'count': len(bundles)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to optimize bundle: {str(e)}'}), 500
+
 @plan_bp.route('/popular', methods=['GET'])
+@read_replica
+@cached_catalog_response
 def get_popular_plans():
     """Get popular plans"""
     try:
-        plans = Plan.query.filter_by(is_popular=True, is_available=True).order_by(Plan.price.asc()).all()
+        plans = current_catalog().popular
         
         return jsonify({
             'success': True,
@@ -106,16 +321,41 @@ def get_popular_plans():
     except Exception as e:
         return jsonify({'error': f'Failed to get popular plans: {str(e)}'}), 500
 
+@plan_bp.route('/trending', methods=['GET'])
+@read_replica
+def get_trending_plans():
+    """Get plans ranked by recent subscriptions and payments"""
+    try:
+        window = request.args.get('window', DEFAULT_WINDOW)
+        if window not in TRENDING_WINDOWS:
+            return jsonify({'error': f"window must be one of: {', '.join(TRENDING_WINDOWS)}"}), 400
+        
+        limit = max(1, min(request.args.get('limit', 10, type=int), 50))
+        catalog = current_catalog()
+        ranked = current_trending().top(window, limit, accept=lambda plan_id: catalog.get(plan_id) is not None)
+        
+        plans = []
+        for plan_id, score in ranked:
+            plan_data = catalog.get(plan_id).to_dict()
+            plan_data['trending_score'] = round(score, 4)
+            plans.append(plan_data)
+        
+        return jsonify({
+            'success': True,
+            'window': window,
+            'plans': plans,
+            'count': len(plans)
+        }), 200
+        
+    except Exception as e:
+        return jsonify({'error': f'Failed to get trending plans: {str(e)}'}), 500
+
 @plan_bp.route('/subscribe', methods=['POST'])
 @jwt_required()
 def subscribe_to_plan():
     """Subscribe user to a plan"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
         
         data = request.get_json()
         if not data:
@@ -200,14 +440,12 @@ def subscribe_to_plan():
 
 @plan_bp.route('/my-plans', methods=['GET'])
 @jwt_required()
+@read_replica
+@cached_user_response
 def get_user_plans():
     """Get current user's plans"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
         
         # Get all user plans
         user_plans = UserPlan.query.filter_by(user_id=current_user_id).order_by(
@@ -236,10 +474,7 @@ def get_current_plan():
     """Get user's current active plan"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+        user = current_user
         
         current_plan = user.get_current_plan()
         
@@ -268,10 +503,6 @@ def renew_plan(user_plan_id):
     """Renew a user's plan"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
         
         # Get user plan
         user_plan = UserPlan.query.filter_by(
@@ -339,10 +570,6 @@ def cancel_plan(user_plan_id):
     """Cancel a user's plan"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
         
         # Get user plan
         user_plan = UserPlan.query.filter_by(
@@ -378,10 +605,6 @@ def toggle_auto_renewal(user_plan_id):
     """Toggle auto-renewal for a user's plan"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
         
         # Get user plan
         user_plan = UserPlan.query.filter_by(
@@ -414,49 +637,57 @@ def get_plan_recommendations():
     """Get plan recommendations for the user"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+        user = current_user
         
         # Get user's current plan
         current_plan = user.get_current_plan()
         
-        # Simple recommendation logic
-        recommendations = []
-        
-        if current_plan:
-            # Recommend plans in the same category with higher features
-            same_category_plans = Plan.query.filter(
-                Plan.category == current_plan.plan.category,
-                Plan.price > current_plan.plan.price,
-                Plan.is_available == True,
-                Plan.id != current_plan.plan_id
-            ).order_by(Plan.price.asc()).limit(3).all()
-            
-            recommendations.extend(same_category_plans)
-            
-            # Recommend popular plans from other categories
-            other_category_plans = Plan.query.filter(
-                Plan.category != current_plan.plan.category,
-                Plan.is_popular == True,
-                Plan.is_available == True
-            ).limit(2).all()
-            
-            recommendations.extend(other_category_plans)
-        else:
-            # For users without plans, recommend popular plans
-            popular_plans = Plan.query.filter_by(
-                is_popular=True,
-                is_available=True
-            ).order_by(Plan.price.asc()).limit(5).all()
+        # Precomputed co-subscription recommendations for the user's segment (python manage.py recommendations)
+        recommendations = stored_recommendations(
+            db.session,
+            current_plan.plan if current_plan else None,
+            current_catalog(),
+            exclude={current_plan.plan_id} if current_plan else ()
+        )
+        source = 'co_subscription'
+        
+        if not recommendations:
+            # Simple recommendation logic when the segment has nothing stored yet
+            source = 'rules'
             
-            recommendations.extend(popular_plans)
+            if current_plan:
+                # Recommend plans in the same category with higher features
+                same_category_plans = Plan.query.filter(
+                    Plan.category == current_plan.plan.category,
+                    Plan.price > current_plan.plan.price,
+                    Plan.is_available == True,
+                    Plan.id != current_plan.plan_id
+                ).order_by(Plan.price.asc()).limit(3).all()
+                
+                recommendations.extend(same_category_plans)
+                
+                # Recommend popular plans from other categories
+                other_category_plans = Plan.query.filter(
+                    Plan.category != current_plan.plan.category,
+                    Plan.is_popular == True,
+                    Plan.is_available == True
+                ).limit(2).all()
+                
+                recommendations.extend(other_category_plans)
+            else:
+                # For users without plans, recommend popular plans
+                popular_plans = Plan.query.filter_by(
+                    is_popular=True,
+                    is_available=True
+                ).order_by(Plan.price.asc()).limit(5).all()
+                
+                recommendations.extend(popular_plans)
         
         return jsonify({
             'success': True,
             'recommendations': [plan.to_dict() for plan in recommendations],
-            'count': len(recommendations)
+            'count': len(recommendations),
+            'source': source
         }), 200
         
     except Exception as e:
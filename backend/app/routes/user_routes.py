@@ -1,20 +1,23 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import jwt_required, get_jwt_identity, current_user
 from app import db
 from app.models import User, UserPlan, Transaction
+from app.db_router import read_replica
+from app.user_data import cached_user_response
+from app.account_summary import account_summary
+from app.password_hashing import PasswordHashingBusy
+from app.routes.auth_routes import hashing_busy_response
 
 user_bp = Blueprint('users', __name__)
 
 @user_bp.route('/profile', methods=['GET'])
 @jwt_required()
+@cached_user_response
 def get_user_profile():
     """Get detailed user profile with plans and payment history"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+        user = current_user
         
         # Get user's current plan
         current_plan = user.get_current_plan()
@@ -70,35 +73,21 @@ def get_user_profile():
 
 @user_bp.route('/dashboard', methods=['GET'])
 @jwt_required()
+@cached_user_response
 def get_user_dashboard():
     """Get user dashboard data"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(int(current_user_id))
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+        user = current_user
         
         # Get current plan
         current_plan = user.get_current_plan()
         
-        # Get payment statistics
-        total_spent = db.session.query(db.func.sum(Transaction.amount)).filter(
-            Transaction.user_id == int(current_user_id),
-            Transaction.status == 'completed',
-            Transaction.amount > 0
-        ).scalar() or 0
-        
-        total_transactions = Transaction.query.filter_by(
-            user_id=int(current_user_id),
-            status='completed'
-        ).count()
-        
-        # Get active plans count
-        active_plans_count = UserPlan.query.filter_by(
-            user_id=int(current_user_id),
-            status='active'
-        ).count()
+        # Payment and plan statistics from the maintained summary row
+        summary = account_summary(db.session, int(current_user_id))
+        total_spent = summary['total_spent']
+        total_transactions = summary['completed_transactions']
+        active_plans_count = summary['active_plans']
         
         # Get expiring plans (within 7 days)
         from datetime import datetime, timedelta
@@ -150,14 +139,11 @@ def get_user_dashboard():
 
 @user_bp.route('/notifications', methods=['GET'])
 @jwt_required()
+@cached_user_response
 def get_user_notifications():
     """Get user notifications"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
         
         notifications = []
         
@@ -236,10 +222,6 @@ def get_user_preferences():
     """Get user preferences"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
         
         # For now, return default preferences
         # In a real application, these would be stored in a separate table
@@ -274,10 +256,6 @@ def update_user_preferences():
     """Update user preferences"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
         
         data = request.get_json()
         if not data:
@@ -297,14 +275,12 @@ def update_user_preferences():
 
 @user_bp.route('/activity', methods=['GET'])
 @jwt_required()
+@read_replica
+@cached_user_response
 def get_user_activity():
     """Get user activity log"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
         
         # Get query parameters
         limit = request.args.get('limit', 20, type=int)
@@ -363,49 +339,28 @@ def get_user_activity():
 
 @user_bp.route('/stats', methods=['GET'])
 @jwt_required()
+@cached_user_response
 def get_user_stats():
     """Get user statistics"""
     try:
         current_user_id = get_jwt_identity()
-        user = User.query.get(current_user_id)
-        
-        if not user:
-            return jsonify({'error': 'User not found'}), 404
+        user = current_user
         
         # Calculate various statistics
         from datetime import datetime, timedelta
         
-        # Total spending
-        total_spent = db.session.query(db.func.sum(Transaction.amount)).filter(
-            Transaction.user_id == current_user_id,
-            Transaction.status == 'completed',
-            Transaction.amount > 0
-        ).scalar() or 0
+        # Spending, plan and payment counters from the maintained summary rows
+        summary = account_summary(db.session, int(current_user_id))
+        total_spent = summary['total_spent']
+        monthly_spent = summary['monthly_spent']
         
-        # Monthly spending (current month)
-        current_month_start = datetime.utcnow().replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-        monthly_spent = db.session.query(db.func.sum(Transaction.amount)).filter(
-            Transaction.user_id == current_user_id,
-            Transaction.status == 'completed',
-            Transaction.amount > 0,
-            Transaction.created_at >= current_month_start
-        ).scalar() or 0
-        
-        # Plan statistics
-        total_plans = UserPlan.query.filter_by(user_id=current_user_id).count()
-        active_plans = UserPlan.query.filter_by(user_id=current_user_id, status='active').count()
-        expired_plans = UserPlan.query.filter_by(user_id=current_user_id, status='expired').count()
-        
-        # Payment statistics
-        total_transactions = Transaction.query.filter_by(user_id=current_user_id).count()
-        successful_payments = Transaction.query.filter_by(
-            user_id=current_user_id, 
-            status='completed'
-        ).count()
-        failed_payments = Transaction.query.filter_by(
-            user_id=current_user_id, 
-            status='failed'
-        ).count()
+        total_plans = summary['total_plans']
+        active_plans = summary['active_plans']
+        expired_plans = summary['expired_plans']
+        
+        total_transactions = summary['total_transactions']
+        successful_payments = summary['completed_transactions']
+        failed_payments = summary['failed_transactions']
         
         # Calculate success rate
         success_rate = (successful_payments / total_transactions * 100) if total_transactions > 0 else 0
@@ -433,7 +388,8 @@ def get_user_stats():
             'account': {
                 'member_since': user.created_at.isoformat(),
                 'account_age_days': account_age_days,
-                'last_activity': user.updated_at.isoformat() if user.updated_at else user.created_at.isoformat()
+                'last_activity': max(filter(None, (user.updated_at, summary['last_activity'])),
+                                     default=user.created_at).isoformat()
             }
         }
         
@@ -484,6 +440,8 @@ def delete_user_account():
             'message': 'Account deleted successfully'
         }), 200
         
+    except PasswordHashingBusy:
+        return hashing_busy_response()
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': f'Failed to delete account: {str(e)}'}), 500
@@ -8,11 +8,13 @@ class DataService:
     """Service to handle data initialization and management"""
     
     def __init__(self):
+        # Password hashes are precomputed so seeding does not pay for pbkdf2
         self.sample_users = [
             {
                 'username': 'john.doe',
                 'email': 'john.doe@email.com',
-                'password': 'password123',
+                'password': None,
+                'password_hash': 'pbkdf2:sha256:600000$tY9qm8hEcejIXltm$119a9fe5e48335c8931dcf3ee801fcf9b1b70304bf8d070f034cc13bedfe6ce1',  # password123
                 'first_name': 'John',
                 'last_name': 'Doe',
                 'phone': '+91-9876543210'
@@ -20,7 +22,8 @@ class DataService:
             {
                 'username': 'jane.smith',
                 'email': 'jane.smith@email.com',
-                'password': 'password456',
+                'password': None,
+                'password_hash': 'pbkdf2:sha256:600000$AJ6FVgSit7fILKLV$98363356fe79ef582f050d32e0e7697eb71d3fd68dcda80979ccdf8e6300c900',  # password456
                 'first_name': 'Jane',
                 'last_name': 'Smith',
                 'phone': '+91-9876543211'
@@ -28,7 +31,8 @@ class DataService:
             {
                 'username': 'test.user',
                 'email': 'test.user@email.com',
-                'password': 'test123',
+                'password': None,
+                'password_hash': 'pbkdf2:sha256:600000$Q6WjlQo1XilsBe6B$d9de18480c1c2313621ddca3a362c650bf95a08202581e311869e5822d279616',  # test123
                 'first_name': 'Test',
                 'last_name': 'User',
                 'phone': '+91-9876543212'
@@ -345,9 +349,13 @@ class DataService:
     def reset_database(self):
         """Reset database (for testing purposes)"""
         try:
+            from app.migrations import reset_version_history, bootstrap
+            from app.plan_search import drop_search_index
+            with db.engine.begin() as connection:
+                drop_search_index(connection)
             db.drop_all()
-            db.create_all()
-            self.initialize_sample_data()
+            reset_version_history()
+            bootstrap()
             print("Database reset successfully")
             return True
         except Exception as e:
@@ -0,0 +1,121 @@
+"""
+SQLite production profile.
+
+File-backed SQLite databases get their pragmas from a connect-event hook so
+every pooled connection is tuned the same way:
+
+- journal_mode=WAL: readers no longer wait for writers (and vice versa)
+- synchronous=NORMAL: safe with WAL, fsyncs only at checkpoints
+- busy_timeout: writers queue for the lock instead of failing with
+  "database is locked"
+- mmap_size / cache_size / temp_store=MEMORY: fewer read syscalls and no
+  temp files for sorts
+
+``PRAGMA optimize`` is run on a connection when it is returned to the pool,
+at most once per SQLITE_OPTIMIZE_INTERVAL seconds per engine. Every setting can
+be overridden with SQLITE_* environment variables, and SQLITE_PROFILE=false
+turns the profile off.
+"""
+import os
+import threading
+import time
+from sqlalchemy import event
+
+# Pragmas applied to every new connection, in order (journal_mode first)
+DEFAULT_PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('busy_timeout', 5000),
+    ('mmap_size', 268435456),    # 256 MB
+    ('cache_size', -65536),      # negative = KiB, i.e. 64 MB per connection
+    ('temp_store', 'MEMORY'),
+)
+
+_ENV_OVERRIDES = {
+    'journal_mode': 'SQLITE_JOURNAL_MODE',
+    'synchronous': 'SQLITE_SYNCHRONOUS',
+    'busy_timeout': 'SQLITE_BUSY_TIMEOUT_MS',
+    'mmap_size': 'SQLITE_MMAP_SIZE',
+    'cache_size': 'SQLITE_CACHE_SIZE',
+    'temp_store': 'SQLITE_TEMP_STORE',
+}
+
+DEFAULT_OPTIMIZE_INTERVAL = 3600
+
+
+def is_file_sqlite(url):
+    """True for SQLite URLs that point at a file on disk"""
+    if url.get_backend_name() != 'sqlite':
+        return False
+    database = url.database or ''
+    return database not in ('', ':memory:') and not database.startswith('file::memory:')
+
+
+def pragmas_from_env():
+    """The pragma profile with SQLITE_* environment overrides applied"""
+    pragmas = []
+    for name, default in DEFAULT_PRAGMAS:
+        value = os.environ.get(_ENV_OVERRIDES[name])
+        pragmas.append((name, value.strip() if value and value.strip() else default))
+    return pragmas
+
+
+class SQLiteTuner:
+    """Applies the pragma profile and runs PRAGMA optimize periodically"""
+
+    def __init__(self, pragmas, optimize_interval=DEFAULT_OPTIMIZE_INTERVAL):
+        self.pragmas = list(pragmas)
+        self.optimize_interval = optimize_interval
+        self.optimize_runs = 0
+        self._last_optimize = time.monotonic()
+        self._lock = threading.Lock()
+
+    def on_connect(self, dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in self.pragmas:
+                cursor.execute(f'PRAGMA {name}={value}')
+        finally:
+            cursor.close()
+
+    def on_checkin(self, dbapi_connection, connection_record):
+        if dbapi_connection is None or self.optimize_interval <= 0:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_optimize < self.optimize_interval:
+                return
+            self._last_optimize = now
+
+        try:
+            cursor = dbapi_connection.cursor()
+            cursor.execute('PRAGMA optimize')
+            cursor.close()
+            self.optimize_runs += 1
+        except Exception as e:
+            print(f"Warning: PRAGMA optimize failed: {e}")
+
+
+def configure_sqlite(engine, pragmas=None, optimize_interval=None):
+    """Attach the SQLite profile to a file-backed engine; returns the tuner or None"""
+    if not is_file_sqlite(engine.url):
+        return None
+    if os.environ.get('SQLITE_PROFILE', 'true').lower() != 'true':
+        return None
+
+    if pragmas is None:
+        pragmas = pragmas_from_env()
+    if optimize_interval is None:
+        optimize_interval = float(os.environ.get('SQLITE_OPTIMIZE_INTERVAL', DEFAULT_OPTIMIZE_INTERVAL))
+
+    tuner = SQLiteTuner(pragmas, optimize_interval)
+    event.listen(engine, 'connect', tuner.on_connect)
+    event.listen(engine, 'checkin', tuner.on_checkin)
+    return tuner
+
+
+def read_pragmas(connection, names=None):
+    """Current values of the profile's pragmas on an open connection"""
+    names = names or [name for name, _ in DEFAULT_PRAGMAS]
+    return {name: connection.exec_driver_sql(f'PRAGMA {name}').scalar() for name in names}
@@ -0,0 +1,132 @@
+"""
+Startup profiling for the backend.
+
+``create_app()`` and ``run.py`` record how long each startup phase takes in
+``PHASES``. ``python run.py --profile-startup`` re-imports run.py in a fresh
+interpreter with ``-X importtime``, combines the per-module import times with
+the recorded phases and writes a JSON report.
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Startup phases recorded in this process, in order
+PHASES = []
+
+_PROFILE_MARKER = 'STARTUP_PROFILE_JSON:'
+
+_CHILD_SCRIPT = f"""
+import json, time
+started = time.perf_counter()
+import run
+total = time.perf_counter() - started
+from app.startup_profiler import PHASES
+print({_PROFILE_MARKER!r} + json.dumps({{'phases': PHASES, 'total_seconds': total}}))
+"""
+
+
+def record_phase(name, seconds):
+    """Record the duration of a startup phase"""
+    PHASES.append({'phase': name, 'seconds': round(seconds, 6)})
+
+
+@contextmanager
+def startup_phase(name):
+    """Time a block of startup code"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_phase(name, time.perf_counter() - started)
+
+
+def parse_importtime(output):
+    """Parse `-X importtime` output into a list of module timings (microseconds)"""
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header line
+
+        name = fields[2].rstrip()
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append({
+            'module': name.strip(),
+            'self_us': int(fields[0]),
+            'cumulative_us': int(fields[1]),
+            'depth': depth
+        })
+    return modules
+
+
+def summarize_imports(modules, top=25):
+    """Aggregate module timings by top-level package and pick the slowest modules"""
+    packages = {}
+    for module in modules:
+        package = module['module'].split('.')[0]
+        packages[package] = packages.get(package, 0) + module['self_us']
+
+    return {
+        'module_count': len(modules),
+        'total_self_ms': round(sum(module['self_us'] for module in modules) / 1000, 3),
+        'by_package_ms': {
+            package: round(self_us / 1000, 3)
+            for package, self_us in sorted(packages.items(), key=lambda item: item[1], reverse=True)
+        },
+        'slowest_cumulative': sorted(modules, key=lambda m: m['cumulative_us'], reverse=True)[:top],
+        'slowest_self': sorted(modules, key=lambda m: m['self_us'], reverse=True)[:top]
+    }
+
+
+def profile_startup(output_path='startup_profile.json', top=25):
+    """Measure a cold start of run.py in a child interpreter and write a JSON report"""
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', _CHILD_SCRIPT],
+        cwd=backend_dir,
+        env=os.environ.copy(),
+        capture_output=True,
+        text=True
+    )
+    wall_seconds = time.perf_counter() - started
+
+    if result.returncode != 0:
+        raise RuntimeError(f"Startup profiling failed:\n{result.stderr[-2000:]}")
+
+    child = {}
+    for line in result.stdout.splitlines():
+        if line.startswith(_PROFILE_MARKER):
+            child = json.loads(line[len(_PROFILE_MARKER):])
+
+    report = {
+        'generated_at': datetime.utcnow().isoformat(),
+        'python': sys.version.split()[0],
+        'lazy_startup': os.environ.get('LAZY_STARTUP', 'false').lower() == 'true',
+        'process_wall_seconds': round(wall_seconds, 6),
+        'import_run_seconds': round(child.get('total_seconds', 0), 6),
+        'phases': child.get('phases', []),
+        'imports': summarize_imports(parse_importtime(result.stderr), top=top)
+    }
+
+    with open(output_path, 'w') as report_file:
+        json.dump(report, report_file, indent=2)
+
+    return report
+
+
+def print_report(report, output_path):
+    """Print a short human-readable summary of a startup report"""
+    print(f"Startup profile written to {output_path}")
+    print(f"Cold start (import run): {report['import_run_seconds'] * 1000:.1f}ms")
+    for phase in report['phases']:
+        print(f"  {phase['phase']:<24} {phase['seconds'] * 1000:>9.1f}ms")
+    print("Slowest imports (cumulative):")
+    for module in report['imports']['slowest_cumulative'][:10]:
+        print(f"  {module['module']:<40} {module['cumulative_us'] / 1000:>9.1f}ms")
@@ -0,0 +1,111 @@
+"""
+Typeahead completions over plan names and features.
+
+Each catalog snapshot builds one SuggestIndex the first time it is asked.
+Every plan name and feature string is indexed under its lowercased text
+starting at each of its words, so "mob" completes "Premium Mobile Plan" as
+well as "Mobile Hotspot". All keys sit in one sorted array: a prefix is a
+bisect to the first key >= prefix and a walk while the keys still start with
+it. The top-k answer per (prefix, category, k) is memoized for the life of
+the snapshot, so repeated keystrokes cost a dict lookup.
+"""
+from bisect import bisect_left
+
+SUGGEST_LIMIT = 8
+MAX_SUGGEST_LIMIT = 20
+
+# Distinct (prefix, category, limit) answers remembered per snapshot
+SUGGEST_CACHE_SIZE = 2048
+
+
+def _normalize(text):
+    return ' '.join((text or '').lower().split())
+
+
+class _Suggestion:
+    __slots__ = ('text', 'kind', 'plan_ids', 'categories', 'popular')
+
+    def __init__(self, text, kind):
+        self.text = text
+        self.kind = kind
+        self.plan_ids = []
+        self.categories = {}
+        self.popular = False
+
+    def add_plan(self, plan):
+        self.plan_ids.append(plan.id)
+        self.categories[plan.category] = self.categories.get(plan.category, 0) + 1
+        self.popular = self.popular or bool(plan.is_popular)
+
+    def to_dict(self, category=None):
+        if self.kind == 'plan':
+            return {'text': self.text, 'type': 'plan', 'plan_id': self.plan_ids[0],
+                    'category': next(iter(self.categories))}
+        count = self.categories.get(category, 0) if category else len(self.plan_ids)
+        return {'text': self.text, 'type': 'feature', 'plan_count': count}
+
+
+class SuggestIndex:
+    """Sorted array of word-start keys over plan names and feature strings"""
+
+    def __init__(self, plans):
+        suggestions = []
+        features = {}
+        for plan in plans:
+            suggestion = _Suggestion(plan.name, 'plan')
+            suggestion.add_plan(plan)
+            suggestions.append(suggestion)
+
+            for feature in plan.features:
+                key = _normalize(str(feature))
+                if not key:
+                    continue
+                if key not in features:
+                    features[key] = _Suggestion(' '.join(str(feature).split()), 'feature')
+                    suggestions.append(features[key])
+                features[key].add_plan(plan)
+
+        entries = []
+        for position, suggestion in enumerate(suggestions):
+            words = _normalize(suggestion.text).split(' ')
+            for start in range(len(words)):
+                # Whole-text matches rank above matches further into the text
+                entries.append((' '.join(words[start:]), 0 if start == 0 else 1, position))
+        entries.sort()
+
+        self._suggestions = suggestions
+        self._keys = [key for key, _, _ in entries]
+        self._entries = [(offset, position) for _, offset, position in entries]
+        self._cache = {}
+
+    def complete(self, prefix, category=None, limit=SUGGEST_LIMIT):
+        """Up to ``limit`` completions for ``prefix``, optionally only from one category's plans"""
+        prefix = _normalize(prefix)
+        if not prefix:
+            return []
+        cache_key = (prefix, category, limit)
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        best = {}
+        index = bisect_left(self._keys, prefix)
+        while index < len(self._keys) and self._keys[index].startswith(prefix):
+            offset, position = self._entries[index]
+            if offset < best.get(position, 2):
+                best[position] = offset
+            index += 1
+
+        matches = []
+        for position, offset in best.items():
+            suggestion = self._suggestions[position]
+            if category and category not in suggestion.categories:
+                continue
+            rank = (offset, suggestion.kind != 'plan', not suggestion.popular, len(suggestion.text), suggestion.text)
+            matches.append((rank, suggestion))
+        matches.sort(key=lambda match: match[0])
+
+        results = [suggestion.to_dict(category) for _, suggestion in matches[:limit]]
+        if len(self._cache) < SUGGEST_CACHE_SIZE:
+            self._cache[cache_key] = results
+        return results
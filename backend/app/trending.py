@@ -0,0 +1,313 @@
+"""
+Trending plans from live subscription velocity.
+
+Every committed subscription (a new active UserPlan) and payment (a
+Transaction that becomes completed with a positive amount, which covers
+renewals) is an event for its plan. Each worker keeps an exponentially
+time-decayed score per plan for each window in TRENDING_WINDOWS: an event
+counts 1/e as much once one window has passed.
+
+Scores are stored scaled to a reference time (``epoch``), so an event adds
+``weight * exp((now - epoch) / window)`` and nothing has to be decayed as time
+passes. Decay multiplies every score of a window by the same factor, which
+never changes their order, so the ranking is kept sorted on write and
+``GET /api/plans/trending`` reads the top k in O(k).
+
+Every TRENDING_PERSIST_INTERVAL seconds (checked at the end of a request) a
+worker adds its new events to the ``plan_trending`` table (migration 7) and
+reloads the table, which brings in the other workers' events and lets the
+scores survive restarts.
+"""
+from bisect import bisect_left, insort
+from datetime import datetime
+from flask import current_app, has_app_context
+from sqlalchemy import event, inspect, select
+from threading import Lock
+import math
+import os
+import time
+
+# Window label -> decay time constant in seconds
+TRENDING_WINDOWS = {'1h': 3600, '24h': 86400, '7d': 7 * 86400}
+DEFAULT_WINDOW = '24h'
+
+EVENT_WEIGHTS = {'subscribe': 1.0, 'payment': 0.5}
+
+# Rescale to a new epoch before exp((now - epoch) / window) gets this large
+MAX_GROWTH_EXPONENT = 50
+
+# Persisted scores below this are treated as zero
+MIN_SCORE = 1e-6
+
+
+def _rescaled(values, decay):
+    return {plan_id: value * decay for plan_id, value in values.items()}
+
+
+class TrendingEngine:
+    """Decayed per-plan demand scores for one worker"""
+
+    def __init__(self, windows=None, persist_interval=60, clock=time.time):
+        self.windows = dict(windows or TRENDING_WINDOWS)
+        self.persist_interval = persist_interval
+        self._clock = clock
+        self._lock = Lock()
+        self._sync_lock = Lock()
+        self._epoch = clock()
+        self._base = {window: {} for window in self.windows}
+        self._pending = {window: {} for window in self.windows}
+        self._ranking = {window: [] for window in self.windows}
+        self._synced_at = None
+        self.events = 0
+        self.syncs = 0
+        self.sync_errors = 0
+
+    def _decay(self, window, since, until):
+        return math.exp(-(until - since) / self.windows[window])
+
+    def _score(self, window, plan_id):
+        return self._base[window].get(plan_id, 0.0) + self._pending[window].get(plan_id, 0.0)
+
+    def _rebuild_rankings(self):
+        for window in self.windows:
+            plan_ids = set(self._base[window]) | set(self._pending[window])
+            self._ranking[window] = sorted((-self._score(window, plan_id), plan_id) for plan_id in plan_ids)
+
+    def _rebase(self, now):
+        # Called with the lock held
+        for window in self.windows:
+            decay = self._decay(window, self._epoch, now)
+            self._base[window] = _rescaled(self._base[window], decay)
+            self._pending[window] = _rescaled(self._pending[window], decay)
+        self._epoch = now
+        self._rebuild_rankings()
+
+    def record(self, events, now=None):
+        """Add (plan_id, weight) events that happened at ``now``"""
+        now = self._clock() if now is None else now
+        with self._lock:
+            if (now - self._epoch) / min(self.windows.values()) > MAX_GROWTH_EXPONENT:
+                self._rebase(now)
+            for plan_id, weight in events:
+                for window, tau in self.windows.items():
+                    old = self._score(window, plan_id)
+                    pending = self._pending[window]
+                    pending[plan_id] = pending.get(plan_id, 0.0) + weight * math.exp((now - self._epoch) / tau)
+                    ranking = self._ranking[window]
+                    index = bisect_left(ranking, (-old, plan_id))
+                    if index < len(ranking) and ranking[index] == (-old, plan_id):
+                        del ranking[index]
+                    insort(ranking, (-self._score(window, plan_id), plan_id))
+                self.events += 1
+
+    def top(self, window, limit, accept=None, now=None):
+        """[(plan_id, score)] for the highest scoring plans, skipping ids ``accept`` rejects"""
+        now = self._clock() if now is None else now
+        results = []
+        with self._lock:
+            decay = self._decay(window, self._epoch, now)
+            for negative, plan_id in self._ranking[window]:
+                if len(results) >= limit:
+                    break
+                score = -negative * decay
+                if score < MIN_SCORE:
+                    break
+                if accept is None or accept(plan_id):
+                    results.append((plan_id, score))
+        return results
+
+    def sync(self, connection):
+        """Add pending events to plan_trending, then reload every worker's totals from it"""
+        now = self._clock()
+        with self._lock:
+            pending, self._pending = self._pending, {window: {} for window in self.windows}
+            epoch = self._epoch
+        try:
+            increments = {
+                window: _rescaled(values, self._decay(window, epoch, now)) for window, values in pending.items()
+            }
+            persist_scores(connection, increments, now, self.windows)
+            stored = load_scores(connection, now, self.windows)
+        except Exception:
+            with self._lock:
+                # Put the events back, scaled to whatever epoch is current now
+                for window, values in pending.items():
+                    merged = self._pending[window]
+                    for plan_id, value in _rescaled(values, self._decay(window, epoch, self._epoch)).items():
+                        merged[plan_id] = merged.get(plan_id, 0.0) + value
+            raise
+
+        with self._lock:
+            for window in self.windows:
+                self._pending[window] = _rescaled(self._pending[window], self._decay(window, self._epoch, now))
+            self._base = stored
+            self._epoch = now
+            self._rebuild_rankings()
+            self._synced_at = now
+            self.syncs += 1
+
+    def maybe_sync(self):
+        """Sync with the table if the persist interval has passed"""
+        now = self._clock()
+        if self._synced_at is not None and now - self._synced_at < self.persist_interval:
+            return
+        if not self._sync_lock.acquire(blocking=False):
+            return
+        try:
+            from app import db
+            with db.engine.begin() as connection:
+                self.sync(connection)
+        except Exception as e:
+            # Keep serving local scores; try again after the next interval
+            self._synced_at = now
+            self.sync_errors += 1
+            print(f"Trending sync failed: {e}")
+        finally:
+            self._sync_lock.release()
+
+    def stats(self):
+        return {
+            'windows': list(self.windows),
+            'tracked_plans': len(self._ranking[DEFAULT_WINDOW]) if DEFAULT_WINDOW in self._ranking else None,
+            'events': self.events,
+            'syncs': self.syncs,
+            'sync_errors': self.sync_errors,
+            'persist_interval': self.persist_interval
+        }
+
+
+def persist_scores(connection, increments, now, windows):
+    """Decay the stored scores to ``now`` and add the increments"""
+    from app.models.plan import Plan, PlanTrending
+    table = PlanTrending.__table__
+    plan_ids = {plan_id for values in increments.values() for plan_id in values}
+    if not plan_ids:
+        return
+
+    existing_plans = set(connection.execute(select(Plan.id).where(Plan.id.in_(plan_ids))).scalars())
+    stored = {
+        (row.plan_id, row.window): row for row in connection.execute(
+            select(table).where(table.c.plan_id.in_(plan_ids)).with_for_update()
+        )
+    }
+    for window, values in increments.items():
+        for plan_id, increment in values.items():
+            if plan_id not in existing_plans:
+                continue
+            row = stored.get((plan_id, window))
+            if row is None:
+                connection.execute(table.insert().values(
+                    plan_id=plan_id, window=window, score=increment, scored_at=now
+                ))
+            else:
+                score = row.score * math.exp(-(now - row.scored_at) / windows[window]) + increment
+                connection.execute(table.update().where(
+                    (table.c.plan_id == plan_id) & (table.c.window == window)
+                ).values(score=score, scored_at=now))
+
+
+def load_scores(connection, now, windows):
+    """{window: {plan_id: score at now}} from plan_trending"""
+    from app.models.plan import PlanTrending
+    scores = {window: {} for window in windows}
+    for row in connection.execute(select(PlanTrending.__table__)):
+        if row.window not in windows:
+            continue
+        score = row.score * math.exp(-(now - row.scored_at) / windows[row.window])
+        if score >= MIN_SCORE:
+            scores[row.window][row.plan_id] = score
+    return scores
+
+
+def seed_trending(connection, windows=None):
+    """Initial scores from existing subscriptions and payments, if plan_trending is empty"""
+    from app.models.plan import PlanTrending, Transaction
+    from app.models.user import UserPlan
+    windows = windows or TRENDING_WINDOWS
+    if connection.execute(select(PlanTrending.plan_id).limit(1)).first() is not None:
+        return 0
+
+    now = time.time()
+    utcnow = datetime.utcnow()
+    scores = {window: {} for window in windows}
+
+    def add(plan_id, weight, created_at):
+        if plan_id is None or created_at is None:
+            return
+        age = max((utcnow - created_at).total_seconds(), 0)
+        for window, tau in windows.items():
+            scores[window][plan_id] = scores[window].get(plan_id, 0.0) + weight * math.exp(-age / tau)
+
+    for plan_id, created_at in connection.execute(select(UserPlan.plan_id, UserPlan.created_at)):
+        add(plan_id, EVENT_WEIGHTS['subscribe'], created_at)
+    for plan_id, created_at in connection.execute(
+        select(Transaction.plan_id, Transaction.created_at)
+        .where(Transaction.status == 'completed', Transaction.amount > 0)
+    ):
+        add(plan_id, EVENT_WEIGHTS['payment'], created_at)
+
+    scores = {
+        window: {plan_id: score for plan_id, score in values.items() if score >= MIN_SCORE}
+        for window, values in scores.items()
+    }
+    persist_scores(connection, scores, now, windows)
+    return sum(len(values) for values in scores.values())
+
+
+def collect_events(session):
+    """(plan_id, weight) for the subscriptions and payments in the objects being flushed"""
+    from app.models.plan import Transaction
+    from app.models.user import UserPlan
+    events = []
+    for obj in session.new:
+        if isinstance(obj, UserPlan) and obj.status in (None, 'active'):
+            events.append((obj.plan_id, EVENT_WEIGHTS['subscribe']))
+    for obj in list(session.new) + list(session.dirty):
+        if not isinstance(obj, Transaction) or obj.status != 'completed' or not (obj.amount or 0) > 0:
+            continue
+        history = inspect(obj).attrs.status.history
+        if obj in session.new or (history.added and 'completed' not in history.deleted):
+            events.append((obj.plan_id, EVENT_WEIGHTS['payment']))
+    return events
+
+
+def trending_from_env():
+    return TrendingEngine(persist_interval=float(os.environ.get('TRENDING_PERSIST_INTERVAL', 60)))
+
+
+def current_trending():
+    return current_app.extensions['trending']
+
+
+def _collect_on_flush(session, flush_context):
+    events = collect_events(session)
+    if events:
+        session.info.setdefault('trending_events', []).extend(events)
+
+
+def _record_on_commit(session):
+    events = session.info.pop('trending_events', None)
+    if events and has_app_context():
+        engine = current_app.extensions.get('trending')
+        if engine is not None:
+            engine.record(events)
+
+
+def _discard_on_rollback(session):
+    session.info.pop('trending_events', None)
+
+
+def init_trending(app):
+    """Attach a TrendingEngine to the app and feed it committed subscriptions and payments"""
+    from app.db_router import RoutingSession
+
+    app.extensions['trending'] = trending_from_env()
+
+    @app.teardown_request
+    def _sync_trending(exc):
+        app.extensions['trending'].maybe_sync()
+
+    if not event.contains(RoutingSession, 'after_flush', _collect_on_flush):
+        event.listen(RoutingSession, 'after_flush', _collect_on_flush)
+        event.listen(RoutingSession, 'after_commit', _record_on_commit)
+        event.listen(RoutingSession, 'after_rollback', _discard_on_rollback)
@@ -0,0 +1,218 @@
+"""
+Per-user data version and response cache.
+
+The per-user GET endpoints (dashboard, profile, stats, notifications,
+activity, payment summary and history, my-plans) each run a handful of
+aggregation queries over user_plans and transactions on every call. Each
+user has a version stamp in ``user_data_versions`` instead: any ORM flush
+that writes the user's row, one of their UserPlans or one of their
+Transactions bumps it in the same transaction. Writes that bypass the ORM
+session must call ``bump_user_data_version``.
+
+A cached endpoint reads the stamp (one primary-key read) and serves the
+pre-encoded body stored for (user, endpoint, normalized query) if it was
+built at the same tag. The tag is the user's version, the catalog version
+(responses embed plan names and prices), a USER_RESPONSE_MAX_AGE time
+bucket (because "days until renewal" and the current month move without a
+write) and a hash of the endpoint and query. ETags are derived from the
+tag, so a client revalidating with a current ETag gets a 304 from any
+worker before anything is looked up.
+USER_RESPONSE_MAX_AGE=0 turns the cache off.
+
+The ASGI twins of payment history and activity (app/async_api.py), which
+the bundled nginx sends those GETs to, apply the same check with their own
+cache; their tags hash a different view name, because their bodies are
+serialized differently.
+"""
+from collections import OrderedDict
+from datetime import datetime
+from flask import current_app, request
+from flask_jwt_extended import get_jwt_identity
+from functools import wraps
+from sqlalchemy import event, inspect, select
+from threading import Lock
+import os
+import time
+import zlib
+
+from app.response_cache import CachedResponse, _normalized_query, _write
+
+
+class UserResponseCache:
+    """LRU of the latest CachedResponse per (user, endpoint, query)"""
+
+    def __init__(self, max_entries=4096, max_age=60.0):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries = OrderedDict()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key, tag):
+        with self._lock:
+            stored = self._entries.get(key)
+            if stored is None or stored[0] != tag:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return stored[1]
+
+    def put(self, key, tag, entry):
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            # Replaces the entry for an older tag, so stale bodies never pile up
+            self._entries[key] = (tag, entry)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'max_age_seconds': self.max_age,
+            'hits': self.hits,
+            'misses': self.misses,
+            'not_modified': self.not_modified
+        }
+
+
+def user_data_version(session, user_id):
+    """The user's data version (0 until their data is first written)"""
+    from app.models.user import UserDataVersion
+    return session.execute(
+        select(UserDataVersion.version).where(UserDataVersion.user_id == user_id)
+    ).scalar() or 0
+
+
+def bump_user_data_version(connection, user_ids):
+    """Advance the data version of each user inside the caller's transaction"""
+    from app.catalog import initial_version
+    from app.models.user import UserDataVersion
+    table = UserDataVersion.__table__
+    now = datetime.utcnow()
+    for user_id in sorted(user_ids):
+        result = connection.execute(
+            table.update().where(table.c.user_id == user_id)
+            .values(version=table.c.version + 1, updated_at=now)
+        )
+        if result.rowcount == 0:
+            # Seeded from the clock so a recreated row never repeats an old version
+            connection.execute(table.insert().values(user_id=user_id, version=initial_version(), updated_at=now))
+
+
+def changed_user_ids(session):
+    """Ids of users whose row, plans or transactions are in the pending flush"""
+    from app.models.plan import Transaction
+    from app.models.user import User, UserPlan
+    user_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        if isinstance(obj, User):
+            user_ids.add(obj.id)
+        elif isinstance(obj, (UserPlan, Transaction)):
+            user_ids.add(obj.user_id)
+            # A row moved to another user changes the old owner's data too
+            user_ids.update(inspect(obj).attrs.user_id.history.deleted or ())
+    user_ids.discard(None)
+    return user_ids
+
+
+def make_tag(user_id, version, catalog_version, view, max_age, now=None):
+    """Tag a cached ``view`` (endpoint and query) of ``user_id`` is valid for"""
+    now = time.time() if now is None else now
+    view_hash = zlib.crc32(view.encode('utf-8'))
+    return f'u{user_id}-{version}-{catalog_version}-{int(now // max_age)}-{view_hash:08x}'
+
+
+def response_tag(session, user_id, view, max_age, now=None):
+    """``make_tag`` with the versions read through a sync session"""
+    from app.catalog import current_catalog
+    return make_tag(user_id, user_data_version(session, user_id), current_catalog().version, view, max_age, now)
+
+
+def matching_etag(tag, if_none_match):
+    """The ETag from an If-None-Match header that belongs to ``tag``, if any"""
+    etags = (f'"{tag}"', f'"{tag}-gz"', f'"{tag}-br"')
+    for candidate in (if_none_match or '').split(','):
+        if candidate.strip() in etags:
+            return candidate.strip()
+    return None
+
+
+def cached_user_response(f):
+    """Serve a per-user view from pre-encoded bytes while the user's data is unchanged.
+
+    Goes below ``@jwt_required()`` (and ``@read_replica``, so the version is
+    read from the same database as the body).
+    """
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        from app import db
+
+        cache = current_app.extensions['user_responses']
+        if cache.max_age <= 0:
+            return f(*args, **kwargs)
+
+        user_id = int(get_jwt_identity())
+        key = (user_id, request.endpoint, _normalized_query())
+        tag = response_tag(db.session, user_id, f'{key[1]}?{key[2]}', cache.max_age)
+        etag = matching_etag(tag, request.headers.get('If-None-Match'))
+        if etag is not None:
+            cache.not_modified += 1
+            response = current_app.response_class(status=304)
+            response.headers['ETag'] = etag
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+
+        entry = cache.get(key, tag)
+        if entry is None:
+            response = current_app.make_response(f(*args, **kwargs))
+            if response.status_code != 200 or not response.is_json:
+                return response
+            entry = CachedResponse(response.status_code, response.mimetype, response.get_data(), tag=tag)
+            cache.put(key, tag, entry)
+        response = _write(entry, cache)
+        response.headers['Cache-Control'] = 'private, no-cache'
+        return response
+    return decorated_function
+
+
+def _bump_on_user_write(session, flush_context, instances):
+    bumped = session.info.setdefault('user_data_bumped', set())
+    user_ids = changed_user_ids(session) - bumped
+    if user_ids:
+        bump_user_data_version(session.connection(), user_ids)
+        bumped.update(user_ids)
+
+
+def _clear_bumped(session):
+    session.info.pop('user_data_bumped', None)
+
+
+def user_responses_from_env():
+    return UserResponseCache(
+        max_entries=int(os.environ.get('USER_RESPONSE_CACHE_SIZE', 4096)),
+        max_age=float(os.environ.get('USER_RESPONSE_MAX_AGE', 60))
+    )
+
+
+def init_user_data(app):
+    """Attach the per-user response cache and bump data versions on user writes"""
+    from app.db_router import RoutingSession
+
+    app.extensions['user_responses'] = user_responses_from_env()
+
+    if not event.contains(RoutingSession, 'before_flush', _bump_on_user_write):
+        event.listen(RoutingSession, 'before_flush', _bump_on_user_write)
+        event.listen(RoutingSession, 'after_commit', _clear_bumped)
+        event.listen(RoutingSession, 'after_rollback', _clear_bumped)
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Telecom Application - Async Read Server
+ASGI entry point (uvicorn) for the I/O-bound read endpoints; writes stay on serve.py.
+
+    python asgi.py                      Start uvicorn with ASGI_WORKERS processes
+    uvicorn asgi:app --port 5002        Or run the module with any ASGI server
+"""
+
+import os
+
+from app.async_api import create_asgi_app
+
+app = create_asgi_app(os.environ.get('FLASK_ENV', 'development'))
+
+if __name__ == '__main__':
+    import uvicorn
+
+    host = os.environ.get('FLASK_HOST', '127.0.0.1')
+    port = int(os.environ.get('ASGI_PORT', 5002))
+    workers = int(os.environ.get('ASGI_WORKERS', 1))
+
+    print("Starting Telecom Async Read Server...")
+    print(f"Bind: {host}:{port}")
+    print(f"Workers: {workers}")
+
+    uvicorn.run(
+        'asgi:app' if workers > 1 else app,
+        host=host,
+        port=port,
+        workers=workers,
+        backlog=int(os.environ.get('ASGI_BACKLOG', 2048)),
+        timeout_keep_alive=int(os.environ.get('SERVE_KEEPALIVE', 5)),
+        access_log=os.environ.get('ASGI_ACCESS_LOG', 'true').lower() == 'true'
+    )
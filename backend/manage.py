@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Telecom Application - Management CLI
+One-shot database tasks that run once per deploy, outside the worker processes
+
+    python manage.py migrate [--target N]   Apply pending schema migrations
+    python manage.py seed                   Load the sample data set if the database is empty
+    python manage.py bootstrap              migrate + seed
+    python manage.py status                 Show applied and pending migrations
+    python manage.py indexes [--json]       Create missing indexes, report unused/redundant ones
+    python manage.py reconcile-stats [--every SECONDS]
+                                            Recompute plan_stats counters and fix any drift
+    python manage.py recommendations [--top N] [--every SECONDS]
+                                            Rebuild the co-subscription recommendations per segment
+    python manage.py rebuild-summaries [--user ID ...]
+                                            Recompute user_account_summary (backfill / repair)
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from app import create_app
+
+
+def cmd_migrate(args):
+    from app.migrations import upgrade, get_current_version
+    applied = upgrade(target=args.target)
+    if applied:
+        print(f"Applied migrations: {', '.join(str(version) for version in applied)}")
+    else:
+        print("Database schema is up to date")
+    print(f"Current schema version: {get_current_version()}")
+    return 0
+
+
+def cmd_seed(args):
+    from app.migrations import seed_sample_data
+    seed_sample_data()
+    return 0
+
+
+def cmd_bootstrap(args):
+    from app.migrations import bootstrap, get_current_version
+    bootstrap()
+    print(f"Current schema version: {get_current_version()}")
+    return 0
+
+
+def cmd_status(args):
+    from app.migrations import MIGRATIONS, get_applied_migrations, get_current_version, latest_version
+    applied = {row['version']: row for row in get_applied_migrations()}
+
+    print(f"Current schema version: {get_current_version()} (latest: {latest_version()})")
+    for version, description, _ in MIGRATIONS:
+        if version in applied:
+            print(f"  [x] {version:>3}  {description}  (applied {applied[version]['applied_at']})")
+        else:
+            print(f"  [ ] {version:>3}  {description}")
+    return 0 if get_current_version() >= latest_version() else 1
+
+
+def cmd_indexes(args):
+    from app import db
+    from app.indexes import ensure_indexes, index_report, print_index_report
+    with db.engine.begin() as connection:
+        created = ensure_indexes(connection)
+        report = index_report(connection)
+
+    if created:
+        print(f"Created indexes: {', '.join(created)}")
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_index_report(report)
+    return 0
+
+
+def cmd_reconcile_stats(args):
+    from app import db
+    from app.plan_stats import reconcile_plan_stats
+    while True:
+        with db.engine.begin() as connection:
+            corrections = reconcile_plan_stats(connection)
+
+        if args.json:
+            print(json.dumps(corrections, indent=2))
+        else:
+            print(f"Reconciled plan_stats: {len(corrections)} plan(s) corrected")
+            for item in corrections:
+                print(f"  plan {item['plan_id']}: active_subscribers {item['active_subscribers'][0]} -> "
+                      f"{item['active_subscribers'][1]}, total_revenue {item['total_revenue'][0]} -> {item['total_revenue'][1]}")
+
+        if not args.every:
+            return 0
+        time.sleep(args.every)
+
+
+def cmd_recommendations(args):
+    from app import db
+    from app.recommendations import build_recommendations
+    while True:
+        with db.engine.begin() as connection:
+            segments = build_recommendations(connection, top_n=args.top)
+
+        print(f"Built recommendations for {len(segments)} segment(s)")
+        for segment, plan_ids in sorted(segments.items()):
+            print(f"  {segment}: {', '.join(str(plan_id) for plan_id in plan_ids)}")
+
+        if not args.every:
+            return 0
+        time.sleep(args.every)
+
+
+def cmd_rebuild_summaries(args):
+    from app import db
+    from app.account_summary import rebuild_account_summaries
+    with db.engine.begin() as connection:
+        rows = rebuild_account_summaries(connection, user_ids=args.user or None)
+
+    scope = f"{len(args.user)} user(s)" if args.user else 'all users'
+    print(f"Rebuilt user_account_summary for {scope}: {rows} row(s) written")
+    return 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Telecom backend management commands')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    migrate_parser = subparsers.add_parser('migrate', help='Apply pending schema migrations')
+    migrate_parser.add_argument('--target', type=int, default=None, help='Stop at this schema version')
+    migrate_parser.set_defaults(func=cmd_migrate)
+
+    seed_parser = subparsers.add_parser('seed', help='Load sample data into an empty database')
+    seed_parser.set_defaults(func=cmd_seed)
+
+    bootstrap_parser = subparsers.add_parser('bootstrap', help='Apply migrations and seed sample data')
+    bootstrap_parser.set_defaults(func=cmd_bootstrap)
+
+    status_parser = subparsers.add_parser('status', help='Show migration status')
+    status_parser.set_defaults(func=cmd_status)
+
+    indexes_parser = subparsers.add_parser('indexes', help='Create missing indexes and report index usage')
+    indexes_parser.add_argument('--json', action='store_true', help='Print the report as JSON')
+    indexes_parser.set_defaults(func=cmd_indexes)
+
+    reconcile_parser = subparsers.add_parser('reconcile-stats', help='Recompute plan_stats counters and fix drift')
+    reconcile_parser.add_argument('--every', type=float, default=None, help='Keep running, reconciling every N seconds')
+    reconcile_parser.add_argument('--json', action='store_true', help='Print the corrections as JSON')
+    reconcile_parser.set_defaults(func=cmd_reconcile_stats)
+
+    recommendations_parser = subparsers.add_parser('recommendations', help='Rebuild the plan recommendations')
+    recommendations_parser.add_argument('--top', type=int, default=10, help='Plans stored per segment')
+    recommendations_parser.add_argument('--every', type=float, default=None, help='Keep running, rebuilding every N seconds')
+    recommendations_parser.set_defaults(func=cmd_recommendations)
+
+    summaries_parser = subparsers.add_parser('rebuild-summaries', help='Recompute the per-user account summaries')
+    summaries_parser.add_argument('--user', type=int, action='append', help='Only rebuild this user id (repeatable)')
+    summaries_parser.set_defaults(func=cmd_rebuild_summaries)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    app = create_app(check_schema=False)
+    with app.app_context():
+        return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
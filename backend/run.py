@@ -1,37 +1,99 @@
 #!/usr/bin/env python3
 """
 Telecom Application - Flask Backend Server
-Main entry point for the Flask application
+Main entry point for the Flask application (development server).
+Production deployments use serve.py, which preloads this module.
+
+    python run.py                      Start the development server
+    python run.py --profile-startup    Measure cold-start import/phase times and write a JSON report
 """
 
+import argparse
 import os
+import sys
+
+if __name__ == '__main__' and '--profile-startup' in sys.argv:
+    # Profile in a fresh interpreter before this process imports anything heavy
+    from app.startup_profiler import profile_startup, print_report
+
+    parser = argparse.ArgumentParser(description='Telecom API server')
+    parser.add_argument('--profile-startup', action='store_true',
+                        help='Profile import and create_app phase times, then exit')
+    parser.add_argument('--profile-output', default='startup_profile.json',
+                        help='Where to write the startup profile report')
+    parser.add_argument('--profile-top', type=int, default=25,
+                        help='Number of slowest modules to include in the report')
+    args = parser.parse_args()
+
+    report = profile_startup(args.profile_output, top=args.profile_top)
+    print_report(report, args.profile_output)
+    sys.exit(0)
+
 from app import create_app
+from app.startup_profiler import startup_phase
+
+LAZY_STARTUP = os.environ.get('LAZY_STARTUP', 'false').lower() == 'true'
+
+def initialize_datadog():
+    """Initialize Datadog monitoring (APM patching and DogStatsD)"""
+    try:
+        from datadog_config import configure_datadog
+        configure_datadog()
+        print("Datadog monitoring initialized successfully")
+    except ImportError:
+        print("Warning: Datadog monitoring not available - ddtrace package not installed")
+    except Exception as e:
+        print(f"Warning: Failed to initialize Datadog monitoring: {e}")
+
+def initialize_datadog_after_startup(app):
+    """Initialize Datadog once the app exists and trace the engines it already created
 
-# Initialize Datadog monitoring before importing the app
-try:
-    from datadog_config import configure_datadog
-    configure_datadog()
-    print("Datadog monitoring initialized successfully")
-except ImportError:
-    print("Warning: Datadog monitoring not available - ddtrace package not installed")
-except Exception as e:
-    print(f"Warning: Failed to initialize Datadog monitoring: {e}")
+    ddtrace instruments SQLAlchemy by patching create_engine, which create_app
+    has called by then, so the primary and replica engines are attached here.
+    """
+    initialize_datadog()
+    try:
+        from ddtrace.contrib.sqlalchemy import trace_engine
+    except ImportError:
+        return
+    from app import db
 
-# Create Flask application
-app = create_app()
+    engines = list(db.engines.values())
+    router = app.extensions.get('db_router')
+    if router is not None:
+        engines.extend(router.engines)
+    for engine in engines:
+        trace_engine(engine)
+
+# Password hashing workers are spawned processes that re-import this module as
+# __mp_main__; they only need the hashing functions, not an application
+if __name__ != '__mp_main__':
+    # Initialize Datadog monitoring before importing the app
+    # (in lazy mode it is deferred until the first request instead)
+    if not LAZY_STARTUP:
+        with startup_phase('datadog'):
+            initialize_datadog()
+    
+    # Create Flask application
+    with startup_phase('create_app'):
+        app = create_app()
+    
+    if LAZY_STARTUP:
+        from app.lazy_loading import run_on_first_request
+        run_on_first_request(app, lambda: initialize_datadog_after_startup(app))
 
 if __name__ == '__main__':
     # Get configuration from environment variables
     host = os.environ.get('FLASK_HOST', '127.0.0.1')
     port = int(os.environ.get('FLASK_PORT', 5000))
     debug = os.environ.get('FLASK_DEBUG', 'True').lower() == 'true'
-    
+
     print(f"Starting Telecom API Server...")
     print(f"Host: {host}")
     print(f"Port: {port}")
     print(f"Debug: {debug}")
     print(f"Environment: {os.environ.get('FLASK_ENV', 'development')}")
-    
+
     # Run the application
     app.run(
         host=host,
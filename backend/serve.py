@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Telecom Application - Production Server
+Pre-forking multi-worker entry point for the Flask backend (gunicorn, gthread workers)
+"""
+
+import gc
+import multiprocessing
+import os
+
+from gunicorn.app.base import BaseApplication
+
+
+def _int_env(name, default):
+    """Read an integer setting from the environment"""
+    value = os.environ.get(name)
+    if value is None or value.strip() == '':
+        return default
+    return int(value)
+
+
+def build_options():
+    """Build the server configuration from environment variables"""
+    host = os.environ.get('FLASK_HOST', '127.0.0.1')
+    port = int(os.environ.get('FLASK_PORT', 5000))
+
+    return {
+        'bind': f'{host}:{port}',
+        'worker_class': 'gthread',
+        'workers': _int_env('SERVE_WORKERS', multiprocessing.cpu_count()),
+        'threads': _int_env('SERVE_THREADS', 4),
+        # Recycle workers after N requests; the jitter keeps them from all restarting at once
+        'max_requests': _int_env('SERVE_MAX_REQUESTS', 1000),
+        'max_requests_jitter': _int_env('SERVE_MAX_REQUESTS_JITTER', 50),
+        'timeout': _int_env('SERVE_TIMEOUT', 30),
+        'graceful_timeout': _int_env('SERVE_GRACEFUL_TIMEOUT', 30),
+        'keepalive': _int_env('SERVE_KEEPALIVE', 5),
+        # Load the application once in the master and fork it into the workers
+        'preload_app': True,
+        'accesslog': os.environ.get('SERVE_ACCESS_LOG', '-'),
+        'errorlog': '-',
+        'loglevel': os.environ.get('SERVE_LOG_LEVEL', 'info'),
+        'proc_name': 'telecom-backend',
+        'pre_fork': pre_fork,
+        'post_fork': post_fork,
+    }
+
+
+def pre_fork(server, worker):
+    """Freeze everything the master has allocated so far.
+
+    Frozen objects are moved to the permanent generation and are never
+    visited by the collector, so the workers keep sharing those pages
+    copy-on-write instead of dirtying them on their first collection.
+    """
+    gc.freeze()
+
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the master process"""
+    from app import db
+
+    application = server.app.application
+    if application is None:
+        return
+
+    with application.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+    router = application.extensions.get('db_router')
+    if router is not None:
+        for engine in router.engines:
+            engine.dispose(close=False)
+
+
+class TelecomServer(BaseApplication):
+    """Gunicorn application that preloads the Flask app once in the master"""
+
+    def __init__(self, options=None):
+        self.options = options or {}
+        self.application = None
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            if key in self.cfg.settings and value is not None:
+                self.cfg.set(key.lower(), value)
+
+    def load(self):
+        if self.application is None:
+            # Importing run initializes Datadog and calls create_app()
+            from run import app
+            self.application = app
+        return self.application
+
+
+def main():
+    options = build_options()
+
+    print("Starting Telecom API Server (production)...")
+    print(f"Bind: {options['bind']}")
+    print(f"Workers: {options['workers']} x {options['threads']} threads")
+    print(f"Max requests per worker: {options['max_requests']} (+/- {options['max_requests_jitter']})")
+    print(f"Environment: {os.environ.get('FLASK_ENV', 'production')}")
+
+    TelecomServer(options).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,5 +1,9 @@
 -- Database initialization script for Telecom Application
 -- This script sets up the initial database schema and data
+--
+-- NOTE: legacy reference only. The schema is now created and versioned by the
+-- backend migration runner (`python manage.py migrate`, see backend/app/migrations.py)
+-- and is no longer loaded by docker-compose.
 
 -- Create database if it doesn't exist (handled by Docker)
 -- CREATE DATABASE IF NOT EXISTS telecom_db;
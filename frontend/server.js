@@ -51,6 +51,31 @@ app.set('views', path.join(__dirname, 'views'));
 // Static files
 app.use('/static', express.static(path.join(__dirname, 'public')));
 
+// Plan catalog kept in sync through /plans/changes instead of refetching the full list on every render
+const catalogCache = { version: 0, plans: new Map() };
+
+// Same order as GET /api/plans: popular first, then cheapest
+const catalogOrder = (a, b) => (b.is_popular - a.is_popular) || (a.price - b.price) || (a.id - b.id);
+
+const getCatalogPlans = async (accessToken) => {
+    const response = await axios.get(`${API_BASE_URL}/plans/changes`, {
+        params: { since: catalogCache.version },
+        headers: { 'Authorization': `Bearer ${accessToken}` }
+    });
+    const { version, full_resync, plans, removed } = response.data;
+
+    // A slower concurrent request may answer for an older version; keep the newer state
+    if (full_resync || version > catalogCache.version) {
+        if (full_resync) {
+            catalogCache.plans = new Map();
+        }
+        plans.forEach(plan => catalogCache.plans.set(plan.id, plan));
+        removed.forEach(planId => catalogCache.plans.delete(planId));
+        catalogCache.version = version;
+    }
+    return Array.from(catalogCache.plans.values()).sort(catalogOrder);
+};
+
 // Middleware to check authentication
 const requireAuth = (req, res, next) => {
     if (!req.session.user || !req.session.accessToken) {
@@ -134,14 +159,12 @@ app.get('/dashboard', requireAuth, async (req, res) => {
         });
 
         // Fetch available plans
-        const plansResponse = await axios.get(`${API_BASE_URL}/plans`, {
-            headers: { 'Authorization': `Bearer ${req.session.accessToken}` }
-        });
+        const plans = await getCatalogPlans(req.session.accessToken);
 
         res.render('dashboard', {
             user: req.session.user,
             dashboard: dashboardResponse.data.dashboard,
-            plans: plansResponse.data.plans.slice(0, 3) // Show only first 3 plans
+            plans: plans.slice(0, 3) // Show only first 3 plans
         });
     } catch (error) {
         console.error('Dashboard error:', error.message);
@@ -157,13 +180,11 @@ app.get('/dashboard', requireAuth, async (req, res) => {
 // Plans page
 app.get('/plans', requireAuth, async (req, res) => {
     try {
-        const response = await axios.get(`${API_BASE_URL}/plans`, {
-            headers: { 'Authorization': `Bearer ${req.session.accessToken}` }
-        });
+        const plans = await getCatalogPlans(req.session.accessToken);
 
         res.render('plans', {
             user: req.session.user,
-            plans: response.data.plans,
+            plans: plans,
             selectedPlan: req.query.selected || null
         });
     } catch (error) {
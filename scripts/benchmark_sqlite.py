@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+SQLite Concurrency Benchmark
+Measures concurrent read/write throughput on the app schema with the default
+SQLite settings and with the production profile (app/sqlite_tuning.py).
+
+    python scripts/benchmark_sqlite.py --readers 8 --writers 4 --duration 10
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '../backend'))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import QueuePool
+
+from app import db
+from app.models import Plan, Transaction, User
+from app.sqlite_tuning import configure_sqlite, read_pragmas
+
+READ_SQL = text(
+    "SELECT t.id, t.amount, t.status, p.name FROM transactions t "
+    "JOIN plans p ON p.id = t.plan_id WHERE t.user_id = :user_id "
+    "ORDER BY t.created_at DESC LIMIT 10"
+)
+WRITE_SQL = text(
+    "INSERT INTO transactions (user_id, plan_id, amount, currency, status, payment_method, created_at, updated_at) "
+    "VALUES (:user_id, 1, 299, 'INR', 'completed', 'upi', CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)"
+)
+
+
+def build_database(path, users=50, transactions=5000):
+    engine = create_engine(f'sqlite:///{path}')
+    db.metadata.create_all(engine, tables=[User.__table__, Plan.__table__, Transaction.__table__])
+    with engine.begin() as connection:
+        connection.execute(Plan.__table__.insert(), [
+            {'name': f'Plan {i}', 'category': 'mobile', 'price': 100 + i, 'features': '[]'} for i in range(20)
+        ])
+        connection.execute(User.__table__.insert(), [
+            {'username': f'user{i}', 'email': f'user{i}@example.com', 'password_hash': 'x',
+             'first_name': 'Bench', 'last_name': 'User', 'phone': '+91-0000000000'} for i in range(users)
+        ])
+        for i in range(transactions):
+            connection.execute(WRITE_SQL, {'user_id': (i % users) + 1})
+    engine.dispose()
+
+
+def run_workload(path, tuned, readers, writers, duration, users=50):
+    engine = create_engine(f'sqlite:///{path}', poolclass=QueuePool,
+                           pool_size=readers + writers, max_overflow=0)
+    if tuned:
+        configure_sqlite(engine, optimize_interval=0)
+
+    counts = {'reads': 0, 'writes': 0, 'locked': 0, 'errors': 0}
+    lock = threading.Lock()
+    stop_at = time.perf_counter() + duration
+
+    def worker(is_writer, seed):
+        reads = writes = locked = errors = 0
+        user_id = seed
+        while time.perf_counter() < stop_at:
+            user_id = (user_id % users) + 1
+            try:
+                if is_writer:
+                    with engine.begin() as connection:
+                        connection.execute(WRITE_SQL, {'user_id': user_id})
+                    writes += 1
+                else:
+                    with engine.connect() as connection:
+                        connection.execute(READ_SQL, {'user_id': user_id}).fetchall()
+                    reads += 1
+            except OperationalError as e:
+                if 'locked' in str(e):
+                    locked += 1
+                else:
+                    errors += 1
+        with lock:
+            counts['reads'] += reads
+            counts['writes'] += writes
+            counts['locked'] += locked
+            counts['errors'] += errors
+
+    threads = [threading.Thread(target=worker, args=(False, i)) for i in range(readers)]
+    threads += [threading.Thread(target=worker, args=(True, i)) for i in range(writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    with engine.connect() as connection:
+        pragmas = read_pragmas(connection)
+    engine.dispose()
+
+    counts['reads_per_sec'] = round(counts['reads'] / duration, 1)
+    counts['writes_per_sec'] = round(counts['writes'] / duration, 1)
+    counts['pragmas'] = pragmas
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='SQLite concurrency benchmark')
+    parser.add_argument('--readers', type=int, default=8, help='Reader threads')
+    parser.add_argument('--writers', type=int, default=4, help='Writer threads')
+    parser.add_argument('--duration', type=float, default=10, help='Seconds per run')
+    args = parser.parse_args()
+
+    print(f"SQLite benchmark: {args.readers} readers, {args.writers} writers, {args.duration}s per run")
+    results = {}
+    for label, tuned in (('default', False), ('tuned', True)):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'bench.db')
+            build_database(path)
+            results[label] = run_workload(path, tuned, args.readers, args.writers, args.duration)
+
+        result = results[label]
+        print(f"\n[{label}] journal_mode={result['pragmas']['journal_mode']} "
+              f"synchronous={result['pragmas']['synchronous']} busy_timeout={result['pragmas']['busy_timeout']}")
+        print(f"  reads/s:  {result['reads_per_sec']}")
+        print(f"  writes/s: {result['writes_per_sec']}")
+        print(f"  'database is locked' errors: {result['locked']}  other errors: {result['errors']}")
+
+    for metric in ('reads_per_sec', 'writes_per_sec'):
+        before, after = results['default'][metric], results['tuned'][metric]
+        change = f"{after / before:.1f}x" if before else 'n/a'
+        print(f"\n{metric}: {before} -> {after} ({change})", end='')
+    print()
+
+
+if __name__ == '__main__':
+    main()
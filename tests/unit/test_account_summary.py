@@ -0,0 +1,116 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from app import create_app, db
+from app.models import Plan, User, UserPlan, Transaction
+from app.account_summary import account_summary, rebuild_account_summaries, SUMMARY_FIELDS
+from flask_jwt_extended import create_access_token
+from datetime import datetime, timedelta
+from sqlalchemy import event
+import json
+
+class TestAccountSummary:
+    """Unit tests for the incrementally maintained per-user summary"""
+
+    @pytest.fixture
+    def app(self):
+        """Create test app with a bootstrapped in-memory database"""
+        app = create_app('testing')
+        app.config['TESTING'] = True
+
+        with app.app_context():
+            yield app
+            db.drop_all()
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def user(self, app):
+        user = User('summaryuser', 'summary@example.com', None, 'Summary', 'User', '9876543210', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        return user
+
+    def _counters(self, user_id):
+        summary = account_summary(db.session, user_id)
+        return {field: summary[field] for field in SUMMARY_FIELDS + ('monthly_spent',)}
+
+    def _rebuilt(self, user_id):
+        with db.engine.begin() as connection:
+            rebuild_account_summaries(connection, [user_id])
+        return self._counters(user_id)
+
+    def _subscribe(self, user, plan):
+        now = datetime.utcnow()
+        user_plan = UserPlan(user.id, plan.id, now, now + timedelta(days=30))
+        transaction = Transaction(user.id, plan.id, plan.price, 'card')
+        transaction.status = 'completed'
+        db.session.add_all([user_plan, transaction])
+        db.session.commit()
+        return user_plan, transaction
+
+    def test_summary_follows_writes(self, app, user):
+        """Payments, refunds, failures and cancellations keep the summary equal to a rebuild"""
+        plan = db.session.get(Plan, 1)
+        user_plan, transaction = self._subscribe(user, plan)
+        counters = self._counters(user.id)
+        assert counters['total_spent'] == counters['monthly_spent'] == plan.price
+        assert (counters['completed_transactions'], counters['active_plans']) == (1, 1)
+
+        refund = Transaction(user.id, plan.id, -transaction.amount, 'card')
+        refund.status = 'completed'
+        transaction.status = 'refunded'
+        failed = Transaction(user.id, plan.id, plan.price, 'card')
+        failed.status = 'failed'
+        user_plan.status = 'cancelled'
+        db.session.add_all([refund, failed])
+        db.session.commit()
+
+        counters = self._counters(user.id)
+        assert counters['total_spent'] == 0
+        assert (counters['total_transactions'], counters['failed_transactions'],
+                counters['refunded_transactions'], counters['cancelled_plans']) == (3, 1, 1, 1)
+        assert self._rebuilt(user.id) == counters
+
+    def test_rebuild_backfills_bypassed_writes(self, app, user):
+        """Writes outside the ORM are picked up by the rebuild"""
+        plan = db.session.get(Plan, 2)
+        self._subscribe(user, plan)
+        db.session.execute(Transaction.__table__.insert().values(
+            user_id=user.id, plan_id=plan.id, amount=plan.price, currency='INR', status='completed',
+            payment_method='card', transaction_reference='TXN_BYPASS', created_at=datetime.utcnow()
+        ))
+        db.session.commit()
+        assert self._counters(user.id)['total_spent'] == plan.price
+
+        counters = self._rebuilt(user.id)
+        assert counters['total_spent'] == counters['monthly_spent'] == 2 * plan.price
+        assert counters['completed_transactions'] == 2
+
+    def test_stats_read_summary(self, app, client, user):
+        """The stats endpoint reports the stored counters without aggregating history"""
+        plan = db.session.get(Plan, 3)
+        self._subscribe(user, plan)
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+        app.extensions['user_responses'].max_age = 0
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            data = json.loads(client.get('/api/users/stats', headers=headers).data)['stats']
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+        assert data['spending']['total_spent'] == data['spending']['monthly_spent'] == plan.price
+        assert (data['plans']['active_plans'], data['payments']['successful_payments']) == (1, 1)
+        assert not any('count(' in statement.lower() or 'sum(' in statement.lower() for statement in statements)
+
+    def test_shared_attributes_listened_once(self, app):
+        """plan_stats and the summary both track Transaction.status, through a single set listener"""
+        assert len(Transaction.status.dispatch.set) == 1
+        assert len(UserPlan.status.dispatch.set) == 1
@@ -0,0 +1,120 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from app import create_app, db
+from app.async_api import AsyncAPI
+from flask_jwt_extended import create_access_token
+import asyncio
+import json
+
+class TestAsyncAPI:
+    """Unit tests for the ASGI read path"""
+
+    @pytest.fixture
+    def flask_app(self, tmp_path, monkeypatch):
+        """Flask app on a file database both engines can open"""
+        monkeypatch.setenv('DATABASE_URL', f'sqlite:///{tmp_path}/async.db')
+        monkeypatch.setenv('AUTO_MIGRATE', 'true')
+        app = create_app('development')
+
+        with app.app_context():
+            yield app
+            db.session.remove()
+
+    @pytest.fixture
+    def asgi_app(self, flask_app):
+        return AsyncAPI(flask_app)
+
+    def _get(self, asgi_app, path, query='', headers=None):
+        """Drive one GET request through the ASGI callable; returns (status, decoded JSON)"""
+        status, _, body = self._request(asgi_app, path, query, headers)
+        return status, json.loads(body)
+
+    def _request(self, asgi_app, path, query='', headers=None):
+        """Drive one GET request through the ASGI callable; returns (status, headers, raw body)"""
+        scope = {
+            'type': 'http',
+            'method': 'GET',
+            'path': path,
+            'query_string': query.encode(),
+            'headers': [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()]
+        }
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+        async def send(message):
+            messages.append(message)
+
+        async def run():
+            await asgi_app(scope, receive, send)
+            await asgi_app.engine.dispose()
+
+        asyncio.run(run())
+        response_headers = {key.decode(): value.decode() for key, value in messages[0]['headers']}
+        return messages[0]['status'], response_headers, messages[1]['body']
+
+    def _auth(self, username='john.doe'):
+        from app.models.user import User
+        user = User.query.filter_by(username=username).first()
+        return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+    def test_plans_match_flask(self, flask_app, asgi_app):
+        """The async catalog returns the same payload as the Flask endpoint"""
+        status, data = self._get(asgi_app, '/api/optimized-plans', 'search=plan&category=mobile')
+        expected = json.loads(flask_app.test_client().get('/api/optimized-plans?search=plan&category=mobile').data)
+
+        assert status == 200
+        assert data == expected
+        assert data['count'] > 0
+
+    def test_payment_history_requires_valid_token(self, asgi_app):
+        """JWT validation mirrors the Flask error responses"""
+        assert self._get(asgi_app, '/api/payments/history') == (401, {'error': 'Authorization token is required'})
+        assert self._get(asgi_app, '/api/payments/history',
+                         headers={'Authorization': 'Bearer not-a-token'}) == (401, {'error': 'Invalid token'})
+
+    def test_history_and_activity(self, flask_app, asgi_app):
+        """Authenticated history and activity reads load their plans eagerly"""
+        headers = self._auth()
+
+        status, history = self._get(asgi_app, '/api/payments/history', headers=headers)
+        assert status == 200
+        assert history == json.loads(flask_app.test_client().get('/api/payments/history', headers=headers).data)
+
+        status, activity = self._get(asgi_app, '/api/users/activity', 'type=plan', headers=headers)
+        assert status == 200
+        assert activity['count'] == 1
+        assert activity['activities'][0]['details']['plan']['name'] == 'Premium Mobile Plan'
+
+    def test_history_cached_against_data_version(self, flask_app, asgi_app):
+        """The async history is served from the user response cache, revalidates to 304 and follows writes"""
+        from app.models.plan import Transaction
+        from app.models.user import User
+        headers = self._auth()
+
+        status, first_headers, first = self._request(asgi_app, '/api/payments/history', headers=headers)
+        assert status == 200
+        _, _, second = self._request(asgi_app, '/api/payments/history', headers=headers)
+        assert second == first
+        assert asgi_app.user_responses.stats()['hits'] == 1
+
+        etag = first_headers['etag']
+        status, _, body = self._request(asgi_app, '/api/payments/history',
+                                        headers={**headers, 'If-None-Match': etag})
+        assert (status, body) == (304, b'')
+
+        user = User.query.filter_by(username='john.doe').first()
+        transaction = Transaction(user.id, 1, 299.0, 'upi')
+        transaction.status = 'completed'
+        db.session.add(transaction)
+        db.session.commit()
+
+        status, changed_headers, body = self._request(asgi_app, '/api/payments/history',
+                                                      headers={**headers, 'If-None-Match': etag})
+        assert status == 200
+        assert changed_headers['etag'] != etag
+        assert json.loads(body)['count'] == json.loads(first)['count'] + 1
@@ -0,0 +1,87 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from app import create_app, db
+from app.catalog import PlanRecord
+from app.bundle_optimizer import optimize_bundles, plan_value, covers
+from app.plan_attributes import extract_attributes
+import itertools
+import json
+import random
+
+class TestBundleOptimizer:
+    """Unit tests for the budget-constrained bundle optimizer"""
+
+    @pytest.fixture
+    def app(self):
+        """Create test app with a bootstrapped in-memory database"""
+        app = create_app('testing')
+        app.config['TESTING'] = True
+
+        with app.app_context():
+            yield app
+            db.drop_all()
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    def _random_groups(self, size):
+        features = ['2GB Daily Data', 'Unlimited Data', '100 Mbps Speed', 'Netflix Subscription',
+                    'Amazon Prime Video', '100 SMS/day', '300 Mbps Speed', 'Disney+ Hotstar']
+        generator = random.Random(7)
+        groups = []
+        for group, category in enumerate(['mobile', 'internet', 'tv']):
+            records = []
+            for i in range(size):
+                chosen = generator.sample(features, generator.randint(1, 4))
+                records.append(PlanRecord(
+                    id=group * 100 + i, name=f'{category} {i}', category=category,
+                    price=float(generator.randint(99, 1499)), features=json.dumps(chosen),
+                    is_available=True, **extract_attributes(chosen)
+                ))
+            groups.append(records)
+        return groups
+
+    def _brute_force(self, groups, budget, must_have, limit, require_all):
+        choices = [list(records) + ([] if require_all else [None]) for records in groups]
+        results = []
+        for combination in itertools.product(*choices):
+            plans = [plan for plan in combination if plan is not None]
+            cost = sum(plan.price for plan in plans)
+            if not plans or cost > budget:
+                continue
+            if all(any(covers(plan, term) for plan in plans) for term in must_have):
+                results.append((round(sum(plan_value(plan) for plan in plans), 6), cost))
+        return sorted(results, key=lambda result: (-result[0], result[1]))[:limit]
+
+    @pytest.mark.parametrize('must_have', [(), ('netflix',), ('netflix', 'unlimited_data')])
+    @pytest.mark.parametrize('require_all', [True, False])
+    def test_matches_exhaustive_search(self, must_have, require_all):
+        """The pruned DP returns the same top bundles as trying every combination"""
+        groups = self._random_groups(15)
+        bundles = optimize_bundles(groups, 2000, must_have=must_have, limit=5, require_all=require_all)
+        assert [(round(value, 6), cost) for value, cost, _ in bundles] == \
+            self._brute_force(groups, 2000, must_have, 5, require_all)
+        for _, cost, plans in bundles:
+            assert len({plan.category for plan in plans}) == len(plans)
+
+    def test_optimize_endpoint(self, client):
+        """One plan per requested category within budget, must_have terms covered"""
+        data = json.loads(client.get('/api/plans/optimize?budget=2000&categories=mobile,internet,tv').data)
+        best = data['bundles'][0]
+        assert [plan['category'] for plan in best['plans']] == ['mobile', 'internet', 'tv']
+        assert all(bundle['total_price'] <= 2000 for bundle in data['bundles'])
+
+        data = json.loads(client.get('/api/plans/optimize?budget=1500&must_have=netflix,unlimited_data').data)
+        assert data['count'] > 0
+        for bundle in data['bundles']:
+            features = ' '.join(' '.join(plan['features']) for plan in bundle['plans']).lower()
+            assert 'netflix' in features and 'unlimited data' in features
+
+    def test_optimize_validation(self, client):
+        """Missing budget and unknown categories are rejected"""
+        assert client.get('/api/plans/optimize').status_code == 400
+        assert client.get('/api/plans/optimize?budget=1000&categories=satellite').status_code == 400
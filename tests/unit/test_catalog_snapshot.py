@@ -0,0 +1,199 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from app import create_app, db
+from app.catalog import CatalogSnapshot, PlanRecord
+from app.plan_compare import FeatureVocabulary
+from app.models import Plan, CatalogState
+from sqlalchemy import event
+import json
+
+class TestCatalogSnapshot:
+    """Unit tests for the in-memory plan catalog"""
+
+    @pytest.fixture
+    def app(self):
+        """Create test app with a bootstrapped in-memory database"""
+        app = create_app('testing')
+        app.config['TESTING'] = True
+
+        with app.app_context():
+            yield app
+            db.drop_all()
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    def _capture_sql(self, fn):
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            fn()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        return statements
+
+    def test_listings_served_without_sql(self, client):
+        """Once built, the snapshot answers the catalog endpoints with no queries"""
+        client.get('/api/plans')
+        client.get('/api/optimized-plans?search=premium')
+
+        responses = []
+        statements = self._capture_sql(lambda: responses.extend([
+            client.get('/api/plans?category=mobile'),
+            client.get('/api/plans/popular'),
+            client.get('/api/plans/categories'),
+            client.get('/api/optimized-plans?search=premium'),
+        ]))
+
+        assert all(response.status_code == 200 for response in responses)
+        assert statements == []
+
+    def test_snapshot_matches_database(self, app, client):
+        """Ordering, filters and shapes match the SQL listing"""
+        expected = Plan.query.filter_by(is_available=True, category='mobile').order_by(
+            Plan.is_popular.desc(), Plan.price.asc(), Plan.id.asc()
+        ).all()
+        data = json.loads(client.get('/api/plans?category=mobile').data)
+        assert data['plans'] == [plan.to_dict() for plan in expected]
+
+        data = json.loads(client.get('/api/plans?max_price=500').data)
+        assert data['plans'] and all(plan['price'] <= 500 for plan in data['plans'])
+
+    def test_plan_write_bumps_version(self, app, client):
+        """Changing a plan bumps catalog_state and the next request sees it"""
+        client.get('/api/plans')
+        version = db.session.get(CatalogState, 1).version
+
+        plan = Plan.query.filter_by(is_available=True).first()
+        plan.price = 1.0
+        db.session.commit()
+
+        assert db.session.get(CatalogState, 1).version == version + 1
+        data = json.loads(client.get('/api/plans?max_price=1').data)
+        assert [item['id'] for item in data['plans']] == [plan.id]
+
+    def test_records_are_read_only(self):
+        """Records reject mutation and the price index uses the sorted array"""
+        records = [
+            PlanRecord(id=i, name=f'Plan {i}', category='mobile', price=price,
+                       features='["5G"]', is_popular=i == 2, is_available=True)
+            for i, price in enumerate([300, 100, 200], start=1)
+        ]
+        snapshot = CatalogSnapshot(1, records)
+
+        with pytest.raises(AttributeError):
+            records[0].price = 0
+        assert records[0].features == ('5G',)
+        assert [plan.id for plan in snapshot.plans] == [2, 3, 1]
+        assert [plan.id for plan in snapshot.price_range(150, 300)] == [3, 1]
+        assert [plan.id for plan in snapshot.query(max_price=250)] == [2, 3]
+
+    def test_facets_count_other_filters(self, client):
+        """Each facet is counted against the other active filters in one request"""
+        data = json.loads(client.get('/api/plans/facets?category=mobile&price_band=500_999').data)
+        facets = data['facets']
+
+        assert [plan['name'] for plan in data['plans']] == ['Premium Mobile Plan', 'Unlimited Mobile Plan']
+        # Category counts ignore the category filter, band counts ignore the band filter
+        assert {item['value']: item['count'] for item in facets['category']} == {'mobile': 2, 'internet': 1}
+        assert {item['value']: item['count'] for item in facets['price_band']} == {
+            'under_500': 1, '500_999': 2, '1000_1999': 0, '2000_plus': 0
+        }
+        assert sum(item['count'] for item in facets['popular']) == data['count']
+
+        statements = self._capture_sql(lambda: client.get('/api/plans/facets'))
+        assert statements == []
+
+    def test_batch_lookup(self, client):
+        """Batch lookup returns plans keyed by id, reports missing ids and adds stats on request"""
+        single = json.loads(client.get('/api/plans/2').data)['plan']
+
+        data = json.loads(client.get('/api/plans/batch?ids=2,1,999&stats=true').data)
+        assert set(data['plans']) == {'1', '2'}
+        assert data['missing'] == [999]
+        assert data['plans']['2'] == single
+
+        statements = self._capture_sql(lambda: client.get('/api/plans/batch?ids=1,2'))
+        assert statements == []
+        assert client.get('/api/plans/batch?ids=a,b').status_code == 400
+
+    def test_suggest_completions(self, app, client):
+        """Names and features complete from any word, filter by category and follow plan writes"""
+        data = json.loads(client.get('/api/plans/suggest?q=mob').data)
+        assert [item['text'] for item in data['suggestions'][:3]] == [
+            'Premium Mobile Plan', 'Basic Mobile Plan', 'Unlimited Mobile Plan'
+        ]
+
+        data = json.loads(client.get('/api/plans/suggest?q=netflix&category=bundle').data)
+        assert data['suggestions'] == [{'text': 'Netflix + Amazon Prime', 'type': 'feature', 'plan_count': 1}]
+
+        statements = self._capture_sql(lambda: client.get('/api/plans/suggest?q=unl'))
+        assert statements == []
+
+        db.session.add(Plan('Zenith Mobile Plan', 'mobile', 449, ['2GB Daily Data']))
+        db.session.commit()
+        data = json.loads(client.get('/api/plans/suggest?q=zen').data)
+        assert [item['text'] for item in data['suggestions']] == ['Zenith Mobile Plan']
+
+    def test_feature_vocabulary_interning(self):
+        """Feature strings are interned once per catalog, ignoring case and spacing"""
+        vocabulary = FeatureVocabulary([
+            PlanRecord(id=1, name='A', features='["Unlimited Calls", "2GB  Daily Data"]'),
+            PlanRecord(id=2, name='B', features='["unlimited calls", "Netflix"]'),
+        ])
+        assert vocabulary.texts == ['Unlimited Calls', '2GB Daily Data', 'Netflix']
+        assert vocabulary.bitsets == {1: 0b011, 2: 0b101}
+
+        comparison = vocabulary.compare([1, 2])
+        assert comparison['common'] == ['Unlimited Calls']
+        assert comparison['unique'] == {1: ['2GB Daily Data'], 2: ['Netflix']}
+
+    def test_compare_matrix(self, client):
+        """Compare returns a feature x plan matrix with shared features first"""
+        data = json.loads(client.get('/api/plans/compare?ids=2,3,999').data)
+        assert [plan['id'] for plan in data['plans']] == [2, 3]
+        assert data['missing'] == [999]
+        assert data['common'] == ['Unlimited Calls', '100 SMS/day', '28 Days Validity']
+        assert data['matrix'][0]['present'] == [True, True]
+        assert data['unique']['3'] == ['Unlimited Data', 'Netflix + Amazon Prime', 'Disney+ Hotstar']
+
+        statements = self._capture_sql(lambda: client.get('/api/plans/compare?ids=1,2'))
+        assert statements == []
+        assert client.get('/api/plans/compare?ids=' + ','.join(str(i) for i in range(1, 20))).status_code == 400
+
+    def test_changes_since_version(self, app, client):
+        """The change log returns only what changed since a version, or a full resync"""
+        version = json.loads(client.get('/api/plans').data)['catalog_version']
+
+        added = Plan('Delta Plan', 'mobile', 349, ['1GB Daily Data'])
+        db.session.add(added)
+        db.session.get(Plan, 1).price = 279
+        db.session.delete(db.session.get(Plan, 8))
+        db.session.commit()
+
+        data = json.loads(client.get(f'/api/plans/changes?since={version}').data)
+        assert data['full_resync'] is False
+        assert data['version'] == version + 1
+        assert {plan['id'] for plan in data['plans']} == {added.id, 1}
+        assert data['removed'] == [8]
+
+        data = json.loads(client.get(f"/api/plans/changes?since={data['version']}").data)
+        assert (data['plans'], data['removed']) == ([], [])
+        assert len(json.loads(client.get('/api/plans/changes?since=0').data)['plans']) == 8
+
+    def test_changes_outside_orm_force_resync(self, app, client):
+        """A version bumped outside the ORM sends clients behind it the full list"""
+        from app.catalog import bump_catalog_version
+        version = json.loads(client.get('/api/plans').data)['catalog_version']
+        with db.engine.begin() as connection:
+            bump_catalog_version(connection)
+        app.extensions['plan_catalog'].invalidate()
+
+        data = json.loads(client.get(f'/api/plans/changes?since={version}').data)
+        assert data['full_resync'] is True
+        assert len(data['plans']) == 8
@@ -0,0 +1,56 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from app.db_pool import engine_options_from_env, instrument_engine, InstrumentedQueuePool
+
+class TestConnectionPool:
+    """Unit tests for pool configuration and telemetry"""
+
+    def test_memory_sqlite_has_no_pool_options(self):
+        """In-memory SQLite keeps its single shared connection"""
+        assert engine_options_from_env('sqlite:///:memory:') == {}
+
+    def test_server_defaults_and_env_overrides(self, monkeypatch):
+        """PostgreSQL gets pool defaults that environment variables override"""
+        monkeypatch.setenv('DB_POOL_SIZE', '3')
+        monkeypatch.setenv('DB_POOL_PRE_PING', 'false')
+        options = engine_options_from_env('postgresql://user@localhost/db')
+
+        assert options['pool_size'] == 3
+        assert options['pool_pre_ping'] is False
+        assert options['max_overflow'] == 20
+        assert options['poolclass'] is InstrumentedQueuePool
+
+    def test_monitor_counts_checkouts_and_timeouts(self, tmp_path):
+        """Checkout waits, in-use connections and pool timeouts are reported"""
+        engine = create_engine(f'sqlite:///{tmp_path}/pool.db', poolclass=InstrumentedQueuePool,
+                               pool_size=1, max_overflow=0, pool_timeout=0.05)
+        monitor = instrument_engine(engine, 'test')
+
+        held = engine.connect()
+        held.execute(text('SELECT 1'))
+        assert monitor.snapshot()['in_use'] == 1
+
+        with pytest.raises(PoolTimeoutError):
+            engine.connect()
+        held.close()
+
+        with engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+
+        snapshot = monitor.snapshot()
+        assert snapshot['checkouts'] == 2
+        assert snapshot['timeouts'] == 1
+        assert snapshot['checkout_wait']['count'] == 3
+        assert snapshot['checkout_wait']['max_ms'] >= 50
+        assert snapshot['in_use'] == 0
+
+        # dispose() swaps the pool but keeps reporting to the same monitor
+        engine.dispose()
+        with engine.connect() as connection:
+            connection.execute(text('SELECT 1'))
+        assert monitor.snapshot()['checkout_wait']['count'] == 4
@@ -0,0 +1,68 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from app import create_app, db
+from app.models import User
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+import json
+
+class TestIdentityCache:
+    """Unit tests for the cached JWT identity loader"""
+
+    @pytest.fixture
+    def app(self):
+        """Create test app with a bootstrapped in-memory database"""
+        app = create_app('testing')
+        app.config['TESTING'] = True
+
+        with app.app_context():
+            yield app
+            db.drop_all()
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    def _headers(self, username='john.doe'):
+        user = User.query.filter_by(username=username).first()
+        return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+    def test_cached_lookup_skips_user_query(self, app, client):
+        """The second authenticated request does not query the users table"""
+        headers = self._headers()
+        assert client.get('/api/users/preferences', headers=headers).status_code == 200
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            assert client.get('/api/users/preferences', headers=headers).status_code == 200
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+        assert not any('FROM users' in statement for statement in statements)
+        assert app.extensions['identity_cache'].stats()['hits'] >= 1
+
+    def test_profile_update_invalidates_cache(self, client):
+        """Profile changes are visible on the next request"""
+        headers = self._headers()
+        client.get('/api/auth/profile', headers=headers)
+
+        response = client.put('/api/auth/profile', headers=headers,
+                              data=json.dumps({'first_name': 'Johnny'}),
+                              content_type='application/json')
+        assert response.status_code == 200
+
+        profile = json.loads(client.get('/api/auth/profile', headers=headers).data)
+        assert profile['user']['first_name'] == 'Johnny'
+
+    def test_unknown_user_returns_404(self, client):
+        """Tokens for users that do not exist get the handlers' 404"""
+        headers = {'Authorization': f'Bearer {create_access_token(identity="9999")}'}
+        response = client.get('/api/payments/history', headers=headers)
+
+        assert response.status_code == 404
+        assert json.loads(response.data) == {'error': 'User not found'}
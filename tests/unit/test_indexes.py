@@ -0,0 +1,48 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from app import create_app, db
+from app.indexes import MANAGED_INDEXES, ensure_indexes, index_report
+from sqlalchemy import text
+
+class TestIndexes:
+    """Unit tests for the managed index set"""
+
+    @pytest.fixture
+    def app(self):
+        """Create test app with a bootstrapped in-memory database"""
+        app = create_app('testing')
+        app.config['TESTING'] = True
+
+        with app.app_context():
+            yield app
+            db.drop_all()
+
+    def test_bootstrap_creates_managed_indexes(self, app):
+        """Every managed index exists and ensure_indexes has nothing left to do"""
+        with db.engine.begin() as connection:
+            assert ensure_indexes(connection) == []
+            report = index_report(connection)
+
+        assert report['missing'] == []
+        assert {index.name for index in MANAGED_INDEXES} <= {index['name'] for index in report['indexes']}
+
+    def test_hot_queries_use_indexes(self, app):
+        """History and summary queries search an index instead of scanning the table"""
+        with db.engine.connect() as connection:
+            plans = index_report(connection)['query_plans']
+
+        assert 'ix_transactions_user_created' in plans['payment_history'][0]
+        assert 'COVERING INDEX ix_transactions_user_status_amount' in plans['total_spent'][0]
+        assert all(not step.startswith('SCAN') for plan in plans.values() for step in plan)
+
+    def test_redundant_single_column_index_reported(self, app):
+        """A legacy single-column index is flagged as covered by a composite one"""
+        with db.engine.begin() as connection:
+            connection.execute(text('CREATE INDEX idx_transactions_user_id ON transactions(user_id)'))
+            report = index_report(connection)
+            connection.execute(text('DROP INDEX idx_transactions_user_id'))
+
+        assert 'idx_transactions_user_id' in [item['name'] for item in report['redundant']]
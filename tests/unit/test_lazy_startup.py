@@ -0,0 +1,66 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from app import create_app, db
+from app.lazy_loading import LazyView
+from app.startup_profiler import parse_importtime, summarize_imports
+import json
+
+class TestLazyStartup:
+    """Unit tests for lazy startup mode and the startup profiler"""
+
+    def _rules(self, app):
+        return sorted(
+            (rule.rule, rule.endpoint, tuple(sorted(rule.methods - {'HEAD', 'OPTIONS'})))
+            for rule in app.url_map.iter_rules()
+        )
+
+    @pytest.fixture
+    def lazy_app(self, monkeypatch):
+        """Create test app in lazy startup mode"""
+        monkeypatch.setenv('LAZY_STARTUP', 'true')
+        app = create_app('testing')
+        app.config['TESTING'] = True
+
+        with app.app_context():
+            yield app
+            db.drop_all()
+
+    def test_lazy_routes_match_eager_routes(self, lazy_app, monkeypatch):
+        """The lazy route table must declare exactly the routes of the real blueprints"""
+        monkeypatch.setenv('LAZY_STARTUP', 'false')
+        eager_app = create_app('testing', check_schema=False)
+
+        assert self._rules(lazy_app) == self._rules(eager_app)
+
+    def test_lazy_view_imports_on_first_request(self, lazy_app):
+        """Deferred endpoints import their module on first use and keep working"""
+        view = lazy_app.view_functions['optimized_plans.get_plans_optimized']
+        assert isinstance(view, LazyView)
+
+        response = lazy_app.test_client().get('/api/optimized-plans')
+        data = json.loads(response.data)
+
+        assert response.status_code == 200
+        assert data['success'] is True
+        assert data['count'] > 0
+
+    def test_parse_importtime(self):
+        """-X importtime output is parsed into per-module timings"""
+        output = '\n'.join([
+            'import time: self [us] | cumulative | imported package',
+            'import time:       120 |        120 |     _json',
+            'import time:       300 |        420 |   json.decoder',
+            'import time:       500 |        920 | json',
+        ])
+        modules = parse_importtime(output)
+
+        assert [m['module'] for m in modules] == ['_json', 'json.decoder', 'json']
+        assert modules[0]['depth'] == 2
+        assert modules[2]['cumulative_us'] == 920
+
+        summary = summarize_imports(modules)
+        assert summary['by_package_ms']['json'] == 0.8
+        assert summary['slowest_cumulative'][0]['module'] == 'json'
@@ -0,0 +1,47 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from app import create_app, db
+from app.models import User
+from app.migrations import upgrade, get_current_version, latest_version, seed_sample_data
+import json
+
+class TestMigrations:
+    """Unit tests for the schema migration runner"""
+
+    @pytest.fixture
+    def app(self):
+        """Create test app with a bootstrapped in-memory database"""
+        app = create_app('testing')
+        app.config['TESTING'] = True
+
+        with app.app_context():
+            yield app
+            db.drop_all()
+
+    def test_bootstrap_records_latest_version(self, app):
+        """create_app('testing') migrates the database to the latest version"""
+        assert get_current_version() == latest_version()
+
+    def test_upgrade_is_idempotent(self, app):
+        """Running the migrations again applies nothing"""
+        assert upgrade() == []
+        assert get_current_version() == latest_version()
+
+    def test_seed_is_idempotent(self, app):
+        """Seeding twice does not duplicate users"""
+        count = User.query.count()
+        seed_sample_data()
+        assert User.query.count() == count
+
+    def test_seeded_users_can_login(self, app):
+        """Seed users use precomputed hashes that still verify"""
+        client = app.test_client()
+        response = client.post('/api/auth/login',
+                               data=json.dumps({'username': 'john.doe', 'password': 'password123'}),
+                               content_type='application/json')
+
+        assert response.status_code == 200
+        assert 'access_token' in json.loads(response.data)
@@ -0,0 +1,100 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from app import create_app, db
+from app.models import User
+from app.password_hashing import PasswordHasher, PasswordHashingBusy, password_hasher
+from werkzeug.security import generate_password_hash
+import json
+import threading
+import time
+
+class TestPasswordHashing:
+    """Unit tests for pooled password hashing"""
+
+    @pytest.fixture
+    def app(self):
+        """Create test app with a bootstrapped in-memory database"""
+        app = create_app('testing')
+        app.config['TESTING'] = True
+
+        with app.app_context():
+            yield app
+            db.drop_all()
+
+    def _login(self, client):
+        return client.post('/api/auth/login',
+                           data=json.dumps({'username': 'john.doe', 'password': 'password123'}),
+                           content_type='application/json')
+
+    def test_process_pool_hash_and_verify(self):
+        """Hashes made in the worker processes verify and use the configured method"""
+        hasher = PasswordHasher(method='pbkdf2:sha256:1000', workers=1, queue_size=2)
+        try:
+            password_hash = hasher.hash('secret123')
+            assert password_hash.startswith('pbkdf2:sha256:1000$')
+            assert hasher.verify(password_hash, 'secret123') is True
+            assert hasher.verify(password_hash, 'wrong') is False
+            assert hasher.stats()['completed'] == 3
+        finally:
+            hasher.shutdown()
+
+    def test_saturated_queue_returns_429(self, app, monkeypatch):
+        """Login answers 429 instead of queueing when the hashing queue is full"""
+        monkeypatch.setattr(password_hasher, '_slots', threading.BoundedSemaphore(1))
+        password_hasher._slots.acquire()
+
+        response = self._login(app.test_client())
+
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '1'
+        assert password_hasher.stats()['rejected'] >= 1
+
+    def test_timed_out_hash_returns_429(self, app, monkeypatch):
+        """A hash that outlives PASSWORD_HASH_TIMEOUT answers like a full queue, not a 500"""
+        hasher = PasswordHasher(workers=1, queue_size=2, timeout=0.001)
+        monkeypatch.setattr(password_hasher, '_run', hasher._run)
+        try:
+            response = self._login(app.test_client())
+        finally:
+            hasher.shutdown()
+
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '1'
+        assert hasher.stats()['timed_out'] == 1
+
+    def test_timed_out_job_keeps_its_slot(self):
+        """A job that times out while running holds its queue slot until it actually ends"""
+        hasher = PasswordHasher(workers=1, queue_size=1, timeout=10.0)
+        try:
+            hasher._run(time.sleep, 0)
+            hasher.timeout = 0.2
+            with pytest.raises(PasswordHashingBusy, match='timed out'):
+                hasher._run(time.sleep, 1.5)
+            with pytest.raises(PasswordHashingBusy, match='full'):
+                hasher._run(time.sleep, 0)
+            assert hasher.stats()['queue_depth'] == 1
+
+            deadline = time.monotonic() + 10
+            while hasher.stats()['queue_depth'] and time.monotonic() < deadline:
+                time.sleep(0.05)
+            hasher._run(time.sleep, 0)
+
+            stats = hasher.stats()
+            assert (stats['completed'], stats['timed_out'], stats['rejected']) == (2, 1, 1)
+        finally:
+            hasher.shutdown()
+
+    def test_login_upgrades_outdated_hash(self, app):
+        """A successful login rehashes passwords stored with old parameters"""
+        user = User.query.filter_by(username='john.doe').first()
+        user.password_hash = generate_password_hash('password123', method='pbkdf2:sha256:1000')
+        db.session.commit()
+
+        assert self._login(app.test_client()).status_code == 200
+
+        user = User.query.filter_by(username='john.doe').first()
+        assert user.password_hash.startswith(password_hasher.method + '$')
+        assert user.password_needs_rehash() is False
@@ -0,0 +1,63 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from app import create_app, db
+from app.models import Plan, PlanAttributes
+from app.plan_attributes import extract_attributes
+import json
+
+class TestPlanAttributes:
+    """Unit tests for typed plan attribute extraction and filters"""
+
+    @pytest.fixture
+    def app(self):
+        """Create test app with a bootstrapped in-memory database"""
+        app = create_app('testing')
+        app.config['TESTING'] = True
+
+        with app.app_context():
+            yield app
+            db.drop_all()
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    def test_extract_attributes(self):
+        """Feature strings are parsed into typed values"""
+        attributes = extract_attributes([
+            '1.5GB/day', '1 Gbps Speed', '1 Year Validity', '100 SMS/day', 'Netflix + Amazon Prime', 'Disney+ Hotstar'
+        ])
+        assert attributes['daily_data_gb'] == 1.5
+        assert attributes['speed_mbps'] == 1000
+        assert attributes['validity_days'] == 365
+        assert attributes['sms_per_day'] == 100
+        assert attributes['ott_bundles'] == 'netflix,amazon_prime,disney_hotstar'
+        assert extract_attributes('["Unlimited Data"]')['unlimited_data'] is True
+
+    def test_attribute_filters(self, client):
+        """min_* and ott filters narrow the listing; unlimited data meets any data minimum"""
+        data = json.loads(client.get('/api/plans?category=mobile&min_daily_data=3').data)
+        assert [plan['name'] for plan in data['plans']] == ['Premium Mobile Plan', 'Unlimited Mobile Plan']
+
+        data = json.loads(client.get('/api/plans?min_speed=150').data)
+        assert {plan['name'] for plan in data['plans']} == {
+            'Fiber Premium Internet', 'Family Bundle', 'Business Bundle'
+        }
+
+        data = json.loads(client.get('/api/optimized-plans?ott=disney_hotstar').data)
+        assert [plan['name'] for plan in data['plans']] == ['Unlimited Mobile Plan']
+
+    def test_attributes_follow_feature_writes(self, app):
+        """Attributes are parsed on insert and re-parsed when features change"""
+        plan = Plan('Data Saver', 'mobile', 199, ['1GB Daily Data', '14 Days Validity'])
+        db.session.add(plan)
+        db.session.commit()
+        assert db.session.get(PlanAttributes, plan.id).validity_days == 14
+
+        plan.set_features(['3GB Daily Data', '56 Days Validity'])
+        db.session.commit()
+        attributes = db.session.get(PlanAttributes, plan.id)
+        assert (attributes.daily_data_gb, attributes.validity_days) == (3.0, 56)
@@ -0,0 +1,76 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from app import create_app, db
+from app.models import Plan
+from app.plan_search import search_plan_ids
+from app.services.data_service import DataService
+from sqlalchemy import event
+import json
+
+class TestPlanSearch:
+    """Unit tests for the full-text plan search index"""
+
+    @pytest.fixture
+    def app(self):
+        """Create test app with a bootstrapped in-memory database"""
+        app = create_app('testing')
+        app.config['TESTING'] = True
+
+        with app.app_context():
+            yield app
+            db.drop_all()
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    def _names(self, client, query):
+        data = json.loads(client.get(f'/api/plans?search={query}').data)
+        return [plan['name'] for plan in data['plans']]
+
+    def test_search_ranks_name_matches_first(self, client):
+        """Name matches outrank description-only matches"""
+        names = self._names(client, 'premium')
+        assert set(names[:2]) == {'Premium Mobile Plan', 'Fiber Premium Internet'}
+
+    def test_features_prefix_and_stemming(self, client):
+        """Features are indexed and terms match as stemmed prefixes"""
+        assert 'Unlimited Mobile Plan' in self._names(client, 'netflix')
+        assert 'Premium Mobile Plan' in self._names(client, 'entertain')
+        assert 'Premium Mobile Plan' in self._names(client, 'mobile plans')
+
+        data = json.loads(client.get('/api/optimized-plans?search=hotstar').data)
+        assert [plan['name'] for plan in data['plans']] == ['Unlimited Mobile Plan']
+
+    def test_index_follows_plan_writes(self, app):
+        """Inserted, renamed and deleted plans are reflected in the index"""
+        plan = Plan('Starter Zephyr', 'mobile', 149, ['1GB Daily Data'], 'Entry plan')
+        db.session.add(plan)
+        db.session.commit()
+        assert search_plan_ids(db.session, 'zephyr') == [plan.id]
+
+        plan.name = 'Starter Aurora'
+        db.session.commit()
+        assert search_plan_ids(db.session, 'zephyr') == []
+        assert search_plan_ids(db.session, 'aurora') == [plan.id]
+
+        db.session.delete(plan)
+        db.session.commit()
+        assert search_plan_ids(db.session, 'aurora') == []
+
+    def test_reset_drops_index_before_plans(self, app, client):
+        """The database reset drops the search table first (it references plans on PostgreSQL) and rebuilds it"""
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(' '.join(statement.split()).lower())
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            assert DataService().reset_database() is True
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+        drops = [statement for statement in statements if statement.startswith('drop table')]
+        assert drops[0] == 'drop table if exists plan_search'
+        assert 'Premium Mobile Plan' in self._names(client, 'premium')
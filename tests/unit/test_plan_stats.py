@@ -0,0 +1,92 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from app import create_app, db
+from app.models import Plan, PlanStats, User, UserPlan, Transaction
+from app.plan_stats import reconcile_plan_stats
+from datetime import datetime, timedelta
+import json
+
+class TestPlanStats:
+    """Unit tests for the incrementally maintained plan counters"""
+
+    @pytest.fixture
+    def app(self):
+        """Create test app with a bootstrapped in-memory database"""
+        app = create_app('testing')
+        app.config['TESTING'] = True
+
+        with app.app_context():
+            yield app
+            db.drop_all()
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def user(self, app):
+        user = User('statsuser', 'stats@example.com', None, 'Stats', 'User', '9876543210', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        return user
+
+    def _stats(self, plan_id):
+        row = db.session.get(PlanStats, plan_id, populate_existing=True)
+        return (row.active_subscribers, row.total_revenue) if row else (0, 0.0)
+
+    def _subscribe(self, user, plan):
+        now = datetime.utcnow()
+        user_plan = UserPlan(user.id, plan.id, now, now + timedelta(days=30))
+        transaction = Transaction(user.id, plan.id, plan.price, 'card')
+        transaction.status = 'completed'
+        db.session.add_all([user_plan, transaction])
+        db.session.commit()
+        return user_plan, transaction
+
+    def test_counters_follow_writes(self, app, user):
+        """Subscribing, refunding and cancelling adjust the counters in the same commit"""
+        plan = db.session.get(Plan, 1)
+        before = self._stats(plan.id)
+        user_plan, transaction = self._subscribe(user, plan)
+        assert self._stats(plan.id) == (before[0] + 1, before[1] + plan.price)
+
+        refund = Transaction(user.id, plan.id, -transaction.amount, 'card')
+        refund.status = 'completed'
+        transaction.status = 'refunded'
+        db.session.add(refund)
+        db.session.commit()
+        assert self._stats(plan.id) == (before[0] + 1, before[1] - plan.price)
+
+        user_plan.status = 'cancelled'
+        db.session.commit()
+        assert self._stats(plan.id)[0] == before[0]
+
+        db.session.delete(refund)
+        db.session.commit()
+        assert self._stats(plan.id) == before
+
+    def test_reconcile_fixes_drift(self, app, user):
+        """Writes that bypass the ORM are corrected by the reconciler"""
+        plan = db.session.get(Plan, 2)
+        self._subscribe(user, plan)
+        db.session.execute(UserPlan.__table__.update().where(UserPlan.user_id == user.id).values(status='expired'))
+        db.session.commit()
+
+        with db.engine.begin() as connection:
+            corrections = reconcile_plan_stats(connection)
+        assert [item['plan_id'] for item in corrections] == [plan.id]
+        assert self._stats(plan.id) == (plan.get_active_subscribers_count(), plan.get_total_revenue())
+
+        with db.engine.begin() as connection:
+            assert reconcile_plan_stats(connection) == []
+
+    def test_plan_detail_reads_counters(self, client, user):
+        """Plan detail reports the stored counters, equal to the live aggregates"""
+        plan = db.session.get(Plan, 3)
+        self._subscribe(user, plan)
+        data = json.loads(client.get(f'/api/plans/{plan.id}').data)
+        assert data['plan']['subscribers_count'] == plan.get_active_subscribers_count() == 1
+        assert data['plan']['total_revenue'] == plan.get_total_revenue() == plan.price
@@ -0,0 +1,71 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from sqlalchemy import create_engine
+from app import create_app, db
+from app.models import Plan
+import json
+
+class TestReadReplicas:
+    """Unit tests for read-replica routing"""
+
+    @pytest.fixture
+    def app(self, tmp_path, monkeypatch):
+        """Create test app whose replica holds different data than the primary"""
+        replica_url = f'sqlite:///{tmp_path}/replica.db'
+        engine = create_engine(replica_url)
+        db.metadata.create_all(engine)
+        with engine.begin() as connection:
+            connection.execute(Plan.__table__.insert().values(
+                name='Replica Plan', category='mobile', price=1.0, features='[]',
+                is_popular=False, is_available=True
+            ))
+        engine.dispose()
+
+        monkeypatch.setenv('DATABASE_REPLICA_URLS', replica_url)
+        monkeypatch.setenv('REPLICA_STICKY_SECONDS', '30')
+        app = create_app('testing')
+        app.config['TESTING'] = True
+
+        with app.app_context():
+            yield app
+            db.drop_all()
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    def _login(self, client):
+        response = client.post('/api/auth/login',
+                               data=json.dumps({'username': 'john.doe', 'password': 'password123'}),
+                               content_type='application/json')
+        return {'Authorization': f'Bearer {json.loads(response.data)["access_token"]}'}
+
+    def test_catalog_reads_use_replica(self, client):
+        """GET /api/plans is served from the replica"""
+        data = json.loads(client.get('/api/plans').data)
+        assert [plan['name'] for plan in data['plans']] == ['Replica Plan']
+
+    def test_writes_use_primary_and_stick(self, app, client):
+        """Writes go to the primary and the writer reads from the primary afterwards"""
+        headers = self._login(client)
+
+        # The replica has no transactions, so a replica read sees an empty history
+        assert json.loads(client.get('/api/payments/history', headers=headers).data)['count'] == 0
+
+        with app.app_context():
+            plan_id = Plan.query.filter_by(name='Fiber Basic Internet').first().id
+        response = client.post('/api/plans/subscribe', headers=headers,
+                               data=json.dumps({'plan_id': plan_id}),
+                               content_type='application/json')
+        assert response.status_code == 201
+
+        history = client.get('/api/payments/history', headers=headers)
+        assert history.status_code == 200
+        assert json.loads(history.data)['count'] == 2
+
+    def test_pool_monitors_include_replicas(self, app):
+        """Replica pools are reported alongside the primary"""
+        assert set(app.extensions['pool_monitors']) == {'primary', 'replica_0'}
@@ -0,0 +1,71 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from app import create_app, db
+from app.models import PlanRecommendation, User, UserPlan
+from app.recommendations import build_recommendations
+from flask_jwt_extended import create_access_token
+from datetime import datetime, timedelta
+import json
+
+class TestRecommendations:
+    """Unit tests for the precomputed co-subscription recommendations"""
+
+    @pytest.fixture
+    def app(self):
+        """Create test app with a bootstrapped in-memory database"""
+        app = create_app('testing')
+        app.config['TESTING'] = True
+
+        with app.app_context():
+            yield app
+            db.drop_all()
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    @pytest.fixture
+    def users(self, app):
+        """Four basic mobile subscribers: three also had the TV package, one has basic internet"""
+        now = datetime.utcnow()
+        users = []
+        for i, other_plan in enumerate([6, 6, 6, 4]):
+            user = User(f'reco{i}', f'reco{i}@example.com', None, 'Reco', 'User', '9876543210', password_hash='x')
+            db.session.add(user)
+            db.session.flush()
+            other = UserPlan(user.id, other_plan, now - timedelta(days=60), now - timedelta(days=30))
+            other.status = 'cancelled' if other_plan == 6 else 'active'
+            db.session.add_all([other, UserPlan(user.id, 1, now, now + timedelta(days=30))])
+            users.append(user)
+        db.session.commit()
+
+        with db.engine.begin() as connection:
+            build_recommendations(connection)
+        return users
+
+    def _recommendations(self, client, user):
+        headers = {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+        return json.loads(client.get('/api/plans/recommendations', headers=headers).data)
+
+    def test_segments_ranked_by_co_subscription(self, users):
+        """Plans held together with the segment's plans rank first; new users get the most subscribed"""
+        basic_mobile = db.session.get(PlanRecommendation, 'mobile:under_500').get_plan_ids()
+        assert basic_mobile[:3] == [6, 1, 4]
+        assert db.session.get(PlanRecommendation, 'new').get_plan_ids()[0] == 1
+
+    def test_endpoint_reads_stored_segment(self, client, users):
+        """The user's own plan is skipped in the stored list"""
+        data = self._recommendations(client, users[0])
+        assert data['source'] == 'co_subscription'
+        assert [plan['id'] for plan in data['recommendations']][:2] == [6, 4]
+
+    def test_falls_back_to_rules(self, client, users):
+        """A segment with no co-subscriptions uses the category/popularity rules"""
+        # The sample user on the premium mobile plan shares no subscriptions with anyone
+        user = User.query.filter_by(email='john.doe@email.com').first()
+        data = self._recommendations(client, user)
+        assert data['source'] == 'rules'
+        assert [plan['id'] for plan in data['recommendations']][0] == 3
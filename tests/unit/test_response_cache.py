@@ -0,0 +1,70 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from app import create_app, db
+from app.models import Plan
+import gzip
+import json
+
+class TestCatalogResponseCache:
+    """Unit tests for the pre-encoded catalog responses"""
+
+    @pytest.fixture
+    def app(self):
+        """Create test app with a bootstrapped in-memory database"""
+        app = create_app('testing')
+        app.config['TESTING'] = True
+
+        with app.app_context():
+            yield app
+            db.drop_all()
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    def test_hit_serves_stored_bytes(self, app, client):
+        """The same query (in any parameter order) is served from the cache"""
+        first = client.get('/api/plans?category=mobile&popular=true')
+        second = client.get('/api/plans?popular=true&category=mobile')
+
+        assert first.data == second.data
+        assert first.headers['ETag'] == second.headers['ETag']
+        stats = app.extensions['catalog_responses'].stats()
+        assert (stats['hits'], stats['misses']) == (1, 1)
+
+    def test_escaped_values_do_not_collide(self, client):
+        """An encoded '&' inside a value is a different query from a real second parameter"""
+        escaped = client.get('/api/plans?category=mobile%26search%3Dpremium')
+        split = client.get('/api/plans?category=mobile&search=premium')
+
+        assert [plan['name'] for plan in json.loads(split.data)['plans']] == ['Premium Mobile Plan']
+        assert split.data != escaped.data
+
+    def test_gzip_and_not_modified(self, client):
+        """Clients accepting gzip get the compressed copy; a matching ETag gets 304"""
+        plain = client.get('/api/optimized-plans')
+        compressed = client.get('/api/optimized-plans', headers={'Accept-Encoding': 'gzip, deflate'})
+
+        assert compressed.headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(compressed.data) == plain.data
+        assert compressed.headers['ETag'] != plain.headers['ETag']
+
+        revalidated = client.get('/api/optimized-plans', headers={'If-None-Match': plain.headers['ETag']})
+        assert revalidated.status_code == 304
+        assert revalidated.data == b''
+
+    def test_plan_change_invalidates(self, client):
+        """A catalog write changes the body and the ETag"""
+        before = client.get('/api/plans/popular')
+
+        plan = Plan.query.filter_by(is_popular=True).first()
+        plan.price = plan.price + 1
+        db.session.commit()
+
+        after = client.get('/api/plans/popular', headers={'If-None-Match': before.headers['ETag']})
+        assert after.status_code == 200
+        assert after.headers['ETag'] != before.headers['ETag']
+        assert plan.price in [item['price'] for item in json.loads(after.data)['plans']]
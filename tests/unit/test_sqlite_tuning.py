@@ -0,0 +1,49 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from sqlalchemy import create_engine
+from app.sqlite_tuning import configure_sqlite, read_pragmas
+
+class TestSQLiteTuning:
+    """Unit tests for the SQLite production profile"""
+
+    @pytest.fixture
+    def engine(self, tmp_path):
+        engine = create_engine(f'sqlite:///{tmp_path}/tuned.db')
+        yield engine
+        engine.dispose()
+
+    def test_profile_applied_on_connect(self, engine):
+        """Every new connection gets WAL, NORMAL sync and a busy timeout"""
+        assert configure_sqlite(engine) is not None
+
+        with engine.connect() as connection:
+            pragmas = read_pragmas(connection)
+
+        assert pragmas['journal_mode'] == 'wal'
+        assert pragmas['synchronous'] == 1
+        assert pragmas['busy_timeout'] == 5000
+        assert pragmas['temp_store'] == 2
+
+    def test_env_overrides_and_opt_out(self, engine, monkeypatch):
+        """SQLITE_* variables override the profile and SQLITE_PROFILE=false disables it"""
+        monkeypatch.setenv('SQLITE_BUSY_TIMEOUT_MS', '250')
+        configure_sqlite(engine)
+        with engine.connect() as connection:
+            assert read_pragmas(connection, ['busy_timeout']) == {'busy_timeout': 250}
+
+        monkeypatch.setenv('SQLITE_PROFILE', 'false')
+        assert configure_sqlite(create_engine('sqlite:///unused.db')) is None
+        assert configure_sqlite(create_engine('sqlite://')) is None
+
+    def test_optimize_runs_on_checkin(self, engine):
+        """PRAGMA optimize runs when a connection is returned after the interval"""
+        tuner = configure_sqlite(engine, optimize_interval=0.001)
+        tuner._last_optimize -= 1
+
+        with engine.connect() as connection:
+            connection.exec_driver_sql('SELECT 1')
+
+        assert tuner.optimize_runs == 1
@@ -0,0 +1,79 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from app import create_app, db
+from app.models import Plan, PlanTrending, User, UserPlan, Transaction
+from app.trending import TrendingEngine
+from datetime import datetime, timedelta
+import json
+import math
+
+class TestTrending:
+    """Unit tests for the decayed trending scores"""
+
+    @pytest.fixture
+    def app(self):
+        """Create test app with a bootstrapped in-memory database"""
+        app = create_app('testing')
+        app.config['TESTING'] = True
+
+        with app.app_context():
+            yield app
+            db.drop_all()
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    def test_scores_decay_without_reordering(self):
+        """Scores decay by e per window and the ranking follows recency-weighted volume"""
+        now = [1000.0]
+        engine = TrendingEngine(windows={'1h': 3600, '7d': 7 * 86400}, clock=lambda: now[0])
+        engine.record([(1, 1.0), (1, 1.0)])
+        now[0] += 3600
+        engine.record([(2, 1.0)])
+
+        scores = dict(engine.top('1h', 10))
+        assert scores[1] == pytest.approx(2 / math.e)
+        assert scores[2] == pytest.approx(1.0)
+        assert [plan_id for plan_id, _ in engine.top('1h', 1)] == [2]
+
+        # Far enough ahead to force a rescale of the stored values
+        now[0] += 3600 * 60
+        engine.record([(3, 1.0)])
+        assert dict(engine.top('7d', 10))[2] == pytest.approx(math.exp(-3600 * 60 / (7 * 86400)))
+        assert engine.top('1h', 10) == [(3, pytest.approx(1.0))]
+
+    def test_committed_subscriptions_trend(self, client):
+        """A committed subscription and payment puts the plan on top of the trending list"""
+        user = User('trenduser', 'trend@example.com', None, 'Trend', 'User', '9876543210', password_hash='x')
+        db.session.add(user)
+        db.session.commit()
+        for _ in range(3):
+            now = datetime.utcnow()
+            db.session.add(UserPlan(user.id, 6, now, now + timedelta(days=30)))
+            transaction = Transaction(user.id, 6, 999, 'card')
+            transaction.status = 'completed'
+            db.session.add(transaction)
+        db.session.commit()
+
+        data = json.loads(client.get('/api/plans/trending?window=1h').data)
+        assert data['plans'][0]['id'] == 6
+        assert data['plans'][0]['trending_score'] == pytest.approx(4.5, rel=1e-3)
+
+        assert client.get('/api/plans/trending?window=2w').status_code == 400
+
+    def test_scores_survive_restart(self, app):
+        """Synced scores are persisted and loaded by a fresh engine"""
+        engine = TrendingEngine(windows={'24h': 86400})
+        engine.record([(5, 2.0)])
+        with db.engine.begin() as connection:
+            engine.sync(connection)
+        assert db.session.get(PlanTrending, (5, '24h')).score == pytest.approx(2.0, rel=1e-3)
+
+        restarted = TrendingEngine(windows={'24h': 86400})
+        with db.engine.begin() as connection:
+            restarted.sync(connection)
+        assert dict(restarted.top('24h', 10))[5] == pytest.approx(2.0, rel=1e-3)
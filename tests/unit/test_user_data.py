@@ -0,0 +1,89 @@
+import pytest
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '../../backend'))
+
+from app import create_app, db
+from app.models import User, Transaction
+from app.user_data import user_data_version
+from flask_jwt_extended import create_access_token
+from sqlalchemy import event
+import json
+
+class TestUserDataCache:
+    """Unit tests for the per-user data version and response cache"""
+
+    @pytest.fixture
+    def app(self):
+        """Create test app with a bootstrapped in-memory database"""
+        app = create_app('testing')
+        app.config['TESTING'] = True
+
+        with app.app_context():
+            yield app
+            db.drop_all()
+
+    @pytest.fixture
+    def client(self, app):
+        return app.test_client()
+
+    def _user(self, email='john.doe@email.com'):
+        return User.query.filter_by(email=email).first()
+
+    def _headers(self, user):
+        return {'Authorization': f'Bearer {create_access_token(identity=str(user.id))}'}
+
+    def test_repeat_load_runs_no_aggregation(self, app, client):
+        """A second dashboard load only reads the version stamp, and a current ETag gets a 304"""
+        headers = self._headers(self._user())
+        first = client.get('/api/users/dashboard', headers=headers)
+        assert first.status_code == 200
+
+        statements = []
+        listener = lambda conn, cursor, statement, *args: statements.append(statement)
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            second = client.get('/api/users/dashboard', headers=headers)
+            revalidated = client.get('/api/users/dashboard',
+                                     headers={**headers, 'If-None-Match': first.headers['ETag']})
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+        assert second.data == first.data
+        assert revalidated.status_code == 304
+        assert not any('transactions' in statement or 'user_plans' in statement for statement in statements)
+        assert app.extensions['user_responses'].stats()['hits'] == 1
+
+    def test_write_bumps_only_that_users_version(self, app, client):
+        """A new transaction bumps its user's version in the same commit; other users keep theirs"""
+        john = self._user()
+        jane = self._user('jane.smith@email.com')
+        before = client.get('/api/payments/summary', headers=self._headers(john))
+        jane_version = user_data_version(db.session, jane.id)
+        john_version = user_data_version(db.session, john.id)
+
+        transaction = Transaction(user_id=john.id, plan_id=1, amount=299.0, payment_method='upi')
+        transaction.status = 'completed'
+        db.session.add(transaction)
+        db.session.commit()
+
+        assert user_data_version(db.session, john.id) == john_version + 1
+        assert user_data_version(db.session, jane.id) == jane_version
+
+        after = client.get('/api/payments/summary', headers={**self._headers(john),
+                                                              'If-None-Match': before.headers['ETag']})
+        assert after.status_code == 200
+        assert after.headers['ETag'] != before.headers['ETag']
+        summary = json.loads(after.data)['summary']
+        assert summary['total_transactions'] == json.loads(before.data)['summary']['total_transactions'] + 1
+
+    def test_cache_is_per_user_and_query(self, client):
+        """Users and query strings never share a cached body or an ETag"""
+        john = client.get('/api/users/activity?limit=5', headers=self._headers(self._user()))
+        fewer = client.get('/api/users/activity?limit=1', headers=self._headers(self._user()))
+        test_user = client.get('/api/users/activity?limit=5',
+                               headers=self._headers(self._user('test.user@email.com')))
+
+        assert len({john.headers['ETag'], fewer.headers['ETag'], test_user.headers['ETag']}) == 3
+        assert json.loads(fewer.data)['count'] == 1
+        assert john.data != test_user.data